@@ -458,6 +458,11 @@ MODULESTORE = {
 # require student context.
 MODULESTORE_FIELD_OVERRIDE_PROVIDERS = ()
 
+# Maximum total size, in bytes, of the uncompressed course structures held in
+# each process's local tier of the split modulestore's course structure cache.
+# Set to 0 to disable the local tier.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -182,6 +182,9 @@ CACHES = {
     },
 }
 
+# Don't keep course structures in a process-local cache between tests
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
 # hide ratelimit warnings while running tests
 filterwarnings('ignore', message='No request passed to the backend, unable to rate-limit')
 
@@ -0,0 +1,86 @@
+"""
+Data shown on the student dashboard for each of the enrollments of a user,
+loaded for all of their enrollments at once.
+"""
+from collections import defaultdict
+
+from bulk_email.models import BulkEmailFlag  # pylint: disable=import-error
+from certificates.models import certificate_statuses_for_courses
+from course_modes.models import CourseMode
+from shoppingcart.models import CourseRegistrationCode
+
+
+class DashboardData(object):
+    """
+    Loads the course modes, certificate statuses, redeemed registration
+    codes and bulk email availability of the courses of a user's enrollments
+    in a few set-based queries, rather than a few queries for each
+    enrollment, and serves them from memory.
+    """
+    def __init__(self, user, course_enrollments):
+        self.user = user
+        course_ids = [enrollment.course_id for enrollment in course_enrollments]
+
+        __, unexpired_course_modes = CourseMode.all_and_unexpired_modes_for_courses(course_ids)
+        self.course_modes_by_course = {
+            course_id: {
+                mode.slug: mode
+                for mode in modes
+            }
+            for course_id, modes in unexpired_course_modes.iteritems()
+        }
+
+        self._certificate_statuses = certificate_statuses_for_courses(user, course_ids, unexpired_course_modes)
+
+        self._redeemed_registration_codes = defaultdict(list)
+        for registration_code in CourseRegistrationCode.objects.filter(
+                course_id__in=course_ids,
+                registrationcoderedemption__redeemed_by=user,
+        ).select_related('invoice_item__invoice'):
+            self._redeemed_registration_codes[registration_code.course_id].append(registration_code)
+
+        self._bulk_email_course_ids = BulkEmailFlag.courses_with_feature_enabled(course_ids)
+
+    def certificate_status(self, course_id):
+        """
+        Returns the user's certificate status in the course, as returned by
+        certificate_status_for_student.
+        """
+        return self._certificate_statuses[course_id]
+
+    def redeemed_registration_codes(self, course_id):
+        """
+        Returns the list of the CourseRegistrationCodes of the course that
+        the user redeemed, with their invoices.
+        """
+        return self._redeemed_registration_codes[course_id]
+
+    def bulk_email_enabled(self, course_id):
+        """
+        Returns whether the bulk email feature is available for the course.
+        """
+        return course_id in self._bulk_email_course_ids
+
+    def is_paid_course(self, enrollment):
+        """
+        Returns whether the course of the enrollment is paid, as
+        CourseEnrollment.is_paid_course does.
+        """
+        selectable_modes = {
+            slug: mode
+            for slug, mode in self.course_modes_by_course[enrollment.course_id].iteritems()
+            if slug not in CourseMode.CREDIT_MODES
+        }
+        return enrollment.is_paid_course(modes_dict=selectable_modes)
+
+    def refundable(self, enrollment):
+        """
+        Returns whether the enrollment is refundable, as
+        CourseEnrollment.refundable does, without querying the certificates,
+        order and modes of enrollments in courses with no verified mode,
+        which can't be refunded.
+        """
+        if getattr(enrollment, 'can_refund', None) is None:
+            if CourseMode.VERIFIED not in self.course_modes_by_course[enrollment.course_id]:
+                return False
+        return enrollment.refundable()
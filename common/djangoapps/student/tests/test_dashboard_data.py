@@ -0,0 +1,88 @@
+"""
+Tests for the data loaded for the enrollments shown on the student dashboard.
+"""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from opaque_keys.edx.locator import CourseLocator
+
+from bulk_email.models import BulkEmailFlag, CourseAuthorization
+from certificates.models import CertificateStatuses, certificate_status_for_student
+from certificates.tests.factories import GeneratedCertificateFactory
+from course_modes.models import CourseMode
+from course_modes.tests.factories import CourseModeFactory
+from shoppingcart.models import CourseRegistrationCode, RegistrationCodeRedemption
+from student.dashboard_data import DashboardData
+from student.tests.factories import CourseEnrollmentFactory, UserFactory
+
+
+class DashboardDataTest(TestCase):
+    """
+    Tests that DashboardData loads the same data as the per-enrollment
+    functions do, in a number of queries that doesn't depend on the number
+    of enrollments.
+    """
+    def setUp(self):
+        super(DashboardDataTest, self).setUp()
+        self.user = UserFactory()
+        self.course_ids = [CourseLocator('org', 'course{}'.format(index), 'run') for index in range(3)]
+        self.enrollments = [
+            CourseEnrollmentFactory(user=self.user, course_id=course_id, mode=mode)
+            for course_id, mode in zip(self.course_ids, ['audit', 'verified', 'honor'])
+        ]
+        CourseModeFactory(course_id=self.course_ids[1], mode_slug=CourseMode.VERIFIED)
+        CourseModeFactory(course_id=self.course_ids[2], mode_slug=CourseMode.HONOR, min_price=10)
+        GeneratedCertificateFactory(
+            user=self.user, course_id=self.course_ids[1], status=CertificateStatuses.downloadable, mode='verified',
+        )
+        GeneratedCertificateFactory(
+            user=self.user, course_id=self.course_ids[2], status=CertificateStatuses.notpassing, mode='audit',
+        )
+
+        registration_code = CourseRegistrationCode.objects.create(
+            code='code', course_id=self.course_ids[2], created_by=self.user,
+        )
+        RegistrationCodeRedemption.objects.create(registration_code=registration_code, redeemed_by=self.user)
+
+        BulkEmailFlag.objects.create(enabled=True, require_course_email_auth=True)
+        CourseAuthorization.objects.create(course_id=self.course_ids[0], email_enabled=True)
+
+    def tearDown(self):
+        BulkEmailFlag.objects.all().delete()
+        super(DashboardDataTest, self).tearDown()
+
+    def test_num_queries(self):
+        with CaptureQueriesContext(connection) as one_enrollment_queries:
+            DashboardData(self.user, self.enrollments[:1])
+        with CaptureQueriesContext(connection) as all_enrollments_queries:
+            DashboardData(self.user, self.enrollments)
+        self.assertEqual(len(one_enrollment_queries), len(all_enrollments_queries))
+
+    def test_load(self):
+        dashboard_data = DashboardData(self.user, self.enrollments)
+
+        with self.assertNumQueries(0):
+            certificate_statuses = [dashboard_data.certificate_status(course_id) for course_id in self.course_ids]
+            redeemed_registration_codes = [
+                dashboard_data.redeemed_registration_codes(course_id) for course_id in self.course_ids
+            ]
+            bulk_email_enabled = [dashboard_data.bulk_email_enabled(course_id) for course_id in self.course_ids]
+            is_paid_course = [dashboard_data.is_paid_course(enrollment) for enrollment in self.enrollments]
+            self.assertFalse(dashboard_data.refundable(self.enrollments[0]))
+
+        self.assertEqual(
+            certificate_statuses,
+            [certificate_status_for_student(self.user, course_id) for course_id in self.course_ids],
+        )
+        self.assertEqual(certificate_statuses[2]['status'], CertificateStatuses.notpassing)
+        self.assertEqual(
+            [[registration_code.code for registration_code in codes] for codes in redeemed_registration_codes],
+            [[], [], ['code']],
+        )
+        self.assertEqual(bulk_email_enabled, [True, False, False])
+        self.assertEqual(is_paid_course, [enrollment.is_paid_course() for enrollment in self.enrollments])
+        self.assertEqual(is_paid_course, [False, False, True])
+        self.assertEqual(
+            dashboard_data.refundable(self.enrollments[1]),
+            self.enrollments[1].refundable(),
+        )
@@ -125,22 +125,35 @@ def get_pre_requisite_courses_not_completed(user, enrolled_courses):  # pylint:
     if not is_prerequisite_courses_enabled():
         return {}
 
-    pre_requisite_courses = {}
+    required_course_keys_by_course = {}
 
     for course_key in enrolled_courses:
-        required_courses = []
+        required_course_keys = []
         fulfillment_paths = milestones_api.get_course_milestones_fulfillment_paths(course_key, {'id': user.id})
         for __, milestone_value in fulfillment_paths.items():
             for key, value in milestone_value.items():
                 if key == 'courses' and value:
-                    for required_course in value:
-                        required_course_key = CourseKey.from_string(required_course)
-                        required_course_overview = CourseOverview.get_from_id(required_course_key)
-                        required_courses.append({
-                            'key': required_course_key,
-                            'display': get_course_display_string(required_course_overview)
-                        })
-        # If there are required courses, add them to the result dict.
+                    required_course_keys.extend(CourseKey.from_string(required_course) for required_course in value)
+        if required_course_keys:
+            required_course_keys_by_course[course_key] = required_course_keys
+
+    # Load the overviews of all the required courses at once.
+    required_course_overviews = CourseOverview.get_from_ids(
+        required_course_key
+        for required_course_keys in required_course_keys_by_course.itervalues()
+        for required_course_key in required_course_keys
+    )
+
+    pre_requisite_courses = {}
+    for course_key, required_course_keys in required_course_keys_by_course.iteritems():
+        required_courses = [
+            {
+                'key': required_course_key,
+                'display': get_course_display_string(required_course_overviews[required_course_key])
+            }
+            for required_course_key in required_course_keys
+            if required_course_key in required_course_overviews
+        ]
         if required_courses:
             pre_requisite_courses[course_key] = {'courses': required_courses}
 
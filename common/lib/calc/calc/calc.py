@@ -1,12 +1,15 @@
 """
 Parser and evaluator for FormulaResponse and NumericalResponse
 
-Uses pyparsing to parse. Main function as of now is evaluator().
+Uses pyparsing to parse. Main functions as of now are evaluator(), and
+compile_expression() for evaluating one expression many times.
 """
 
+from collections import namedtuple, OrderedDict
 import math
 import operator
 import numbers
+import threading
 import numpy
 import scipy.constants
 import functions
@@ -224,38 +227,200 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
      python numbers.
     -Unary functions are passed as a dictionary from string to function.
     """
-    # No need to go further.
-    if math_expr.strip() == "":
-        return float('nan')
+    return compile_expression(math_expr, case_sensitive).evaluate(variables, functions)
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
 
-    # Get our variables together.
-    all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Parse an expression once, and return a `CompiledExpression` that can
+    evaluate it for any number of sets of variables.
+    """
+    return CompiledExpression(math_expr, case_sensitive)
 
-    # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
 
-    # Create a recursion to evaluate the tree.
-    if case_sensitive:
-        casify = lambda x: x
-    else:
-        casify = lambda x: x.lower()  # Lowercase for case insens.
+# The following few functions are the evaluation actions used when evaluating
+# an expression over arrays of samples of its variables. They differ from the
+# ones above in that values may be arrays, so they're told apart from the
+# operator tokens by not being strings.
+
+def _is_value(token):
+    """
+    Return whether the given token of a parse result is a value, rather than
+    an operator (or parenthesis).
+    """
+    return not isinstance(token, basestring)
+
+
+def eval_atom_samples(parse_result):
+    """
+    Like `eval_atom`, for values that may be arrays of samples.
+    """
+    return next(k for k in parse_result if _is_value(k))
+
+
+def eval_power_samples(parse_result):
+    """
+    Like `eval_power`, for values that may be arrays of samples.
+    """
+    parse_result = reversed([k for k in parse_result if _is_value(k)])
+    return reduce(lambda a, b: b ** a, parse_result)
+
+
+def eval_parallel_samples(parse_result):
+    """
+    Like `eval_parallel`, for values that may be arrays of samples.
+
+    Zero inputs raise a `FloatingPointError` (see `evaluate_samples`), rather
+    than evaluating to NaN.
+    """
+    if len(parse_result) == 1:
+        return parse_result[0]
+    return 1. / sum(1. / e for e in parse_result if _is_value(e))
+
+
+def eval_sum_samples(parse_result):
+    """
+    Like `eval_sum`, for values that may be arrays of samples.
+    """
+    total = 0.0
+    current_op = operator.add
+    for token in parse_result:
+        if not _is_value(token):
+            current_op = operator.add if token == '+' else operator.sub
+        else:
+            total = current_op(total, token)
+    return total
+
+
+def eval_product_samples(parse_result):
+    """
+    Like `eval_product`, for values that may be arrays of samples.
+    """
+    prod = 1.0
+    current_op = operator.mul
+    for token in parse_result:
+        if not _is_value(token):
+            current_op = operator.mul if token == '*' else operator.truediv
+        else:
+            prod = current_op(prod, token)
+    return prod
+
+
+class CompiledExpression(object):
+    """
+    A parsed math expression, which can be evaluated repeatedly without being
+    parsed again.
+
+    Parse errors are raised when it is created, as `pyparsing.ParseException`.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+        # No need to parse blank expressions; they evaluate to NaN.
+        self.is_blank = math_expr.strip() == ""
+        if self.is_blank:
+            self.parse_augmenter = ParseAugmenter(math_expr, case_sensitive)
+        else:
+            self.parse_augmenter = parse_expression(math_expr, case_sensitive)
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+    @property
+    def variables_used(self):
+        """
+        The names of the variables used in the expression.
+        """
+        return self.parse_augmenter.variables_used
+
+    @property
+    def functions_used(self):
+        """
+        The names of the functions used in the expression.
+        """
+        return self.parse_augmenter.functions_used
+
+    def _casify(self, name):
+        """
+        Return the name of a variable or function as it is looked up.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def evaluate(self, variables, functions):
+        """
+        Evaluate the expression for the given variables and functions, as
+        `evaluator` does.
+        """
+        if self.is_blank:
+            return float('nan')
+
+        all_variables, all_functions = add_defaults(variables, functions, self.case_sensitive)
+        self.parse_augmenter.check_variables(all_variables, all_functions)
+        return self._reduce(all_variables, all_functions, {
+            'number': eval_number,
+            'atom': eval_atom,
+            'power': eval_power,
+            'parallel': eval_parallel,
+            'product': eval_product,
+            'sum': eval_sum
+        })
+
+    def evaluate_samples(self, variables_list, functions):
+        """
+        Evaluate the expression for each of the given dictionaries of
+        variables, and return the list of results.
+
+        The results, and any error raised, are the same as those of calling
+        `evaluate` for each dictionary of variables. But when all of them
+        define the same variables, the expression is evaluated for all of
+        them at once, with each variable's values in a NumPy array.
+        """
+        if self.is_blank or not variables_list:
+            return [self.evaluate(variables, functions) for variables in variables_list]
+
+        variable_names = set(variables_list[0])
+        if any(set(variables) != variable_names for variables in variables_list):
+            return [self.evaluate(variables, functions) for variables in variables_list]
+
+        all_variables, all_functions = add_defaults(
+            {name: numpy.array([variables[name] for variables in variables_list]) for name in variable_names},
+            functions,
+            self.case_sensitive,
+        )
+        self.parse_augmenter.check_variables(all_variables, all_functions)
+
+        # Any arithmetic error, or function that can't be applied to arrays,
+        # makes us fall back to evaluating each sample on its own, which
+        # produces the same errors and special values as `evaluator`.
+        # pylint: disable=broad-except
+        try:
+            with numpy.errstate(all='raise', under='ignore'):
+                result = self._reduce(all_variables, all_functions, {
+                    'number': eval_number,
+                    'atom': eval_atom_samples,
+                    'power': eval_power_samples,
+                    'parallel': eval_parallel_samples,
+                    'product': eval_product_samples,
+                    'sum': eval_sum_samples
+                })
+        except Exception:
+            return [self.evaluate(variables, functions) for variables in variables_list]
+
+        if numpy.ndim(result) == 0:
+            return [result] * len(variables_list)
+        elif numpy.shape(result) == (len(variables_list),):
+            return list(result)
+        else:
+            return [self.evaluate(variables, functions) for variables in variables_list]
+
+    def _reduce(self, all_variables, all_functions, evaluate_actions):
+        """
+        Evaluate the parse tree with the given actions, variables and functions.
+        """
+        evaluate_actions = dict(
+            evaluate_actions,
+            variable=lambda x: all_variables[self._casify(x[0])],
+            function=lambda x: all_functions[self._casify(x[0])](x[1]),
+        )
+        return self.parse_augmenter.reduce_tree(evaluate_actions)
 
 
 class ParseAugmenter(object):
@@ -416,3 +581,111 @@ class ParseAugmenter(object):
 
         if bad_vars:
             raise UndefinedVariable(' '.join(sorted(bad_vars)))
+
+
+# The number of parsed expressions kept by `PARSE_CACHE`.
+PARSE_CACHE_SIZE = 1000
+
+ParseCacheInfo = namedtuple('ParseCacheInfo', ['hits', 'misses', 'evictions', 'maxsize', 'currsize'])
+
+
+class ParseCache(object):
+    """
+    A bounded cache of parsed expressions, keyed on the expression and its
+    case sensitivity, which evicts the least recently used ones when full.
+
+    The cached `ParseAugmenter`s are shared, so they must not be modified:
+    only their `reduce_tree` and `check_variables` methods may be used.
+    Expressions that fail to parse aren't cached.
+
+    If set, `stats_callback` is called with the result of each lookup,
+    'hit' or 'miss', and with 'eviction', along with the number of times
+    it happened, so that callers can report the cache's hit rate (calc
+    itself has no dependencies to report it with, as it is also installed
+    in the sandbox).
+    """
+    def __init__(self, maxsize=PARSE_CACHE_SIZE, stats_callback=None):
+        self.maxsize = maxsize
+        self.stats_callback = stats_callback
+        self._parsed = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, math_expr, case_sensitive=False):
+        """
+        Return a parsed `ParseAugmenter` for the given expression, parsing it
+        only if it isn't already in the cache.
+        """
+        key = (math_expr, case_sensitive)
+        with self._lock:
+            parse_augmenter = self._parsed.pop(key, None)
+            if parse_augmenter is not None:
+                # Move it to the most recently used end.
+                self._parsed[key] = parse_augmenter
+                self.hits += 1
+            else:
+                self.misses += 1
+        if parse_augmenter is not None:
+            self._report_stats('hit')
+            return parse_augmenter
+        self._report_stats('miss')
+
+        # Parse outside of the lock, so that slow parses don't hold up others.
+        parse_augmenter = ParseAugmenter(math_expr, case_sensitive)
+        parse_augmenter.parse_algebra()
+        parse_augmenter.variables_used = frozenset(parse_augmenter.variables_used)
+        parse_augmenter.functions_used = frozenset(parse_augmenter.functions_used)
+
+        evictions = 0
+        with self._lock:
+            self._parsed[key] = parse_augmenter
+            while len(self._parsed) > self.maxsize:
+                self._parsed.popitem(last=False)
+                evictions += 1
+            self.evictions += evictions
+        if evictions:
+            self._report_stats('eviction', evictions)
+        return parse_augmenter
+
+    def _report_stats(self, result, count=1):
+        """
+        Call the cache's `stats_callback`, if it has one, with the given result.
+        """
+        stats_callback = self.stats_callback
+        if stats_callback is not None:
+            stats_callback(result, count)
+
+    def info(self):
+        """
+        Return the statistics of the cache, as a `ParseCacheInfo`.
+        """
+        with self._lock:
+            return ParseCacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._parsed))
+
+    def hit_rate(self):
+        """
+        Return the fraction of lookups that were found in the cache.
+        """
+        info = self.info()
+        lookups = info.hits + info.misses
+        return float(info.hits) / lookups if lookups else 0.0
+
+    def clear(self):
+        """
+        Empty the cache and reset its statistics.
+        """
+        with self._lock:
+            self._parsed.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+PARSE_CACHE = ParseCache()
+
+
+def parse_expression(math_expr, case_sensitive=False):
+    """
+    Return a parsed `ParseAugmenter` for the given expression, from `PARSE_CACHE`.
+
+    Raise a `pyparsing.ParseException` if the expression can't be parsed.
+    """
+    return PARSE_CACHE.get(math_expr, case_sensitive)
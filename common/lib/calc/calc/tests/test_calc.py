@@ -5,6 +5,7 @@ Unit tests for calc.py
 import unittest
 import numpy
 import calc
+from mock import Mock, call
 from pyparsing import ParseException
 
 # numpy's default behavior when it evaluates a function outside its domain
@@ -559,3 +560,127 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Run tests for calc.compile_expression
+
+    Evaluating a compiled expression over many samples should give the same
+    results and errors as calling calc.evaluator for each sample.
+    """
+    SAMPLES = [{'x': x, 'y': y} for x, y in [(1.5, -2.0), (0.0, 3.0), (-4.25, 0.5), (2.0, 2.0)]]
+
+    def assert_same_as_evaluator(self, math_expr, variables_list=None, functions=None, case_sensitive=False):
+        """
+        Check that evaluate_samples gives the same results as calc.evaluator.
+        """
+        variables_list = self.SAMPLES if variables_list is None else variables_list
+        functions = functions or {}
+        expected = [
+            calc.evaluator(variables, functions, math_expr, case_sensitive=case_sensitive)
+            for variables in variables_list
+        ]
+        results = calc.compile_expression(math_expr, case_sensitive).evaluate_samples(variables_list, functions)
+        self.assertEqual(len(results), len(expected))
+        for result, expected_result in zip(results, expected):
+            if numpy.isnan(expected_result):
+                self.assertTrue(numpy.isnan(result))
+            else:
+                self.assertAlmostEqual(result, expected_result)
+
+    def test_vectorized_expressions(self):
+        for math_expr in [
+                "x+y", "-x-y+1", "x*y/2", "x^2*y^3", "2^x^2", "sin(x)*cos(y)+sqrt(y^2)",
+                "x||y", "3 || x^2 + 1", "(x+y)*(x-y)", "i*x+y", "5k*x", "pi*e",
+        ]:
+            self.assert_same_as_evaluator(math_expr)
+
+    def test_fallback_to_evaluator(self):
+        # Division by zero, negative bases with fractional powers,
+        # and functions that don't support arrays.
+        for math_expr in ["x||0", "1 + x||y", "sqrt(x)", "fact(y)"]:
+            self.assert_same_as_evaluator(math_expr, [{'x': x, 'y': 3.0} for x in (2.0, 0.0, 1.0)])
+        for math_expr in ["1/x", "x^0.5"]:
+            with self.assertRaises((ZeroDivisionError, ValueError)):
+                calc.compile_expression(math_expr).evaluate_samples(self.SAMPLES, {})
+
+    def test_custom_functions_and_case(self):
+        functions = {'f': lambda x: x * 2, 'F': lambda x: x + 1}
+        self.assert_same_as_evaluator("f(x)+F(y)", functions=functions, case_sensitive=True)
+        self.assert_same_as_evaluator("X+Y", functions=functions)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'X'):
+            calc.compile_expression("X+y", case_sensitive=True).evaluate_samples(self.SAMPLES, {})
+
+    def test_different_variables(self):
+        self.assert_same_as_evaluator("x+1", [{'x': 1.0}, {'x': 2.0, 'z': 3.0}])
+
+    def test_blank_and_empty(self):
+        compiled = calc.compile_expression("  ")
+        self.assertTrue(numpy.isnan(compiled.evaluate({}, {})))
+        self.assertEqual(len(compiled.evaluate_samples(self.SAMPLES, {})), len(self.SAMPLES))
+        self.assertEqual(calc.compile_expression("x").evaluate_samples([], {}), [])
+
+    def test_variables_used(self):
+        compiled = calc.compile_expression("sin(x)+y*2")
+        self.assertEqual(compiled.variables_used, {'x', 'y'})
+        self.assertEqual(compiled.functions_used, {'sin'})
+        with self.assertRaises(ParseException):
+            calc.compile_expression("1+")
+
+
+class ParseCacheTest(unittest.TestCase):
+    """
+    Test the cache of parsed expressions.
+    """
+    def setUp(self):
+        super(ParseCacheTest, self).setUp()
+        self.cache = calc.ParseCache(maxsize=2)
+
+    def test_hits_and_misses(self):
+        parsed = self.cache.get("x+1")
+        self.assertIs(self.cache.get("x+1"), parsed)
+        self.assertIsNot(self.cache.get("x+1", case_sensitive=True), parsed)
+        self.assertEqual(self.cache.info(), calc.ParseCacheInfo(1, 2, 0, 2, 2))
+        self.assertAlmostEqual(self.cache.hit_rate(), 1.0 / 3)
+
+    def test_lru_eviction(self):
+        first = self.cache.get("x")
+        self.cache.get("y")
+        self.cache.get("x")
+        self.cache.get("z")
+        # "y" was the least recently used, so it was evicted rather than "x".
+        self.assertIs(self.cache.get("x"), first)
+        self.cache.get("y")
+        self.assertEqual(self.cache.info(), calc.ParseCacheInfo(2, 4, 2, 2, 2))
+
+        self.cache.clear()
+        self.assertEqual(self.cache.info(), calc.ParseCacheInfo(0, 0, 0, 2, 0))
+
+    def test_stats_callback(self):
+        stats_callback = Mock()
+        self.cache = calc.ParseCache(maxsize=1, stats_callback=stats_callback)
+        self.cache.get("x")
+        self.cache.get("x")
+        self.cache.get("y")
+        self.assertEqual(stats_callback.call_args_list, [
+            call('miss', 1),
+            call('hit', 1),
+            call('miss', 1),
+            call('eviction', 1),
+        ])
+
+    def test_parse_errors_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(ParseException):
+                self.cache.get("1+")
+        self.assertEqual(self.cache.info().currsize, 0)
+
+    def test_cached_parse_reused(self):
+        calc.PARSE_CACHE.clear()
+        self.assertEqual(calc.evaluator({'x': 2}, {}, "x^2"), 4)
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.evaluator({'x': 2}, {}, "x^2+y")
+        self.assertEqual(calc.evaluator({'x': 3}, {}, "x^2"), 9)
+        self.assertEqual(calc.compile_expression("x^2").variables_used, {'x'})
+        self.assertEqual(calc.PARSE_CACHE.info()[:2], (2, 2))
@@ -500,6 +500,17 @@ class FormulaResponseTest(ResponseTest):
         input_formula = "x + y"
         self.assert_grade(problem, input_formula, "incorrect")
 
+    @mock.patch('capa.responsetypes.dog_stats_api.increment')
+    def test_parse_cache_metrics(self, mock_increment):
+        calc.PARSE_CACHE.clear()
+        problem = self.build_problem(sample_dict={'x': (-10, 10)}, num_samples=10, tolerance=0.01, answer="2*x")
+        self.assert_grade(problem, "x + x", "correct")
+        self.assert_grade(problem, "x + x", "correct")
+        self.assertIn(
+            mock.call('edxapp.calc.parse_cache', 1, tags=[u'result:hit']),
+            mock_increment.call_args_list,
+        )
+
     def test_hint(self):
         """
         Test the hint-giving functionality of FormulaResponse
@@ -9,6 +9,7 @@ from datetime import datetime
 import requests
 from lazy import lazy
 from lxml import etree
+from openedx.core.lib.cache_utils import lru_memoized
 from path import Path as path
 from pytz import utc
 from xblock.fields import Scope, List, String, Dict, Boolean, Integer, Float
@@ -64,7 +65,33 @@ class StringOrDate(Date):
 edx_xml_parser = etree.XMLParser(dtd_validation=False, load_dtd=False,
                                  remove_comments=True, remove_blank_text=True)
 
-_cached_toc = {}
+
+# cdodge: I've added this caching of TOC because in Mongo-backed instances (but not Filesystem stores)
+# course modules have a very short lifespan and are constantly being created and torn down.
+# Since this module in the __init__() method does a synchronous call to AWS to get the TOC
+# this is causing a big performance problem. So let's be a bit smarter about this and cache
+# each fetch and store in-mem for 10 minutes.
+@lru_memoized(maxsize=100, ttl=600)
+def _fetch_table_of_contents(toc_url):
+    """
+    Returns the XML tree representation of the textbook table of contents at the given URL.
+    """
+    # Get the table of contents from S3
+    log.info("Retrieving textbook table of contents from %s", toc_url)
+    try:
+        r = requests.get(toc_url)
+    except Exception as err:
+        msg = 'Error %s: Unable to retrieve textbook table of contents at %s' % (err, toc_url)
+        log.error(msg)
+        raise Exception(msg)
+
+    # TOC is XML. Parse it
+    try:
+        return etree.fromstring(r.text)
+    except Exception as err:
+        msg = 'Error %s: Unable to parse XML for textbook table of contents at %s' % (err, toc_url)
+        log.error(msg)
+        raise Exception(msg)
 
 
 class Textbook(object):
@@ -93,44 +120,7 @@ class Textbook(object):
 
         Returns XML tree representation of the table of contents
         """
-        toc_url = self.book_url + 'toc.xml'
-
-        # cdodge: I've added this caching of TOC because in Mongo-backed instances (but not Filesystem stores)
-        # course modules have a very short lifespan and are constantly being created and torn down.
-        # Since this module in the __init__() method does a synchronous call to AWS to get the TOC
-        # this is causing a big performance problem. So let's be a bit smarter about this and cache
-        # each fetch and store in-mem for 10 minutes.
-        # NOTE: I have to get this onto sandbox ASAP as we're having runtime failures. I'd like to swing back and
-        # rewrite to use the traditional Django in-memory cache.
-        try:
-            # see if we already fetched this
-            if toc_url in _cached_toc:
-                (table_of_contents, timestamp) = _cached_toc[toc_url]
-                age = datetime.now(utc) - timestamp
-                # expire every 10 minutes
-                if age.seconds < 600:
-                    return table_of_contents
-        except Exception as err:
-            pass
-
-        # Get the table of contents from S3
-        log.info("Retrieving textbook table of contents from %s", toc_url)
-        try:
-            r = requests.get(toc_url)
-        except Exception as err:
-            msg = 'Error %s: Unable to retrieve textbook table of contents at %s' % (err, toc_url)
-            log.error(msg)
-            raise Exception(msg)
-
-        # TOC is XML. Parse it
-        try:
-            table_of_contents = etree.fromstring(r.text)
-        except Exception as err:
-            msg = 'Error %s: Unable to parse XML for textbook table of contents at %s' % (err, toc_url)
-            log.error(msg)
-            raise Exception(msg)
-
-        return table_of_contents
+        return _fetch_table_of_contents(self.book_url + 'toc.xml')
 
     def __eq__(self, other):
         return (self.title == other.title and
@@ -8,13 +8,17 @@ import zlib
 import pymongo
 import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
 # Import this just to export it
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
+from bson.errors import InvalidDocument
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -28,12 +32,22 @@ from mongodb_proxy import autoretry_read
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_codec import decode_structure, encode_structure, is_encoded_structure
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 
 new_contract('BlockData', BlockData)
 log = logging.getLogger(__name__)
 
+# Formats in which the CourseStructureCache can serialize structures.
+STRUCTURE_FORMAT_PICKLE = 'pickle'
+STRUCTURE_FORMAT_COMPACT = 'compact'
+STRUCTURE_FORMATS = (STRUCTURE_FORMAT_PICKLE, STRUCTURE_FORMAT_COMPACT)
+
+# Default size, in bytes, of the process-local tier of the CourseStructureCache.
+# A value of 0 disables the local tier.
+DEFAULT_LOCAL_CACHE_MAX_BYTES = 0
+
 
 def get_cache(alias):
     """
@@ -225,58 +239,314 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class LocalStructureCache(object):
+    """
+    A bounded, size-aware, process-local LRU cache of serialized course structures.
+
+    Structures are keyed by their immutable ObjectId, so entries never need
+    to be invalidated; they are only evicted (least recently used first) once
+    the total size of the stored values exceeds ``max_bytes``.
+
+    Values are stored as uncompressed, serialized structures rather than live objects so that
+    every caller gets its own copy of the structure to mutate, just as it would
+    when reading from the shared cache.
+    """
+    def __init__(self, max_bytes=0):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """
+        Return whether this cache will store anything at all.
+        """
+        return self.max_bytes > 0
+
+    def get(self, key):
+        """
+        Return the serialized value stored for ``key``, or None on a miss.
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            # Re-insert to mark the entry as most recently used.
+            self._entries[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store the serialized ``value`` for ``key``, evicting least recently used
+        entries as needed to stay within ``max_bytes``.
+
+        Returns the number of entries evicted to make room.
+        """
+        size = len(value)
+        if size > self.max_bytes:
+            return 0
+
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, oldest = self._entries.popitem(last=False)
+                self.current_bytes -= len(oldest)
+                evicted += 1
+
+            self._entries[key] = value
+            self.current_bytes += size
+            self.evictions += evicted
+        return evicted
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_LOCAL_STRUCTURE_CACHE = None
+_LOCAL_STRUCTURE_CACHE_LOCK = threading.Lock()
+
+
+def get_local_structure_cache():
+    """
+    Return the process-wide :class:`LocalStructureCache`, creating it on first use.
+
+    Its size is controlled by the ``COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES`` Django
+    setting, if Django is available.
+    """
+    global _LOCAL_STRUCTURE_CACHE  # pylint: disable=global-statement
+    if _LOCAL_STRUCTURE_CACHE is None:
+        with _LOCAL_STRUCTURE_CACHE_LOCK:
+            if _LOCAL_STRUCTURE_CACHE is None:
+                max_bytes = DEFAULT_LOCAL_CACHE_MAX_BYTES
+                if DJANGO_AVAILABLE:
+                    max_bytes = getattr(settings, 'COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES', max_bytes)
+                _LOCAL_STRUCTURE_CACHE = LocalStructureCache(max_bytes)
+    return _LOCAL_STRUCTURE_CACHE
+
+
+def reset_local_structure_cache():
+    """
+    Discard the process-wide :class:`LocalStructureCache`, so that it is
+    recreated (and its settings re-read) on next use. Intended for tests.
+    """
+    global _LOCAL_STRUCTURE_CACHE  # pylint: disable=global-statement
+    with _LOCAL_STRUCTURE_CACHE_LOCK:
+        _LOCAL_STRUCTURE_CACHE = None
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are serialized and compressed when cached.
+
+    Structures are serialized either with pickle or, for the ``compact``
+    format, with :func:`~xmodule.modulestore.split_mongo.structure_codec.encode_structure`,
+    whose blocks are only decoded when they are used. Values are always
+    decoded according to their own format, so the format can be changed
+    without invalidating the cache.
+
+    Reads are first served from a process-local LRU tier (see
+    :class:`LocalStructureCache`), which holds the uncompressed, serialized forms of
+    recently used structures, so hot structures skip both the network round
+    trip and the decompression.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
-    def __init__(self):
+    def __init__(self, structure_format=STRUCTURE_FORMAT_PICKLE):
+        self.structure_format = structure_format
         self.cache = None
+        self.local_cache = None
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
+        if self.cache is not None:
+            local_cache = get_local_structure_cache()
+            if local_cache.enabled:
+                self.local_cache = local_cache
+
+    def _serialize(self, structure, tagger=None):
+        """
+        Serialize ``structure`` in this cache's format.
+        """
+        structure_format = STRUCTURE_FORMAT_PICKLE
+        data = None
+        if self.structure_format == STRUCTURE_FORMAT_COMPACT:
+            try:
+                data = encode_structure(structure)
+                structure_format = STRUCTURE_FORMAT_COMPACT
+            except (InvalidDocument, TypeError):
+                log.exception("Unable to encode structure %s in the compact format", structure.get('_id'))
+
+        if data is None:
+            data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
+        if tagger is not None:
+            tagger.tag(format=structure_format)
+        return data
+
+    @staticmethod
+    def _deserialize(data, tagger=None):
+        """
+        Deserialize a structure serialized by :meth:`_serialize`, in whichever format it was written.
+        """
+        compact = is_encoded_structure(data)
+        if tagger is not None:
+            tagger.tag(format=STRUCTURE_FORMAT_COMPACT if compact else STRUCTURE_FORMAT_PICKLE)
+        return decode_structure(data) if compact else pickle.loads(data)
+
+    def _get_local(self, key, tagger):
+        """
+        Return the uncompressed, serialized structure for ``key`` from the local tier, if present.
+        """
+        if self.local_cache is None:
+            return None
+        serialized_data = self.local_cache.get(key)
+        tagger.tag(from_local_cache=str(serialized_data is not None).lower())
+        return serialized_data
+
+    def _set_local(self, key, serialized_data, tagger):
+        """
+        Store the uncompressed, serialized structure for ``key`` in the local tier.
+        """
+        if self.local_cache is None:
+            return
+        evicted = self.local_cache.set(key, serialized_data)
+        if evicted:
+            tagger.tag(local_cache_evictions=evicted)
+        tagger.measure('local_cache_size', self.local_cache.current_bytes)
 
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed, serialized struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            serialized_data = self._get_local(key, tagger)
+            if serialized_data is not None:
+                tagger.tag(from_cache='true')
+                tagger.measure('uncompressed_size', len(serialized_data))
+                return self._deserialize(serialized_data, tagger)
 
-            if compressed_pickled_data is None:
+            compressed_data = self.cache.get(key)
+            tagger.tag(from_cache=str(compressed_data is not None).lower())
+
+            if compressed_data is None:
                 # Always log cache misses, because they are unexpected
                 tagger.sample_rate = 1
                 return None
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            tagger.measure('compressed_size', len(compressed_data))
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            serialized_data = zlib.decompress(compressed_data)
+            tagger.measure('uncompressed_size', len(serialized_data))
+            self._set_local(key, serialized_data, tagger)
 
-            return pickle.loads(pickled_data)
+            return self._deserialize(serialized_data, tagger)
 
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will serialize, compress, and write to cache."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            serialized_data = self._serialize(structure, tagger)
+            tagger.measure('uncompressed_size', len(serialized_data))
 
             # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            compressed_data = zlib.compress(serialized_data, 1)
+            tagger.measure('compressed_size', len(compressed_data))
+
+            # Stuctures are immutable, so we set a timeout of "never"
+            self.cache.set(key, compressed_data, None)
+            self._set_local(key, serialized_data, tagger)
+
+    def get_many(self, keys, course_context=None):
+        """
+        Return a dict mapping each of ``keys`` that is cached to its structure.
+
+        Keys not found in the local tier are fetched from the shared cache
+        with a single ``get_many`` call.
+        """
+        if self.cache is None or not keys:
+            return {}
+
+        with TIMER.timer("CourseStructureCache.get_many", course_context) as tagger:
+            tagger.measure('requested', len(keys))
+            serialized = {}
+            remaining = []
+            for key in keys:
+                serialized_data = self.local_cache.get(key) if self.local_cache is not None else None
+                if serialized_data is None:
+                    remaining.append(key)
+                else:
+                    serialized[key] = serialized_data
+            tagger.measure('from_local_cache', len(serialized))
+
+            compressed_size = 0
+            if remaining:
+                for key, compressed_data in self.cache.get_many(remaining).iteritems():
+                    compressed_size += len(compressed_data)
+                    serialized[key] = zlib.decompress(compressed_data)
+                    if self.local_cache is not None:
+                        self.local_cache.set(key, serialized[key])
+            tagger.measure('compressed_size', compressed_size)
+            tagger.measure('uncompressed_size', sum(len(data) for data in serialized.itervalues()))
+
+            misses = len(keys) - len(serialized)
+            tagger.measure('misses', misses)
+            if misses:
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+
+            return {key: self._deserialize(data) for key, data in serialized.iteritems()}
+
+    def set_many(self, structures, course_context=None):
+        """
+        Given a dict mapping keys to structures, serialize, compress, and
+        write them all to cache with a single ``set_many`` call.
+        """
+        if self.cache is None or not structures:
+            return None
+
+        with TIMER.timer("CourseStructureCache.set_many", course_context) as tagger:
+            tagger.measure('structures', len(structures))
+            compressed = {}
+            uncompressed_size = 0
+            for key, structure in structures.iteritems():
+                serialized_data = self._serialize(structure)
+                uncompressed_size += len(serialized_data)
+                # 1 = Fastest (slightly larger results)
+                compressed[key] = zlib.compress(serialized_data, 1)
+                if self.local_cache is not None:
+                    self.local_cache.set(key, serialized_data)
+            tagger.measure('uncompressed_size', uncompressed_size)
+            tagger.measure('compressed_size', sum(len(data) for data in compressed.itervalues()))
 
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set_many(compressed, None)
 
 
 class MongoConnection(object):
@@ -285,11 +555,19 @@ class MongoConnection(object):
     """
     def __init__(
         self, db, collection, host, port=27017, tz_aware=True, user=None, password=None,
-        asset_collection=None, retry_wait_time=0.1, **kwargs
+        asset_collection=None, retry_wait_time=0.1, structure_cache_format=STRUCTURE_FORMAT_PICKLE, **kwargs
     ):
         """
         Create & open the connection, authenticate, and provide pointers to the collections
+
+        Arguments:
+            structure_cache_format: The format in which structures are written to the
+                CourseStructureCache (one of STRUCTURE_FORMATS).
         """
+        if structure_cache_format not in STRUCTURE_FORMATS:
+            raise ValueError("Unknown structure cache format: {}".format(structure_cache_format))
+        self.structure_cache_format = structure_cache_format
+
         # Set a write concern of 1, which makes writes complete successfully to the primary
         # only before returning. Also makes pymongo report write errors.
         kwargs['w'] = 1
@@ -320,7 +598,7 @@ class MongoConnection(object):
         This method will use a cached version of the structure if it is available.
         """
         with TIMER.timer("get_structure", course_context) as tagger_get_structure:
-            cache = CourseStructureCache()
+            cache = CourseStructureCache(self.structure_cache_format)
 
             structure = cache.get(key, course_context)
             tagger_get_structure.tag(from_cache=str(bool(structure)).lower())
@@ -344,6 +622,46 @@ class MongoConnection(object):
 
             return structure
 
+    @autoretry_read()
+    def get_structures(self, ids, course_context=None):
+        """
+        Get the structures whose ids are listed in ``ids`` from the persistence mechanism.
+
+        Cached structures are fetched with a single cache lookup; the remaining ones
+        are fetched with a single Mongo query and then written back to the cache
+        in bulk. Structures that don't exist are omitted from the result.
+
+        Arguments:
+            ids (list): A list of structure ids
+
+        Returns:
+            list: The structures found, in the order of ``ids``
+        """
+        with TIMER.timer("get_structures", course_context) as tagger:
+            ids = list(OrderedDict.fromkeys(ids))
+            tagger.measure("requested_ids", len(ids))
+            cache = CourseStructureCache(self.structure_cache_format)
+
+            structures = cache.get_many(ids, course_context)
+            missing_ids = [structure_id for structure_id in ids if structure_id not in structures]
+            tagger.measure("cache_misses", len(missing_ids))
+            if missing_ids:
+                # Always log cache misses, because they are unexpected
+                tagger.sample_rate = 1
+                with TIMER.timer("get_structures.find", course_context) as tagger_find:
+                    tagger_find.measure("requested_ids", len(missing_ids))
+                    found = {
+                        doc['_id']: structure_from_mongo(doc, course_context)
+                        for doc in self.structures.find({'_id': {'$in': missing_ids}})
+                    }
+                    tagger_find.measure("structures", len(found))
+                    tagger_find.sample_rate = 1
+
+                cache.set_many(found, course_context)
+                structures.update(found)
+
+            return [structures[structure_id] for structure_id in ids if structure_id in structures]
+
     @autoretry_read()
     def find_structures_by_id(self, ids, course_context=None):
         """
@@ -366,18 +684,33 @@ class MongoConnection(object):
         """
         Find all structures that specified in `ids`. Among the blocks only return block whose type is `course`.
 
+        Structures found in the structure cache are used (trimmed to their course
+        blocks); only the remaining ones are queried from Mongo.
+
         Arguments:
             ids (list): A list of structure ids
         """
         with TIMER.timer("find_course_blocks_by_id", course_context) as tagger:
             tagger.measure("requested_ids", len(ids))
-            docs = [
-                structure_from_mongo(structure, course_context)
-                for structure in self.structures.find(
-                    {'_id': {'$in': ids}},
-                    {'blocks': {'$elemMatch': {'block_type': 'course'}}, 'root': 1}
+            cached = CourseStructureCache(self.structure_cache_format).get_many(ids, course_context)
+            docs = []
+            for structure in cached.itervalues():
+                trimmed = dict(structure)
+                trimmed['blocks'] = {
+                    block_key: block for block_key, block in structure['blocks'].iteritems()
+                    if block_key.type == 'course'
+                }
+                docs.append(trimmed)
+
+            missing_ids = [structure_id for structure_id in ids if structure_id not in cached]
+            if missing_ids:
+                docs.extend(
+                    structure_from_mongo(structure, course_context)
+                    for structure in self.structures.find(
+                        {'_id': {'$in': missing_ids}},
+                        {'blocks': {'$elemMatch': {'block_type': 'course'}}, 'root': 1}
+                    )
                 )
-            ]
             tagger.measure("structures", len(docs))
             return docs
 
@@ -82,7 +82,9 @@ from xmodule.modulestore import (
 
 from ..exceptions import ItemNotFoundError
 from .caching_descriptor_system import CachingDescriptorSystem
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection, DuplicateKeyError
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    MongoConnection, DuplicateKeyError, STRUCTURE_FORMAT_PICKLE
+)
 from xmodule.modulestore.split_mongo import BlockKey, CourseEnvelope
 from xmodule.modulestore.store_utilities import DETACHED_XBLOCK_TYPES
 from xmodule.error_module import ErrorDescriptor
@@ -573,7 +575,7 @@ class SplitBulkWriteMixin(BulkOperationsMixin):
                     ids.remove(structure_id)
                     structures.append(structure)
 
-        structures.extend(self.db_connection.find_structures_by_id(list(ids)))
+        structures.extend(self.db_connection.get_structures(list(ids)))
         return structures
 
     def find_structures_derived_from(self, ids):
@@ -655,14 +657,16 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
                  default_class=None,
                  error_tracker=null_error_tracker,
                  i18n_service=None, fs_service=None, user_service=None,
-                 services=None, signal_handler=None, **kwargs):
+                 services=None, signal_handler=None, structure_cache_format=STRUCTURE_FORMAT_PICKLE, **kwargs):
         """
         :param doc_store_config: must have a host, db, and collection entries. Other common entries: port, tz_aware.
+        :param structure_cache_format: the format in which course structures are written to the
+            course structure cache: 'pickle' (the default) or 'compact'.
         """
 
         super(SplitMongoModuleStore, self).__init__(contentstore, **kwargs)
 
-        self.db_connection = MongoConnection(**doc_store_config)
+        self.db_connection = MongoConnection(structure_cache_format=structure_cache_format, **doc_store_config)
 
         if default_class is not None:
             module_path, __, class_name = default_class.rpartition('.')
@@ -0,0 +1,246 @@
+"""
+A compact, versioned, non-pickle binary encoding for split modulestore course structures.
+
+Layout of an encoded structure::
+
+    MAGIC (4 bytes) | FORMAT_VERSION (1 byte) | index length (4 bytes, little endian)
+    | index (BSON document) | block 0 (BSON document) | block 1 | ...
+
+The index holds the top-level structure fields (everything except ``blocks``),
+the interned block types, the list of block keys (as ``[type index, block id]``,
+blocks of the structure first, followed by any children that aren't blocks of the structure),
+a table of the distinct sets of field names used by blocks ("shapes"), and the
+offset of every encoded block. Each block only stores its field values (in
+the order given by its shape), with its children stored as indices into the
+list of block keys.
+
+Decoding only reads the index: every block is returned as a :class:`LazyBlockData`,
+which decodes its own BSON document the first time one of its attributes is used.
+So fetching the fields of one block doesn't require materializing every block in
+the course.
+"""
+import struct
+
+from bson import BSON
+from bson.codec_options import CodecOptions
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+
+
+MAGIC = b'\x00SSC'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sBI')
+_CODEC_OPTIONS = CodecOptions(tz_aware=True)
+
+
+class StructureFormatError(Exception):
+    """
+    Raised when a value can't be decoded as an encoded structure.
+    """
+    pass
+
+
+def is_encoded_structure(data):
+    """
+    Return whether ``data`` looks like the output of :func:`encode_structure`.
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def encode_structure(structure):
+    """
+    Encode a structure (as returned by ``structure_from_mongo``) to bytes.
+
+    The passed structure is not modified.
+    """
+    types = []
+    type_indices = {}
+    shapes = []
+    shape_indices = {}
+
+    def intern_type(block_type):
+        """
+        Return the index of ``block_type`` in ``types``, adding it if needed.
+        """
+        if block_type not in type_indices:
+            type_indices[block_type] = len(types)
+            types.append(block_type)
+        return type_indices[block_type]
+
+    block_keys = list(structure['blocks'])
+    # Children that aren't blocks of this structure are appended after the
+    # blocks, so that dangling references survive a round trip.
+    all_keys = list(block_keys)
+    key_indices = {block_key: index for index, block_key in enumerate(block_keys)}
+
+    def key_index(block_key):
+        """
+        Return the index of ``block_key`` in ``all_keys``, adding it if needed.
+        """
+        block_key = BlockKey(*block_key)
+        if block_key not in key_indices:
+            key_indices[block_key] = len(all_keys)
+            all_keys.append(block_key)
+        return key_indices[block_key]
+
+    encoded_blocks = []
+    for block_key in block_keys:
+        block = structure['blocks'][block_key]
+        fields = dict(block.fields)
+        children = fields.pop('children', None)
+
+        shape = tuple(sorted(fields))
+        if shape not in shape_indices:
+            shape_indices[shape] = len(shapes)
+            shapes.append(list(shape))
+
+        document = {
+            's': shape_indices[shape],
+            'v': [fields[field_name] for field_name in shape],
+            'd': block.definition,
+            'e': {
+                name: value for name, value in block.edit_info.to_storable().iteritems()
+                if value is not None
+            },
+        }
+        if block.block_type is not None:
+            document['t'] = intern_type(block.block_type)
+        if children is not None:
+            document['c'] = [key_index(child) for child in children]
+        if block.defaults:
+            document['df'] = block.defaults
+        if block.get_asides():
+            document['a'] = block.get_asides()
+        encoded_blocks.append(BSON.encode(document))
+
+    offsets = [0]
+    for encoded_block in encoded_blocks:
+        offsets.append(offsets[-1] + len(encoded_block))
+
+    top_level = {key: value for key, value in structure.iteritems() if key != 'blocks'}
+    top_level['root'] = list(structure['root'])
+    index = BSON.encode({
+        'structure': top_level,
+        'types': types,
+        'keys': [[intern_type(block_key.type), block_key.id] for block_key in all_keys],
+        'shapes': shapes,
+        'offsets': offsets,
+    })
+
+    return b''.join([_HEADER.pack(MAGIC, FORMAT_VERSION, len(index)), index] + encoded_blocks)
+
+
+def decode_structure(data):
+    """
+    Decode bytes produced by :func:`encode_structure` back into a structure.
+
+    Only the index is decoded here; the blocks are :class:`LazyBlockData` objects.
+    """
+    if len(data) < _HEADER.size:
+        raise StructureFormatError("Encoded structure is truncated")
+
+    magic, version, index_length = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise StructureFormatError("Not an encoded structure")
+    if version != FORMAT_VERSION:
+        raise StructureFormatError("Unsupported structure format version {}".format(version))
+
+    index_start = _HEADER.size
+    blocks_start = index_start + index_length
+    index = BSON(data[index_start:blocks_start]).decode(codec_options=_CODEC_OPTIONS)
+
+    types = index['types']
+    block_keys = [BlockKey(types[type_index], block_id) for type_index, block_id in index['keys']]
+    decoder = _BlockDecoder(data, blocks_start, index['offsets'], block_keys, types, index['shapes'])
+
+    structure = index['structure']
+    structure['root'] = BlockKey(*structure['root'])
+    structure['blocks'] = {
+        block_keys[block_index]: LazyBlockData(decoder, block_index)
+        for block_index in xrange(len(index['offsets']) - 1)
+    }
+    return structure
+
+
+class _BlockDecoder(object):
+    """
+    Decodes individual blocks out of an encoded structure, on demand.
+    """
+    def __init__(self, data, blocks_start, offsets, block_keys, types, shapes):
+        self.data = data
+        self.blocks_start = blocks_start
+        self.offsets = offsets
+        self.block_keys = block_keys
+        self.types = types
+        self.shapes = shapes
+
+    def block_storable(self, block_index):
+        """
+        Return the Mongo-storable representation of the block at ``block_index``,
+        suitable for :meth:`BlockData.from_storable`.
+        """
+        start = self.blocks_start + self.offsets[block_index]
+        end = self.blocks_start + self.offsets[block_index + 1]
+        document = BSON(self.data[start:end]).decode(codec_options=_CODEC_OPTIONS)
+
+        fields = dict(zip(self.shapes[document['s']], document['v']))
+        if 'c' in document:
+            fields['children'] = [self.block_keys[child_index] for child_index in document['c']]
+
+        return {
+            'fields': fields,
+            'block_type': self.types[document['t']] if 't' in document else None,
+            'definition': document.get('d'),
+            'defaults': document.get('df', {}),
+            'asides': document.get('a', {}),
+            'edit_info': document.get('e', {}),
+        }
+
+
+class LazyBlockData(BlockData):
+    """
+    A :class:`BlockData` whose contents are decoded from an encoded structure
+    the first time any of them is accessed.
+
+    Attributes assigned before the block is decoded take precedence over the
+    decoded values. Pickling or copying a ``LazyBlockData`` produces a plain,
+    fully decoded :class:`BlockData`.
+    """
+    _LAZY_ATTRIBUTES = frozenset(['fields', 'block_type', 'definition', 'defaults', 'asides', 'edit_info'])
+
+    def __init__(self, decoder, block_index):  # pylint: disable=super-init-not-called
+        self.definition_loaded = False
+        self._decoder = decoder
+        self._block_index = block_index
+
+    @property
+    def is_loaded(self):
+        """
+        Return whether this block's contents have been decoded.
+        """
+        return '_decoder' not in self.__dict__
+
+    def _load(self):
+        """
+        Decode this block's contents, without overwriting any attributes that
+        have already been assigned.
+        """
+        decoder = self.__dict__.pop('_decoder')
+        block_index = self.__dict__.pop('_block_index')
+        decoded = BlockData(**decoder.block_storable(block_index))
+        for name, value in decoded.__dict__.iteritems():
+            self.__dict__.setdefault(name, value)
+
+    def __getattr__(self, name):
+        # Only called for attributes that aren't already set on the instance.
+        if name in self._LAZY_ATTRIBUTES and not self.is_loaded:
+            self._load()
+            return getattr(self, name)
+        raise AttributeError(name)
+
+    def __reduce__(self):
+        if not self.is_loaded:
+            self._load()
+        return (BlockData, (), dict(self.__dict__))
@@ -14,6 +14,7 @@ import ddt
 from contracts import contract
 from nose.plugins.attrib import attr
 from django.core.cache import caches, InvalidCacheBackendError
+from django.test.utils import override_settings
 
 from openedx.core.lib import tempdir
 from xblock.fields import Reference, ReferenceList, ReferenceValueDict
@@ -29,6 +30,7 @@ from ccx_keys.locator import CCXBlockUsageLocator
 from xmodule.modulestore.inheritance import InheritanceMixin
 from xmodule.x_module import XModuleMixin
 from xmodule.fields import Date, Timedelta
+from xmodule.modulestore.split_mongo.mongo_connection import get_local_structure_cache, reset_local_structure_cache
 from xmodule.modulestore.split_mongo.split import SplitMongoModuleStore
 from xmodule.modulestore.tests.test_modulestore import check_has_course_method
 from xmodule.modulestore.split_mongo import BlockKey
@@ -978,6 +980,55 @@ class TestCourseStructureCache(SplitModuleTest):
         # now make sure that you get the same structure
         self.assertEqual(cached_structure, not_cached_structure)
 
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_course_structure_local_cache(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        reset_local_structure_cache()
+        self.addCleanup(reset_local_structure_cache)
+
+        with override_settings(COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES=10 * 1024 * 1024):
+            with check_mongo_calls(1):
+                not_cached_structure = self._get_structure(self.new_course)
+
+            # the structure is now in the local tier, so the shared cache isn't consulted
+            with patch.object(self.cache, 'get') as mock_cache_get:
+                with check_mongo_calls(0):
+                    cached_structure = self._get_structure(self.new_course)
+                self.assertFalse(mock_cache_get.called)
+
+        self.assertEqual(cached_structure, not_cached_structure)
+        # each caller gets its own copy of the structure
+        self.assertIsNot(cached_structure, not_cached_structure)
+        self.assertEqual(get_local_structure_cache().hits, 1)
+
+    @patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache')
+    def test_get_structures(self, mock_get_cache):
+        mock_get_cache.return_value = self.cache
+        other_course = modulestore().create_course(
+            'org', 'other_course', 'test_run', self.user, BRANCH_NAME_DRAFT,
+        )
+        structure_ids = [
+            course.location.as_object_id(course.location.version_guid)
+            for course in (self.new_course, other_course)
+        ]
+        db_connection = modulestore().db_connection
+
+        # all missing structures are fetched with a single query
+        with check_mongo_calls(1):
+            not_cached_structures = db_connection.get_structures(structure_ids)
+
+        # ... and then all written to the cache
+        with check_mongo_calls(0):
+            cached_structures = db_connection.get_structures(structure_ids)
+        self.assertEqual(cached_structures, not_cached_structures)
+        self.assertEqual([structure['_id'] for structure in cached_structures], structure_ids)
+
+        # course blocks are served from the cached structures
+        with check_mongo_calls(0):
+            course_blocks = db_connection.find_course_blocks_by_id(structure_ids)
+        for structure in course_blocks:
+            self.assertEqual([block_key.type for block_key in structure['blocks']], ['course'])
+
     def test_dummy_cache(self):
         with check_mongo_calls(1):
             not_cached_structure = self._get_structure(self.new_course)
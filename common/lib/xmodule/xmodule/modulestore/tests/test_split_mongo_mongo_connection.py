@@ -1,7 +1,7 @@
 """ Test the behavior of split_mongo/MongoConnection """
 import unittest
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+from xmodule.modulestore.split_mongo.mongo_connection import LocalStructureCache, MongoConnection
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +17,47 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestLocalStructureCache(unittest.TestCase):
+    """ Test the bounded, process-local LRU tier of the course structure cache """
+    def test_disabled(self):
+        cache = LocalStructureCache(0)
+        self.assertFalse(cache.enabled)
+        cache.set('key', 'value')
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+
+    def test_hit_and_miss(self):
+        cache = LocalStructureCache(100)
+        self.assertIsNone(cache.get('key'))
+        cache.set('key', 'value')
+        self.assertEqual(cache.get('key'), 'value')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = LocalStructureCache(10)
+        cache.set('a', 'aaaa')
+        cache.set('b', 'bbbb')
+        # Touch 'a' so that 'b' becomes the least recently used entry
+        cache.get('a')
+        self.assertEqual(cache.set('c', 'cccc'), 1)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'aaaa')
+        self.assertEqual(cache.get('c'), 'cccc')
+        self.assertEqual(cache.current_bytes, 8)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_replace_existing_entry(self):
+        cache = LocalStructureCache(10)
+        cache.set('a', 'aaaa')
+        cache.set('a', 'aaaaaa')
+        self.assertEqual(cache.current_bytes, 6)
+        self.assertEqual(len(cache), 1)
+
+    def test_oversized_value_not_stored(self):
+        cache = LocalStructureCache(4)
+        cache.set('a', 'aaaa')
+        self.assertEqual(cache.set('b', 'bbbbbbbb'), 0)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'aaaa')
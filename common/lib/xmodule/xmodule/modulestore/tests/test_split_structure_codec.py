@@ -0,0 +1,158 @@
+"""
+Tests for the compact course structure encoding used by the split modulestore's structure cache.
+"""
+import copy
+import cPickle as pickle
+import datetime
+import unittest
+
+from bson.objectid import ObjectId
+from mock import patch, Mock
+import pytz
+
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.mongo_connection import (
+    CourseStructureCache, STRUCTURE_FORMAT_COMPACT, STRUCTURE_FORMAT_PICKLE
+)
+from xmodule.modulestore.split_mongo.structure_codec import (
+    decode_structure, encode_structure, is_encoded_structure, LazyBlockData, StructureFormatError
+)
+
+
+def _block(block_type, fields, **kwargs):
+    """
+    Return a BlockData with some edit info.
+    """
+    return BlockData(
+        block_type=block_type,
+        fields=fields,
+        definition=ObjectId(),
+        edit_info={
+            'edited_on': datetime.datetime(2016, 1, 1, tzinfo=pytz.utc),
+            'edited_by': 42,
+            'update_version': ObjectId(),
+        },
+        **kwargs
+    )
+
+
+def _make_structure():
+    """
+    Return a small course structure, as it would be returned by structure_from_mongo.
+    """
+    course = BlockKey(u'course', u'course')
+    chapter = BlockKey(u'chapter', u'chapter1')
+    problems = [BlockKey(u'problem', u'problem{}'.format(index)) for index in range(3)]
+    blocks = {
+        course: _block(u'course', {u'display_name': u'Course', u'children': [chapter]}),
+        chapter: _block(u'chapter', {u'display_name': u'Chapter', u'children': problems}),
+    }
+    for index, problem in enumerate(problems):
+        blocks[problem] = _block(
+            u'problem',
+            {u'display_name': u'Problem {}'.format(index), u'weight': index},
+            defaults={u'max_attempts': 3},
+        )
+    return {
+        '_id': ObjectId(),
+        'root': course,
+        'previous_version': None,
+        'original_version': ObjectId(),
+        'edited_by': 42,
+        'edited_on': datetime.datetime(2016, 1, 1, tzinfo=pytz.utc),
+        'schema_version': 1,
+        'blocks': blocks,
+    }
+
+
+class TestStructureCodec(unittest.TestCase):
+    """
+    Tests for encode_structure and decode_structure.
+    """
+    def setUp(self):
+        super(TestStructureCodec, self).setUp()
+        self.structure = _make_structure()
+        self.encoded = encode_structure(self.structure)
+
+    def test_round_trip(self):
+        self.assertTrue(is_encoded_structure(self.encoded))
+        self.assertEqual(decode_structure(self.encoded), self.structure)
+
+    def test_encode_does_not_modify_structure(self):
+        original = copy.deepcopy(self.structure)
+        encode_structure(self.structure)
+        self.assertEqual(self.structure, original)
+
+    def test_blocks_decoded_lazily(self):
+        decoded = decode_structure(self.encoded)
+        chapter = decoded['blocks'][BlockKey(u'chapter', u'chapter1')]
+        self.assertIsInstance(chapter, LazyBlockData)
+        self.assertFalse(any(block.is_loaded for block in decoded['blocks'].itervalues()))
+
+        self.assertEqual(chapter.fields[u'display_name'], u'Chapter')
+        self.assertTrue(chapter.is_loaded)
+        self.assertEqual(sum(block.is_loaded for block in decoded['blocks'].itervalues()), 1)
+
+    def test_children_are_block_keys(self):
+        decoded = decode_structure(self.encoded)
+        children = decoded['blocks'][decoded['root']].fields['children']
+        self.assertEqual(children, [BlockKey(u'chapter', u'chapter1')])
+        self.assertIsInstance(children[0], BlockKey)
+
+    def test_dangling_children(self):
+        missing = BlockKey(u'html', u'missing')
+        self.structure['blocks'][self.structure['root']].fields['children'].append(missing)
+        decoded = decode_structure(encode_structure(self.structure))
+        self.assertNotIn(missing, decoded['blocks'])
+        self.assertIn(missing, decoded['blocks'][decoded['root']].fields['children'])
+
+    def test_assigned_attributes_take_precedence(self):
+        decoded = decode_structure(self.encoded)
+        chapter = decoded['blocks'][BlockKey(u'chapter', u'chapter1')]
+        chapter.fields = {u'display_name': u'Changed'}
+        self.assertEqual(chapter.fields, {u'display_name': u'Changed'})
+        self.assertEqual(chapter.edit_info.edited_by, 42)
+
+    def test_copies_are_plain_block_data(self):
+        decoded = decode_structure(self.encoded)
+        for copied in (copy.deepcopy(decoded), pickle.loads(pickle.dumps(decoded, pickle.HIGHEST_PROTOCOL))):
+            self.assertEqual(copied, self.structure)
+            for block in copied['blocks'].itervalues():
+                self.assertIs(type(block), BlockData)
+
+    def test_bad_data(self):
+        with self.assertRaises(StructureFormatError):
+            decode_structure(pickle.dumps(self.structure, pickle.HIGHEST_PROTOCOL))
+        with self.assertRaises(StructureFormatError):
+            decode_structure(self.encoded[:4] + b'\xff' + self.encoded[5:])
+
+
+class TestCourseStructureCacheFormats(unittest.TestCase):
+    """
+    Tests that the CourseStructureCache can write either format, and read both.
+    """
+    def setUp(self):
+        super(TestCourseStructureCacheFormats, self).setUp()
+        self.values = {}
+        backend = Mock()
+        backend.get.side_effect = self.values.get
+        backend.set.side_effect = lambda key, value, timeout: self.values.__setitem__(key, value)
+        patcher = patch('xmodule.modulestore.split_mongo.mongo_connection.get_cache', return_value=backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.structure = _make_structure()
+
+    def test_formats_are_interchangeable(self):
+        CourseStructureCache(STRUCTURE_FORMAT_COMPACT).set('compact', self.structure)
+        CourseStructureCache(STRUCTURE_FORMAT_PICKLE).set('pickle', self.structure)
+
+        for structure_format in (STRUCTURE_FORMAT_COMPACT, STRUCTURE_FORMAT_PICKLE):
+            cache = CourseStructureCache(structure_format)
+            self.assertEqual(cache.get('compact'), self.structure)
+            self.assertEqual(cache.get('pickle'), self.structure)
+
+    def test_unencodable_structure_falls_back_to_pickle(self):
+        self.structure['blocks'][self.structure['root']].fields[u'unencodable'] = set([1])
+        CourseStructureCache(STRUCTURE_FORMAT_COMPACT).set('key', self.structure)
+        self.assertEqual(CourseStructureCache(STRUCTURE_FORMAT_COMPACT).get('key'), self.structure)
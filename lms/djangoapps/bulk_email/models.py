@@ -397,6 +397,23 @@ class BulkEmailFlag(ConfigurationModel):
         else:  # implies enabled == True and require_course_email == False, so email is globally enabled
             return True
 
+    @classmethod
+    def courses_with_feature_enabled(cls, course_ids):
+        """
+        Returns the set of the given course ids for which the bulk email
+        feature is available, as determined by `feature_enabled`, in at most
+        one query.
+        """
+        if not BulkEmailFlag.is_enabled():
+            return set()
+        elif BulkEmailFlag.current().require_course_email_auth:
+            return {
+                authorization.course_id
+                for authorization in CourseAuthorization.objects.filter(course_id__in=course_ids, email_enabled=True)
+            }
+        else:
+            return set(course_ids)
+
     class Meta(object):
         app_label = "bulk_email"
 
@@ -500,37 +500,69 @@ def certificate_status_for_student(student, course_id):
     If the student has been graded, the dictionary also contains their
     grade for the course with the key "grade".
     '''
-    # Import here instead of top of file since this module gets imported before
-    # the course_modes app is loaded, resulting in a Django deprecation warning.
-    from course_modes.models import CourseMode
-
     try:
         generated_certificate = GeneratedCertificate.objects.get(  # pylint: disable=no-member
             user=student, course_id=course_id)
-        cert_status = {
-            'status': generated_certificate.status,
-            'mode': generated_certificate.mode,
-            'uuid': generated_certificate.verify_uuid,
-        }
-        if generated_certificate.grade:
-            cert_status['grade'] = generated_certificate.grade
+    except GeneratedCertificate.DoesNotExist:
+        return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+    return _certificate_status(generated_certificate)
+
+
+def certificate_statuses_for_courses(student, course_ids, course_modes=None):
+    """
+    Returns the certificate statuses of a student in many courses at once,
+    as a dict of the course ids to the statuses returned by
+    `certificate_status_for_student`.
 
-        if generated_certificate.mode == 'audit':
-            course_mode_slugs = [mode.slug for mode in CourseMode.modes_for_course(course_id)]
-            # Short term fix to make sure old audit users with certs still see their certs
-            # only do this if there if no honor mode
-            if 'honor' not in course_mode_slugs:
-                cert_status['status'] = CertificateStatuses.auditing
-                return cert_status
+    course_modes, if given, is a dict of the course ids to the lists of
+    their unexpired modes, used instead of loading the modes of the courses
+    in which the student has an audit certificate.
+    """
+    statuses = {
+        course_id: {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+        for course_id in course_ids
+    }
+    for generated_certificate in GeneratedCertificate.objects.filter(  # pylint: disable=no-member
+            user=student, course_id__in=course_ids
+    ):
+        course_id = generated_certificate.course_id
+        statuses[course_id] = _certificate_status(
+            generated_certificate, course_modes.get(course_id) if course_modes is not None else None
+        )
+    return statuses
 
-        if generated_certificate.status == CertificateStatuses.downloadable:
-            cert_status['download_url'] = generated_certificate.download_url
 
-        return cert_status
+def _certificate_status(generated_certificate, course_modes=None):
+    """
+    Returns the status of the given certificate, as returned by
+    `certificate_status_for_student`.
+    """
+    # Import here instead of top of file since this module gets imported before
+    # the course_modes app is loaded, resulting in a Django deprecation warning.
+    from course_modes.models import CourseMode
 
-    except GeneratedCertificate.DoesNotExist:
-        pass
-    return {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+    cert_status = {
+        'status': generated_certificate.status,
+        'mode': generated_certificate.mode,
+        'uuid': generated_certificate.verify_uuid,
+    }
+    if generated_certificate.grade:
+        cert_status['grade'] = generated_certificate.grade
+
+    if generated_certificate.mode == 'audit':
+        if course_modes is None:
+            course_modes = CourseMode.modes_for_course(generated_certificate.course_id)
+        course_mode_slugs = [mode.slug for mode in course_modes]
+        # Short term fix to make sure old audit users with certs still see their certs
+        # only do this if there if no honor mode
+        if 'honor' not in course_mode_slugs:
+            cert_status['status'] = CertificateStatuses.auditing
+            return cert_status
+
+    if generated_certificate.status == CertificateStatuses.downloadable:
+        cert_status['download_url'] = generated_certificate.download_url
+
+    return cert_status
 
 
 def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
@@ -542,12 +574,24 @@ def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
             user=user, course_id=course_id, whitelist=True
         ).exists()
 
+    return certificate_info_from_status(
+        certificate_status_for_student(user, course_id),
+        grade,
+        user_is_whitelisted,
+        user.profile.allow_certificate,
+    )
+
+
+def certificate_info_from_status(certificate_status, grade, user_is_whitelisted, allow_certificate):
+    """
+    Returns the certificate info for a user for grade report, given their
+    certificate status as returned by `certificate_status_for_student`, and
+    whether they're allowed certificates by their profile.
+    """
     certificate_is_delivered = 'N'
     certificate_type = 'N/A'
-    eligible_for_certificate = 'Y' if (user_is_whitelisted or grade is not None) and user.profile.allow_certificate \
-        else 'N'
+    eligible_for_certificate = 'Y' if (user_is_whitelisted or grade is not None) and allow_certificate else 'N'
 
-    certificate_status = certificate_status_for_student(user, course_id)
     certificate_generated = certificate_status['status'] == CertificateStatuses.downloadable
     if certificate_generated:
         certificate_is_delivered = 'Y'
@@ -556,6 +600,30 @@ def certificate_info_for_user(user, course_id, grade, user_is_whitelisted=None):
     return [eligible_for_certificate, certificate_is_delivered, certificate_type]
 
 
+def certificate_statuses_for_students(user_ids, course_id):
+    """
+    Returns the certificate statuses of many students in a course at once,
+    as a dict of their user ids to the statuses returned by
+    `certificate_status_for_student`.
+    """
+    # Import here instead of top of file since this module gets imported before
+    # the course_modes app is loaded, resulting in a Django deprecation warning.
+    from course_modes.models import CourseMode
+
+    statuses = {
+        user_id: {'status': CertificateStatuses.unavailable, 'mode': GeneratedCertificate.MODES.honor, 'uuid': None}
+        for user_id in user_ids
+    }
+    course_modes = None
+    for generated_certificate in GeneratedCertificate.objects.filter(  # pylint: disable=no-member
+            user_id__in=user_ids, course_id=course_id
+    ).only('user_id', 'course_id', 'status', 'mode', 'verify_uuid', 'grade', 'download_url'):
+        if generated_certificate.mode == 'audit' and course_modes is None:
+            course_modes = CourseMode.modes_for_course(course_id)
+        statuses[generated_certificate.user_id] = _certificate_status(generated_certificate, course_modes)
+    return statuses
+
+
 class ExampleCertificateSet(TimeStampedModel):
     """A set of example certificates.
 
@@ -8,6 +8,7 @@ from courseware import models
 from django.db.models import Count
 from django.utils.translation import ugettext as _
 
+from lms.djangoapps.grades.score_distributions import get_score_distributions
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.inheritance import own_metadata
 from instructor_analytics.csvs import create_csv_response
@@ -32,36 +33,21 @@ def get_problem_grade_distribution(course_id):
         attempting the problem
     """
 
-    # Aggregate query on studentmodule table for grade data for all problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
-    ).values('module_state_key', 'grade', 'max_grade').annotate(count_grade=Count('grade'))
-
     prob_grade_distrib = {}
     total_student_count = {}
 
-    # Loop through resultset building data for each problem
-    for row in db_query:
-        curr_problem = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
-
-        # Build set of grade distributions for each problem that has student responses
-        if curr_problem in prob_grade_distrib:
-            prob_grade_distrib[curr_problem]['grade_distrib'].append((row['grade'], row['count_grade']))
-
-            if (prob_grade_distrib[curr_problem]['max_grade'] != row['max_grade']) and \
-                    (prob_grade_distrib[curr_problem]['max_grade'] < row['max_grade']):
-                prob_grade_distrib[curr_problem]['max_grade'] = row['max_grade']
+    # Build data for each problem that has student responses from its maintained score distribution
+    for curr_problem, score_counts in get_score_distributions(course_id).iteritems():
+        if curr_problem.block_type != 'problem':
+            continue
 
-        else:
-            prob_grade_distrib[curr_problem] = {
-                'max_grade': row['max_grade'],
-                'grade_distrib': [(row['grade'], row['count_grade'])]
-            }
+        prob_grade_distrib[curr_problem] = {
+            'max_grade': max(max_grade for __, max_grade, __ in score_counts),
+            'grade_distrib': [(grade, count_grade) for grade, __, count_grade in score_counts],
+        }
 
         # Build set of total students attempting each problem
-        total_student_count[curr_problem] = total_student_count.get(curr_problem, 0) + row['count_grade']
+        total_student_count[curr_problem] = sum(count_grade for __, __, count_grade in score_counts)
 
     return prob_grade_distrib, total_student_count
 
@@ -105,34 +91,14 @@ def get_problem_set_grade_distrib(course_id, problem_set):
       'grade_distrib' - array of tuples (`grade`,`count`) ordered by `grade`
     """
 
-    # Aggregate query on studentmodule table for grade data for set of problems in course
-    db_query = models.StudentModule.objects.filter(
-        course_id__exact=course_id,
-        grade__isnull=False,
-        module_type__exact="problem",
-        module_state_key__in=problem_set,
-    ).values(
-        'module_state_key',
-        'grade',
-        'max_grade',
-    ).annotate(count_grade=Count('grade')).order_by('module_state_key', 'grade')
-
     prob_grade_distrib = {}
 
-    # Loop through resultset building data for each problem
-    for row in db_query:
-        row_loc = course_id.make_usage_key_from_deprecated_string(row['module_state_key'])
-        if row_loc not in prob_grade_distrib:
-            prob_grade_distrib[row_loc] = {
-                'max_grade': 0,
-                'grade_distrib': [],
-            }
-
-        curr_grade_distrib = prob_grade_distrib[row_loc]
-        curr_grade_distrib['grade_distrib'].append((row['grade'], row['count_grade']))
-
-        if curr_grade_distrib['max_grade'] < row['max_grade']:
-            curr_grade_distrib['max_grade'] = row['max_grade']
+    # Loop through the maintained score distributions of the problems
+    for row_loc, score_counts in get_score_distributions(course_id, problem_set).iteritems():
+        prob_grade_distrib[row_loc] = {
+            'max_grade': max([0] + [max_grade for __, max_grade, __ in score_counts]),
+            'grade_distrib': [(grade, count_grade) for grade, __, count_grade in score_counts],
+        }
 
     return prob_grade_distrib
 
@@ -43,6 +43,7 @@ from courseware.masquerade import (
 )
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from edxmako.shortcuts import render_to_string
+from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.signals.signals import SCORE_PUBLISHED
 from lms.djangoapps.lms_xblock.field_data import LmsFieldData
 from lms.djangoapps.lms_xblock.models import XBlockAsidesConfig
@@ -68,6 +69,7 @@ from util.model_utils import slugify
 from util.sandboxing import can_execute_unsafe_code, get_python_lib_zip
 from xblock.runtime import KvsFieldData
 from xblock_django.user_service import DjangoXBlockUserService
+from xmodule.block_metadata_utils import display_name_with_default_escaped, url_name_for_block
 from xmodule.contentstore.django import contentstore
 from xmodule.error_module import ErrorDescriptor, NonStaffErrorDescriptor
 from xmodule.exceptions import NotFoundError, ProcessingError
@@ -154,78 +156,132 @@ def toc_for_course(user, request, course, active_chapter, active_section, field_
         if course_module is None:
             return None, None, None
 
-        toc_chapters = list()
-        chapters = course_module.get_display_items()
-
-        # Check for content which needs to be completed
-        # before the rest of the content is made available
-        required_content = milestones_helpers.get_required_content(course, user)
-
-        # The user may not actually have to complete the entrance exam, if one is required
-        if not user_must_complete_entrance_exam(request, user, course):
-            required_content = [content for content in required_content if not content == course.entrance_exam_id]
-
-        previous_of_active_section, next_of_active_section = None, None
-        last_processed_section, last_processed_chapter = None, None
-        found_active_section = False
-        for chapter in chapters:
-            # Only show required content, if there is required content
-            # chapter.hide_from_toc is read-only (bool)
-            display_id = slugify(chapter.display_name_with_default_escaped)
-            local_hide_from_toc = False
-            if required_content:
-                if unicode(chapter.location) not in required_content:
-                    local_hide_from_toc = True
-
-            # Skip the current chapter if a hide flag is tripped
-            if chapter.hide_from_toc or local_hide_from_toc:
+        return _build_toc(
+            user,
+            request,
+            course,
+            course_module.get_display_items(),
+            lambda chapter: chapter.get_display_items(),
+            active_chapter,
+            active_section,
+        )
+
+
+def toc_for_course_from_blocks(user, request, course, active_chapter, active_section, block_structure=None):
+    """
+    Returns the same table of contents as toc_for_course, built from the
+    user's transformed block structure of the course instead of from its
+    bound modules, so that neither the modules of the course's chapters and
+    sections nor their student state are loaded.
+
+    The block structure has the collected values of the blocks' fields, so
+    the table of contents doesn't reflect any field overrides (see
+    courseware.field_overrides) of the user.
+
+    block_structure is the user's block structure of the course, if
+    already transformed.
+    """
+    if block_structure is None:
+        block_structure = get_course_blocks(user, course.location)
+    if course.location not in block_structure:
+        return None, None, None
+
+    return _build_toc(
+        user,
+        request,
+        course,
+        [block_structure[chapter_key] for chapter_key in block_structure.get_children(course.location)],
+        lambda chapter: [
+            block_structure[section_key] for section_key in block_structure.get_children(chapter.location)
+        ],
+        active_chapter,
+        active_section,
+    )
+
+
+def _build_toc(user, request, course, chapters, get_sections, active_chapter, active_section):
+    """
+    Returns the table of contents of toc_for_course for the given chapters
+    of the course, and the sections of each chapter returned by
+    get_sections, all of which the user has access to.
+
+    The chapters and sections are either bound modules or the BlockData of
+    the blocks in a block structure (see CourseNavigationTransformer).
+    """
+    toc_chapters = list()
+
+    # Check for content which needs to be completed
+    # before the rest of the content is made available
+    required_content = milestones_helpers.get_required_content(course, user)
+
+    # The user may not actually have to complete the entrance exam, if one is required
+    if not user_must_complete_entrance_exam(request, user, course):
+        required_content = [content for content in required_content if not content == course.entrance_exam_id]
+
+    previous_of_active_section, next_of_active_section = None, None
+    last_processed_section, last_processed_chapter_url_name = None, None
+    found_active_section = False
+    for chapter in chapters:
+        # Only show required content, if there is required content
+        # chapter.hide_from_toc is read-only (bool)
+        chapter_url_name = url_name_for_block(chapter)
+        chapter_display_name = display_name_with_default_escaped(chapter)
+        display_id = slugify(chapter_display_name)
+        local_hide_from_toc = False
+        if required_content:
+            if unicode(chapter.location) not in required_content:
+                local_hide_from_toc = True
+
+        # Skip the current chapter if a hide flag is tripped
+        if chapter.hide_from_toc or local_hide_from_toc:
+            continue
+
+        sections = list()
+        for section in get_sections(chapter):
+            # skip the section if it is hidden from the user
+            if section.hide_from_toc:
                 continue
 
-            sections = list()
-            for section in chapter.get_display_items():
-                # skip the section if it is hidden from the user
-                if section.hide_from_toc:
-                    continue
-
-                is_section_active = (chapter.url_name == active_chapter and section.url_name == active_section)
-                if is_section_active:
-                    found_active_section = True
-
-                section_context = {
-                    'display_name': section.display_name_with_default_escaped,
-                    'url_name': section.url_name,
-                    'format': section.format if section.format is not None else '',
-                    'due': section.due,
-                    'active': is_section_active,
-                    'graded': section.graded,
-                }
-                _add_timed_exam_info(user, course, section, section_context)
-
-                # update next and previous of active section, if applicable
-                if is_section_active:
-                    if last_processed_section:
-                        previous_of_active_section = last_processed_section.copy()
-                        previous_of_active_section['chapter_url_name'] = last_processed_chapter.url_name
-                elif found_active_section and not next_of_active_section:
-                    next_of_active_section = section_context.copy()
-                    next_of_active_section['chapter_url_name'] = chapter.url_name
-
-                sections.append(section_context)
-                last_processed_section = section_context
-                last_processed_chapter = chapter
-
-            toc_chapters.append({
-                'display_name': chapter.display_name_with_default_escaped,
-                'display_id': display_id,
-                'url_name': chapter.url_name,
-                'sections': sections,
-                'active': chapter.url_name == active_chapter
-            })
-        return {
-            'chapters': toc_chapters,
-            'previous_of_active_section': previous_of_active_section,
-            'next_of_active_section': next_of_active_section,
-        }
+            section_url_name = url_name_for_block(section)
+            is_section_active = (chapter_url_name == active_chapter and section_url_name == active_section)
+            if is_section_active:
+                found_active_section = True
+
+            section_context = {
+                'display_name': display_name_with_default_escaped(section),
+                'url_name': section_url_name,
+                'format': section.format if section.format is not None else '',
+                'due': section.due,
+                'active': is_section_active,
+                'graded': section.graded,
+            }
+            _add_timed_exam_info(user, course, section, section_context)
+
+            # update next and previous of active section, if applicable
+            if is_section_active:
+                if last_processed_section:
+                    previous_of_active_section = last_processed_section.copy()
+                    previous_of_active_section['chapter_url_name'] = last_processed_chapter_url_name
+            elif found_active_section and not next_of_active_section:
+                next_of_active_section = section_context.copy()
+                next_of_active_section['chapter_url_name'] = chapter_url_name
+
+            sections.append(section_context)
+            last_processed_section = section_context
+            last_processed_chapter_url_name = chapter_url_name
+
+        toc_chapters.append({
+            'display_name': chapter_display_name,
+            'display_id': display_id,
+            'url_name': chapter_url_name,
+            'sections': sections,
+            'active': chapter_url_name == active_chapter
+        })
+    return {
+        'chapters': toc_chapters,
+        'previous_of_active_section': previous_of_active_section,
+        'next_of_active_section': next_of_active_section,
+    }
 
 
 def _add_timed_exam_info(user, course, section, section_context):
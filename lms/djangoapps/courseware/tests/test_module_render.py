@@ -712,6 +712,21 @@ class TestTOC(ModuleStoreTestCase):
             self.assertEquals(actual['previous_of_active_section']['url_name'], 'Toy_Videos')
             self.assertEquals(actual['next_of_active_section']['url_name'], 'video_123456789012')
 
+    @ddt.data((ModuleStoreEnum.Type.mongo, 3, 0), (ModuleStoreEnum.Type.split, 6, 0))
+    @ddt.unpack
+    def test_toc_from_blocks(self, default_ms, setup_finds, setup_sends):
+        with self.store.default_store(default_ms):
+            self.setup_request_and_course(setup_finds, setup_sends)
+            for section in [None, 'Welcome']:
+                self.assertEqual(
+                    render.toc_for_course_from_blocks(
+                        self.request.user, self.request, self.toy_course, self.chapter, section
+                    ),
+                    render.toc_for_course(
+                        self.request.user, self.request, self.toy_course, self.chapter, section, self.field_data_cache
+                    ),
+                )
+
 
 @attr(shard=1)
 @ddt.ddt
@@ -7,6 +7,7 @@ from urllib import urlencode, quote
 import ddt
 import json
 import itertools
+import pymongo
 import unittest
 from datetime import datetime, timedelta
 from HTMLParser import HTMLParser
@@ -16,11 +17,12 @@ from freezegun import freeze_time
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.http import Http404, HttpResponseBadRequest
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django.test.client import Client
-from django.test.utils import override_settings
+from django.test.utils import CaptureQueriesContext, override_settings
 from mock import MagicMock, patch, create_autospec, PropertyMock
 from opaque_keys.edx.locations import Location, SlashSeparatedCourseKey
 from pytz import UTC
@@ -1872,6 +1874,59 @@ class TestIndexView(ModuleStoreTestCase):
         )
         self.assertIn("Activate Block ID: test_block_id", response.content)
 
+    def _create_course(self, num_chapters):
+        """
+        Creates a course with the given number of chapters of two sections each.
+        """
+        course = CourseFactory.create()
+        for _ in range(num_chapters):
+            chapter = ItemFactory.create(parent=course, category='chapter')
+            for _ in range(2):
+                section = ItemFactory.create(parent=chapter, category='sequential')
+                vertical = ItemFactory.create(parent=section, category='vertical')
+                ItemFactory.create(parent=vertical, category='html')
+        return course
+
+    def _count_queries(self, course):
+        """
+        Returns the numbers of SQL queries and of mongo finds made when the
+        logged in user views the first section of the course.
+        """
+        chapter = course.get_children()[0]
+        url = reverse(
+            'courseware_section',
+            kwargs={
+                'course_id': unicode(course.id),
+                'chapter': chapter.url_name,
+                'section': chapter.get_children()[0].url_name,
+            }
+        )
+        # The first view collects the course's block structure and saves the user's positions.
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            with patch.object(pymongo.message, 'query', wraps=pymongo.message.query) as mongo_finds:
+                self.assertEqual(self.client.get(url).status_code, 200)
+        return len(queries), mongo_finds.call_count
+
+    @ddt.data(ModuleStoreEnum.Type.mongo, ModuleStoreEnum.Type.split)
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_COURSE_BLOCKS_NAVIGATION': True})
+    def test_course_blocks_navigation_queries(self, default_store):
+        """
+        Verify that the queries made by the index view don't grow with the
+        size of the course when the table of contents is built from the
+        course's block structure, since only the course and the requested
+        chapter and section are fetched and bound.
+        """
+        user = UserFactory()
+        with modulestore().default_store(default_store):
+            small_course, large_course = self._create_course(1), self._create_course(4)
+        for course in (small_course, large_course):
+            CourseEnrollmentFactory(user=user, course_id=course.id)
+
+        self.assertTrue(self.client.login(username=user.username, password='test'))
+        self.assertEqual(self._count_queries(large_course), self._count_queries(small_course))
+
 
 @ddt.ddt
 class TestIndexViewWithVerticalPositions(ModuleStoreTestCase):
@@ -1936,6 +1991,7 @@ class TestIndexViewWithVerticalPositions(ModuleStoreTestCase):
         self._assert_correct_position(resp, expected_position)
 
 
+@ddt.ddt
 class TestIndexViewWithGating(ModuleStoreTestCase, MilestonesTestCaseMixin):
     """
     Test the index view for a course with gated content
@@ -1962,21 +2018,23 @@ class TestIndexViewWithGating(ModuleStoreTestCase, MilestonesTestCaseMixin):
 
         CourseEnrollmentFactory(user=self.user, course_id=self.course.id)
 
-    def test_index_with_gated_sequential(self):
+    @ddt.data(False, True)
+    def test_index_with_gated_sequential(self, course_blocks_navigation):
         """
         Test index view with a gated sequential raises Http404
         """
         self.assertTrue(self.client.login(username=self.user.username, password='test'))
-        response = self.client.get(
-            reverse(
-                'courseware_section',
-                kwargs={
-                    'course_id': unicode(self.course.id),
-                    'chapter': self.chapter.url_name,
-                    'section': self.gated_seq.url_name,
-                }
+        with patch.dict(settings.FEATURES, {'ENABLE_COURSE_BLOCKS_NAVIGATION': course_blocks_navigation}):
+            response = self.client.get(
+                reverse(
+                    'courseware_section',
+                    kwargs={
+                        'course_id': unicode(self.course.id),
+                        'chapter': self.chapter.url_name,
+                        'section': self.gated_seq.url_name,
+                    }
+                )
             )
-        )
 
         self.assertEquals(response.status_code, 404)
 
@@ -0,0 +1,48 @@
+"""
+Course Navigation Transformer
+"""
+from openedx.core.lib.block_structure.transformer import BlockStructureTransformer
+
+
+class CourseNavigationTransformer(BlockStructureTransformer):
+    """
+    The CourseNavigationTransformer collects the fields of the chapters and
+    sections of a course that are shown in the courseware's table of contents
+    (see courseware.module_render.toc_for_course_from_blocks).
+
+    No runtime transformations are performed.
+
+    The following values are stored as xblock_fields on their respective blocks
+    in the block structure:
+
+        display_name: (string)
+        due: (datetime) when the section is due.
+        format: (string) what type of assignment the section is.
+        graded: (boolean)
+        hide_from_toc: (boolean)
+        is_time_limited: (boolean) whether the section is a timed exam.
+    """
+    VERSION = 1
+    FIELDS_TO_COLLECT = [u'display_name', u'due', u'format', u'graded', u'hide_from_toc', u'is_time_limited']
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'course_navigation'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to execute this
+        transformer's transform method.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS_TO_COLLECT)
+
+    def transform(self, usage_info, block_structure):
+        """
+        Perform no transformations.
+        """
+        pass
@@ -18,6 +18,7 @@ from django.shortcuts import redirect
 
 from courseware.url_helpers import get_redirect_url_for_global_staff
 from edxmako.shortcuts import render_to_response, render_to_string
+from lms.djangoapps.course_blocks.api import get_course_blocks
 import logging
 import newrelic.agent
 import urllib
@@ -48,7 +49,8 @@ from ..entrance_exams import (
 from ..exceptions import Redirect
 from ..masquerade import setup_masquerade
 from ..model_data import FieldDataCache
-from ..module_render import toc_for_course, get_module_for_descriptor
+from ..field_overrides import OverrideFieldData
+from ..module_render import toc_for_course, toc_for_course_from_blocks, get_module_for_descriptor
 from .views import get_current_child, registered_for_course
 
 
@@ -92,13 +94,21 @@ class CoursewareIndex(View):
         self.section_url_name = section
         self.position = position
         self.chapter, self.section = None, None
+        self.course_blocks = None
         self.url = request.path
 
         try:
             self._init_new_relic()
             self._clean_position()
             with modulestore().bulk_operations(self.course_key):
-                self.course = get_course_with_access(request.user, 'load', self.course_key, depth=CONTENT_DEPTH)
+                # The chapters and sections of the course are only fetched with
+                # it when they're needed to build its table of contents.
+                self.course = get_course_with_access(
+                    request.user,
+                    'load',
+                    self.course_key,
+                    depth=0 if self._course_blocks_navigation_enabled() else CONTENT_DEPTH,
+                )
                 self.is_staff = has_access(request.user, 'staff', self.course)
                 self._setup_masquerade_for_effective_user()
                 return self._get()
@@ -134,7 +144,7 @@ class CoursewareIndex(View):
         self._redirect_if_needed_to_access_course()
         self._prefetch_and_bind_course()
 
-        if self.course.has_children_at_depth(CONTENT_DEPTH):
+        if self._has_content():
             self._reset_section_to_exam_if_required()
             self.chapter = self._find_chapter()
             self.section = self._find_section()
@@ -311,26 +321,147 @@ class CoursewareIndex(View):
             child = get_current_child(parent, min_depth=min_depth, requested_child=self.request.GET.get("child"))
         return child
 
+    def _find_block_key(self, parent, url_name, block_type, min_depth=None):
+        """
+        Finds the usage key of the block in the course's block structure
+        that is the child of the parent with the specified url_name.
+        If not found, finds the parent's current child, as _find_block does.
+        """
+        child_keys = self.course_blocks.get_children(parent.location)
+        child_key = None
+        if url_name:
+            child_key = next((key for key in child_keys if key.block_id == url_name), None)
+            if not child_key:
+                raise Http404('No {block_type} found with name {url_name}'.format(
+                    block_type=block_type,
+                    url_name=url_name,
+                ))
+            elif min_depth and not self._block_has_children_at_depth(child_key, min_depth - 1):
+                child_key = None
+        if not child_key:
+            child_key = self._get_current_child_key(parent, child_keys, min_depth)
+        return child_key
+
+    def _get_current_child_key(self, parent, child_keys, min_depth=None):
+        """
+        Returns the usage key of the parent's current child among the given
+        child_keys of its block in the course's block structure, chosen by
+        the parent's position as get_current_child chooses its current child.
+        """
+        requested_child = self.request.GET.get("child")
+        content_keys = [
+            child_key for child_key in child_keys
+            if not min_depth or self._block_has_children_at_depth(child_key, min_depth - 1)
+        ]
+        if parent.position is not None and not requested_child:
+            position = parent.position - 1  # position is 1-indexed
+            if 0 <= position < len(child_keys) and child_keys[position] in content_keys:
+                return child_keys[position]
+        if content_keys:
+            return content_keys[-1] if requested_child == 'last' else content_keys[0]
+
+    def _block_has_children_at_depth(self, usage_key, depth):
+        """
+        Returns whether the block in the course's block structure has
+        descendants at the given depth, as has_children_at_depth does.
+        """
+        child_keys = self.course_blocks.get_children(usage_key)
+        if depth == 0:
+            return bool(child_keys)
+        return any(self._block_has_children_at_depth(child_key, depth - 1) for child_key in child_keys)
+
+    def _load_block(self, usage_key, block_type):
+        """
+        Returns the block with the given usage key of the course's block
+        structure if the user can load it.
+
+        Blocks the user can't load, such as sequentials gated by
+        prerequisites, are in the block structure, but are not children
+        of their parents' bound modules.
+        """
+        block = modulestore().get_item(usage_key)
+        if not has_access(self.effective_user, 'load', block, self.course_key):
+            raise Http404('No {block_type} found with name {url_name}'.format(
+                block_type=block_type,
+                url_name=usage_key.block_id,
+            ))
+        return block
+
+    def _course_blocks_navigation_enabled(self):
+        """
+        Returns whether the table of contents may be built from the
+        course's block structure.
+        """
+        return settings.FEATURES.get('ENABLE_COURSE_BLOCKS_NAVIGATION', False)
+
+    def _uses_course_blocks_navigation(self):
+        """
+        Returns whether the table of contents is built from the course's
+        block structure rather than from its bound modules.
+
+        Masquerading as a student and field overrides only apply to the
+        bound modules.
+        """
+        return (
+            self._course_blocks_navigation_enabled() and
+            not self._is_masquerading_as_student() and
+            not OverrideFieldData.enabled_for(self.course)
+        )
+
+    def _has_content(self):
+        """
+        Returns whether the course has sections with content.
+        """
+        if self.course_blocks is None:
+            return self.course.has_children_at_depth(CONTENT_DEPTH)
+        return (
+            self.course.location in self.course_blocks and
+            self._block_has_children_at_depth(self.course.location, CONTENT_DEPTH)
+        )
+
     def _find_chapter(self):
         """
         Finds the requested chapter.
         """
-        return self._find_block(self.course, self.chapter_url_name, 'chapter', CONTENT_DEPTH - 1)
+        if self.course_blocks is None:
+            return self._find_block(self.course, self.chapter_url_name, 'chapter', CONTENT_DEPTH - 1)
+
+        chapter_key = self._find_block_key(self.course, self.chapter_url_name, 'chapter', CONTENT_DEPTH - 1)
+        if chapter_key:
+            return self._prefetch_and_bind_chapter(chapter_key)
 
     def _find_section(self):
         """
         Finds the requested section.
         """
         if self.chapter:
-            return self._find_block(self.chapter, self.section_url_name, 'section')
+            if self.course_blocks is None:
+                return self._find_block(self.chapter, self.section_url_name, 'section')
+
+            section_key = self._find_block_key(self.chapter, self.section_url_name, 'section')
+            if section_key:
+                return self._load_block(section_key, 'section')
 
     def _prefetch_and_bind_course(self):
         """
-        Prefetches all descendant data for the requested section and
-        sets up the runtime, which binds the request user to the section.
+        Prefetches the student state of the course and of its chapters and
+        sections and sets up the runtime, which binds the request user to
+        the course.
+
+        When the table of contents is built from the course's block
+        structure, the requested chapter and section are also found in it,
+        so only the student state of the course itself is prefetched.
         """
+        if self._uses_course_blocks_navigation():
+            self.course_blocks = get_course_blocks(self.effective_user, self.course.location)
+            depth = 0
+        else:
+            if self._course_blocks_navigation_enabled():
+                self.course = modulestore().get_course(self.course_key, depth=CONTENT_DEPTH)
+            depth = CONTENT_DEPTH
+
         self.field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
-            self.course_key, self.effective_user, self.course, depth=CONTENT_DEPTH,
+            self.course_key, self.effective_user, self.course, depth=depth,
         )
 
         self.course = get_module_for_descriptor(
@@ -342,6 +473,22 @@ class CoursewareIndex(View):
             course=self.course,
         )
 
+    def _prefetch_and_bind_chapter(self, chapter_key):
+        """
+        Prefetches the student state of the chapter with the given usage key
+        and sets up the runtime, which binds the request user to the chapter.
+        """
+        chapter = self._load_block(chapter_key, 'chapter')
+        self.field_data_cache.add_descriptor_descendents(chapter, depth=0)
+        return get_module_for_descriptor(
+            self.effective_user,
+            self.request,
+            chapter,
+            self.field_data_cache,
+            self.course_key,
+            course=self.course,
+        )
+
     def _prefetch_and_bind_section(self):
         """
         Prefetches all descendant data for the requested section and
@@ -366,8 +513,12 @@ class CoursewareIndex(View):
         """
         Save where we are in the course and chapter.
         """
-        save_child_position(self.course, self.chapter_url_name)
-        save_child_position(self.chapter, self.section_url_name)
+        if self.course_blocks is None:
+            save_child_position(self.course, self.chapter_url_name)
+            save_child_position(self.chapter, self.section_url_name)
+        else:
+            for parent, child_name in ((self.course, self.chapter_url_name), (self.chapter, self.section_url_name)):
+                save_child_position(parent, child_name, self.course_blocks.get_children(parent.location))
 
     def _create_courseware_context(self):
         """
@@ -389,14 +540,24 @@ class CoursewareIndex(View):
             'language_preference': self._get_language_preference(),
             'disable_optimizely': True,
         }
-        table_of_contents = toc_for_course(
-            self.effective_user,
-            self.request,
-            self.course,
-            self.chapter_url_name,
-            self.section_url_name,
-            self.field_data_cache,
-        )
+        if self.course_blocks is not None:
+            table_of_contents = toc_for_course_from_blocks(
+                self.effective_user,
+                self.request,
+                self.course,
+                self.chapter_url_name,
+                self.section_url_name,
+                self.course_blocks,
+            )
+        else:
+            table_of_contents = toc_for_course(
+                self.effective_user,
+                self.request,
+                self.course,
+                self.chapter_url_name,
+                self.section_url_name,
+                self.field_data_cache,
+            )
         courseware_context['accordion'] = render_accordion(
             self.request,
             self.course,
@@ -514,12 +675,16 @@ def render_accordion(request, course, table_of_contents):
     return render_to_string('courseware/accordion.html', context)
 
 
-def save_child_position(seq_module, child_name):
+def save_child_position(seq_module, child_name, child_keys=None):
     """
     child_name: url_name of the child
+    child_keys: usage keys of the children the position is in, if not
+        those of seq_module's display items
     """
-    for position, child in enumerate(seq_module.get_display_items(), start=1):
-        if child.location.name == child_name:
+    if child_keys is None:
+        child_keys = [child.location for child in seq_module.get_display_items()]
+    for position, child_key in enumerate(child_keys, start=1):
+        if child_key.block_id == child_name:
             # Only save if position changed
             if position != seq_module.position:
                 seq_module.position = position
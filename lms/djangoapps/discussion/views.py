@@ -435,7 +435,11 @@ def user_profile(request, course_key, user_id):
         threads, page, num_pages = profiled_user.active_threads(query_params)
         query_params['page'] = page
         query_params['num_pages'] = num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
+        requester = cc.User.from_django_user(request.user)
+        if not request.is_ajax():
+            # Both users are shown on the page, so retrieve them at once.
+            cc.User.retrieve_all([requester, profiled_user])
+        user_info = requester.to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(course_key, threads, request.user, user_info)
@@ -522,7 +526,11 @@ def followed_threads(request, course_key, user_id):
         print paginated_results
         query_params['page'] = paginated_results.page
         query_params['num_pages'] = paginated_results.num_pages
-        user_info = cc.User.from_django_user(request.user).to_dict()
+        requester = cc.User.from_django_user(request.user)
+        if not request.is_ajax():
+            # Both users are shown on the page, so retrieve them at once.
+            cc.User.retrieve_all([requester, profiled_user])
+        user_info = requester.to_dict()
 
         with newrelic.agent.FunctionTrace(nr_transaction, "get_metadata_for_threads"):
             annotated_content_info = utils.get_metadata_for_threads(
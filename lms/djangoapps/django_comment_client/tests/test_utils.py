@@ -16,7 +16,10 @@ from django_comment_client.tests.factories import RoleFactory
 from django_comment_client.tests.unicode import UnicodeTestMixin
 from django_comment_client.constants import TYPE_ENTRY, TYPE_SUBCATEGORY
 import django_comment_client.utils as utils
-from lms.lib.comment_client.utils import perform_request, CommentClientMaintenanceError
+from lms.lib.comment_client import utils as comment_client_utils
+from lms.lib.comment_client.utils import (
+    perform_request, perform_requests, CommentClientMaintenanceError, CommentClientRequestError
+)
 from django_comment_common.models import ForumsConfig
 
 from courseware.tests.factories import InstructorFactory
@@ -322,6 +325,18 @@ class CachedDiscussionIdMapTestCase(ModuleStoreTestCase):
         self.assertFalse(utils.discussion_category_id_access(self.course, user, 'private_discussion_id'))
 
 
+@mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_DISCUSSION_INDEX': True})
+class IndexedDiscussionIdMapTestCase(CachedDiscussionIdMapTestCase):
+    """
+    Tests that reading the discussions accessible to users from their block structures of the course has the same
+    behavior as loading them from the modulestore.
+    """
+    def test_category_map(self):
+        indexed_category_map = utils.get_discussion_category_map(self.course, self.user)
+        with mock.patch.dict('django.conf.settings.FEATURES', {'ENABLE_DISCUSSION_INDEX': False}):
+            self.assertEqual(indexed_category_map, utils.get_discussion_category_map(self.course, self.user))
+
+
 class CategoryMapTestMixin(object):
     """
     Provides functionality for classes that test
@@ -1456,3 +1471,70 @@ class ClientConfigurationTestCase(TestCase):
 
         result = perform_request('GET', 'http://www.google.com')
         self.assertEqual(result, {})
+
+
+@patch('lms.lib.comment_client.utils._session', None)
+@patch('lms.lib.comment_client.utils._request_pool', None)
+class ClientConnectionsTestCase(TestCase):
+    """Test cases for the pooled connections and batched requests to the comment service."""
+
+    def setUp(self):
+        super(ClientConnectionsTestCase, self).setUp()
+        config = ForumsConfig.current()
+        config.enabled = True
+        config.save()
+
+    @staticmethod
+    def _response(url, **kwargs):  # pylint: disable=unused-argument
+        """Returns a successful response echoing the requested url."""
+        response = Mock()
+        response.status_code = 200
+        response.json = lambda: {'url': url}
+        return response
+
+    @patch('requests.Session.request')
+    @patch('requests.request')
+    def test_not_pooled(self, mock_request, mock_session_request):
+        """Ensures that requests don't share a session by default."""
+        mock_request.side_effect = lambda method, url, **kwargs: self._response(url)
+
+        self.assertIsNone(comment_client_utils.get_session())
+        self.assertEqual(
+            perform_requests('get', [('http://localhost/a', {}, None), ('http://localhost/b', {}, None)]),
+            [{'url': 'http://localhost/a'}, {'url': 'http://localhost/b'}],
+        )
+        self.assertEqual(mock_request.call_count, 2)
+        self.assertFalse(mock_session_request.called)
+
+    @patch('requests.Session.request')
+    def test_pooled(self, mock_session_request):
+        """Ensures that pooled requests, single or batched, share a session."""
+        mock_session_request.side_effect = lambda method, url, **kwargs: self._response(url)
+
+        with self.settings(COMMENTS_SERVICE_CONNECTION_SETTINGS={'POOL_CONNECTIONS': True, 'POOL_SIZE': 2}):
+            session = comment_client_utils.get_session()
+            self.assertIsNotNone(session)
+            self.assertIs(comment_client_utils.get_session(), session)
+
+            self.assertEqual(perform_request('get', 'http://localhost/a'), {'url': 'http://localhost/a'})
+            urls = ['http://localhost/{}'.format(index) for index in range(5)]
+            self.assertEqual(
+                perform_requests('get', [(url, {}, None) for url in urls]),
+                [{'url': url} for url in urls],
+            )
+            # Batches share the threads of the process.
+            request_pool = comment_client_utils._get_request_pool()  # pylint: disable=protected-access
+            perform_requests('get', [(url, {}, None) for url in urls])
+            self.assertIs(comment_client_utils._get_request_pool(), request_pool)  # pylint: disable=protected-access
+        self.assertEqual(mock_session_request.call_count, 11)
+
+    @patch('requests.request')
+    def test_batch_failure(self, mock_request):
+        """Ensures that the error of a failed request of a batch is raised."""
+        failure = Mock()
+        failure.status_code = 404
+        failure.text = 'not found'
+        mock_request.side_effect = [self._response('http://localhost/a'), failure]
+
+        with self.assertRaises(CommentClientRequestError):
+            perform_requests('get', [('http://localhost/a', {}, None), ('http://localhost/b', {}, None)])
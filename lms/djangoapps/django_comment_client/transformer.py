@@ -0,0 +1,51 @@
+"""
+Discussion Index Transformer
+"""
+from openedx.core.lib.block_structure.transformer import BlockStructureTransformer
+
+
+class DiscussionIndexTransformer(BlockStructureTransformer):
+    """
+    The DiscussionIndexTransformer collects the fields of the inline
+    discussions of a course that the discussion id and category maps are
+    built from (see django_comment_client.utils), so that the discussions
+    a user has access to can be read from their transformed block structure
+    of the course.  The collected data is updated along with the rest of
+    the block structure when the course is published.
+
+    No runtime transformations are performed.
+
+    The following values are stored as xblock_fields on their respective blocks
+    in the block structure:
+
+        discussion_id: (string)
+        discussion_category: (string) the category path of the discussion,
+            separated with slashes.
+        discussion_target: (string) the title of the discussion.
+        sort_key: (string)
+        start: (datetime) the start date of the discussion.
+    """
+    VERSION = 1
+    FIELDS_TO_COLLECT = [u'discussion_id', u'discussion_category', u'discussion_target', u'sort_key', u'start']
+
+    @classmethod
+    def name(cls):
+        """
+        Unique identifier for the transformer's class;
+        same identifier used in setup.py.
+        """
+        return u'discussion_index'
+
+    @classmethod
+    def collect(cls, block_structure):
+        """
+        Collects any information that's necessary to execute this
+        transformer's transform method.
+        """
+        block_structure.request_xblock_fields(*cls.FIELDS_TO_COLLECT)
+
+    def transform(self, usage_info, block_structure):
+        """
+        Perform no transformations.
+        """
+        pass
@@ -23,6 +23,7 @@ from edxmako import lookup_template
 
 from courseware import courses
 from courseware.access import has_access
+from lms.djangoapps.course_blocks.api import get_course_blocks
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups.cohorts import (
     get_course_cohort_settings, get_cohort_by_id, get_cohort_id, is_course_cohorted
@@ -129,7 +130,15 @@ def get_accessible_discussion_xblocks(course, user, include_all=False):  # pylin
     """
     Return a list of all valid discussion xblocks in this course that
     are accessible to the given user.
+
+    When the ENABLE_DISCUSSION_INDEX feature is enabled, the discussions
+    accessible to the user are the BlockData of the discussion blocks in
+    their transformed block structure of the course instead (see
+    DiscussionIndexTransformer).
     """
+    if not include_all and _uses_discussion_index():
+        return _get_indexed_discussion_blocks(course.location, user)
+
     all_xblocks = modulestore().get_items(course.id, qualifiers={'category': 'discussion'}, include_orphans=False)
 
     return [
@@ -138,6 +147,28 @@ def get_accessible_discussion_xblocks(course, user, include_all=False):  # pylin
     ]
 
 
+def _uses_discussion_index():
+    """
+    Returns whether the discussions accessible to users are read from their
+    block structures of the course.
+    """
+    return settings.FEATURES.get('ENABLE_DISCUSSION_INDEX', False)
+
+
+@request_cached
+def _get_indexed_discussion_blocks(course_usage_key, user):
+    """
+    Returns the BlockData of the valid discussion blocks in the user's
+    transformed block structure of the course, in course order.
+    """
+    block_structure = get_course_blocks(user, course_usage_key)
+    return [
+        block_structure[block_key]
+        for block_key in block_structure.topological_traversal()
+        if block_key.block_type == 'discussion' and has_required_keys(block_structure[block_key])
+    ]
+
+
 def get_discussion_id_map_entry(xblock):
     """
     Returns a tuple of (discussion_id, metadata) suitable for inclusion in the results of get_discussion_id_map().
@@ -178,6 +209,14 @@ def get_cached_discussion_id_map(course, discussion_ids, user):
     Returns a dict mapping discussion_ids to respective discussion xblock metadata if it is cached and visible to the
     user. If not, returns the result of get_discussion_id_map
     """
+    if _uses_discussion_index():
+        discussion_id_map = get_discussion_id_map(course, user)
+        return {
+            discussion_id: discussion_id_map[discussion_id]
+            for discussion_id in discussion_ids
+            if discussion_id in discussion_id_map
+        }
+
     try:
         entries = []
         for discussion_id in discussion_ids:
@@ -403,6 +442,10 @@ def discussion_category_id_access(course, user, discussion_id, xblock=None):
     """
     if discussion_id in course.top_level_discussion_topic_ids:
         return True
+    if not xblock and _uses_discussion_index():
+        return any(
+            block.discussion_id == discussion_id for block in _get_indexed_discussion_blocks(course.location, user)
+        )
     try:
         if not xblock:
             key = get_cached_discussion_key(course.id, discussion_id)
@@ -15,8 +15,10 @@ class GradesConfig(AppConfig):
 
     def ready(self):
         """
-        Connect handlers to recalculate grades.
+        Connect handlers to recalculate grades, and to rebuild score
+        distributions if enabled.
         """
         # Can't import models at module level in AppConfigs, and models get
         # included from the signal handlers
-        from .signals import handlers  # pylint: disable=unused-variable
+        from .signals import handlers
+        handlers.connect_score_distribution_handlers()
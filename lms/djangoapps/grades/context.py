@@ -2,9 +2,15 @@
 Grading Context
 """
 from collections import OrderedDict
+from copy import deepcopy
 from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
+from openedx.core.lib.cache_utils import lru_memoized
 
 from .scores import possibly_scored
+from .transformer import GradesTransformer
+
+# Maximum number of courses whose grading context is kept in the process.
+COURSE_GRADING_CONTEXTS_MAXSIZE = 100
 
 
 def grading_context_for_course(course_key):
@@ -69,3 +75,78 @@ def grading_context(course_structure):
         'all_graded_subsections_by_type': all_graded_subsections_by_type,
         'all_graded_blocks': all_graded_blocks,
     }
+
+
+class CourseGradingContext(object):
+    """
+    Everything needed to grade learners in a course that's the same for all
+    of them: the course's grader, its sorted grade cutoffs, the hash of its
+    grading policy and its grading context.
+
+    Use course_grading_context to get the one shared by all learners graded
+    in a version of the course.
+    """
+    def __init__(self, course, collected_block_structure):
+        self.course_id = course.id
+
+        # Grading policy might be overriden by a CCX, need to reset it
+        course.set_grading_policy(course.grading_policy)
+        self.grader = course.grader
+
+        grade_cutoffs = course.grade_cutoffs
+        # Possible grades, sorted in descending order of score
+        self.descending_grade_cutoffs = sorted(grade_cutoffs.items(), key=lambda item: item[1], reverse=True)
+        nonzero_cutoffs = [cutoff for cutoff in grade_cutoffs.values() if cutoff > 0]
+        self.success_cutoff = min(nonzero_cutoffs) if nonzero_cutoffs else None
+
+        self.grading_policy_hash = collected_block_structure.get_transformer_block_field(
+            course.location,
+            GradesTransformer,
+            'grading_policy_hash'
+        )
+        self.grading_context = grading_context(collected_block_structure)
+        graded_subsections_by_type = self.grading_context['all_graded_subsections_by_type']
+        self.subsection_formats = {
+            subsection_info['subsection_block'].location: subsection_format
+            for subsection_format, subsection_infos in graded_subsections_by_type.iteritems()
+            for subsection_info in subsection_infos
+        }
+
+    def letter_grade(self, percentage):
+        """
+        Returns a letter grade as defined in the grading policy (e.g. 'A' 'B'
+        'C' for 6.002x) for the given final percent, or None.
+        """
+        for possible_grade, cutoff in self.descending_grade_cutoffs:
+            if percentage >= cutoff:
+                return possible_grade
+        return None
+
+
+@lru_memoized(
+    maxsize=COURSE_GRADING_CONTEXTS_MAXSIZE,
+    # Courses whose version isn't known aren't cached.
+    key=lambda course, collected_block_structure=None: course.id if _course_version(course) is not None else None,
+    # The grading policy is copied since it's updated in place.
+    version=lambda course, collected_block_structure=None: (_course_version(course), deepcopy(course.grading_policy)),
+)
+def course_grading_context(course, collected_block_structure=None):
+    """
+    Returns the CourseGradingContext of the given course, built once for each
+    version and grading policy of the course and shared by everything
+    grading it in this process.
+
+    The collected block structure of the course is only needed, and fetched
+    from the cache if not given, when the context is built.
+    """
+    return CourseGradingContext(course, collected_block_structure or get_course_in_cache(course.id))
+
+
+def _course_version(course):
+    """
+    Returns the version of the given course: its version in the split
+    modulestore, or the time its content was last edited otherwise, or None
+    if neither is known.
+    """
+    course_version = getattr(course, 'course_version', None) or getattr(course, 'subtree_edited_on', None)
+    return unicode(course_version) if course_version is not None else None
@@ -0,0 +1,31 @@
+"""
+Management command to clear the score distributions of courses, so that
+they are built again from the stored scores when next read.
+"""
+from django.core.management.base import BaseCommand
+from opaque_keys.edx.keys import CourseKey
+
+from lms.djangoapps.grades.score_distributions import clear_score_distributions
+
+
+class Command(BaseCommand):
+    """
+    Management command to clear score distributions.
+    """
+    help = """
+    Clears the score distributions of the given courses, or of all courses,
+    so that they are built again when next read.
+
+    Run it after enabling FEATURES['CLASS_DASHBOARD'] again, since the score
+    distributions aren't rebuilt as scores change while it is disabled.
+
+    Example:
+      ./manage.py lms clear_score_distributions course-v1:edX+DemoX+Demo_Course --settings=devstack
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('course_ids', nargs='*', help='Course ids; all courses if none are given.')
+
+    def handle(self, *args, **options):
+        course_ids = options['course_ids']
+        clear_score_distributions([CourseKey.from_string(course_id) for course_id in course_ids] or None)
@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageKeyField
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('grades', '0008_persistentsubsectiongrade_first_attempted'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseScoreDistributions',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('course_id', CourseKeyField(unique=True, max_length=255)),
+                ('built', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScoreDistribution',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('course_id', CourseKeyField(max_length=255)),
+                ('usage_key', UsageKeyField(max_length=255)),
+                ('earned', models.FloatField()),
+                ('possible', models.FloatField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='scoredistribution',
+            unique_together=set([('course_id', 'usage_key', 'earned', 'possible')]),
+        ),
+    ]
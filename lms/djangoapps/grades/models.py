@@ -9,14 +9,17 @@ persisted, course grades are also immune to changes in course content.
 """
 
 from base64 import b64encode
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
 from hashlib import sha1
 import json
 from lazy import lazy
 import logging
+import threading
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models, router
+from django.db.models.signals import post_migrate
+from django.dispatch import receiver
 from django.utils.timezone import now
 from eventtracking import tracker
 from model_utils.models import TimeStampedModel
@@ -26,12 +29,23 @@ from coursewarehistoryextended.fields import UnsignedBigIntAutoField
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageKeyField
 
+from .signals.signals import SUBSECTION_GRADES_BULK_CREATED
+
 
 log = logging.getLogger(__name__)
 
 
 BLOCK_RECORD_LIST_VERSION = 1
 
+# The hashes of the VisibleBlocks of each course known to be committed to the
+# database, for the most recently graded courses. VisibleBlocks are never
+# deleted, so they are kept until the course is among the least recently used.
+_VISIBLE_BLOCKS_HASHES = OrderedDict()
+_VISIBLE_BLOCKS_HASHES_LOCK = threading.Lock()
+
+# The number of courses whose VisibleBlocks hashes are kept by a process.
+VISIBLE_BLOCKS_HASHES_MAX_COURSES = 20
+
 # Used to serialize information about a block at the time it was used in
 # grade calculation.
 BlockRecord = namedtuple('BlockRecord', ['locator', 'weight', 'raw_possible', 'graded'])
@@ -135,6 +149,7 @@ class VisibleBlocksQuerySet(models.QuerySet):
             hashed=blocks.hash_value,
             defaults={u'blocks_json': blocks.json_value, u'course_id': blocks.course_key},
         )
+        VisibleBlocks.add_known_hashes(blocks.course_key, [blocks.hash_value])
         return model
 
 
@@ -201,10 +216,72 @@ class VisibleBlocks(models.Model):
         Bulk creates VisibleBlocks for the given iterator of
         BlockRecordList objects for the given course_key, but
         only for those that aren't already created.
+
+        The database is only queried for those that aren't known
+        to exist.
+        """
+        known_hashes = cls.known_hashes(course_key)
+        unknown_brls = {
+            brl.hash_value: brl for brl in block_record_lists if brl.hash_value not in known_hashes
+        }
+        if not unknown_brls:
+            return
+        existent_hashes = set(
+            cls.objects.filter(hashed__in=unknown_brls.keys()).values_list('hashed', flat=True)
+        )
+        cls.bulk_create(brl for hash_value, brl in unknown_brls.iteritems() if hash_value not in existent_hashes)
+        cls.add_known_hashes(course_key, unknown_brls.keys())
+
+    @classmethod
+    def known_hashes(cls, course_key):
+        """
+        Returns the hashes of the VisibleBlocks of the given course known to
+        be committed to the database, which are read from it the first time
+        they're needed outside of a transaction, and kept while the course is
+        among the VISIBLE_BLOCKS_HASHES_MAX_COURSES most recently used.
+        """
+        with _VISIBLE_BLOCKS_HASHES_LOCK:
+            hashes = _VISIBLE_BLOCKS_HASHES.pop(course_key, None)
+            if hashes is not None:
+                # Mark the course as the most recently used.
+                _VISIBLE_BLOCKS_HASHES[course_key] = hashes
+                return hashes
+        if cls._in_transaction():
+            return frozenset()
+
+        hashes = set(cls.bulk_read(course_key).values_list('hashed', flat=True))
+        with _VISIBLE_BLOCKS_HASHES_LOCK:
+            hashes = _VISIBLE_BLOCKS_HASHES.setdefault(course_key, hashes)
+            while len(_VISIBLE_BLOCKS_HASHES) > VISIBLE_BLOCKS_HASHES_MAX_COURSES:
+                _VISIBLE_BLOCKS_HASHES.popitem(last=False)
+        return hashes
+
+    @classmethod
+    def add_known_hashes(cls, course_key, hashes):
         """
-        existent_records = {record.hashed: record for record in cls.bulk_read(course_key)}
-        non_existent_brls = {brl for brl in block_record_lists if brl.hash_value not in existent_records}
-        cls.bulk_create(non_existent_brls)
+        Records that the VisibleBlocks with the given hashes exist in the
+        given course, if they're committed to the database, which is only
+        known outside of a transaction.
+        """
+        if not cls._in_transaction():
+            cls.known_hashes(course_key).update(hashes)
+
+    @classmethod
+    def _in_transaction(cls):
+        """
+        Returns whether writes of VisibleBlocks are in a transaction, and
+        could still be rolled back.
+        """
+        return connections[router.db_for_write(cls)].in_atomic_block
+
+
+@receiver(post_migrate)
+def _forget_visible_blocks_hashes(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Forgets the known hashes of VisibleBlocks, whose table may have been flushed.
+    """
+    with _VISIBLE_BLOCKS_HASHES_LOCK:
+        _VISIBLE_BLOCKS_HASHES.clear()
 
 
 class PersistentSubsectionGrade(TimeStampedModel):
@@ -326,6 +403,20 @@ class PersistentSubsectionGrade(TimeStampedModel):
             course_id=course_key,
         )
 
+    @classmethod
+    def bulk_read_grades_for_users(cls, user_ids, course_key):
+        """
+        Reads all grades for the given users and course.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_key: The course identifier for the desired grades
+        """
+        return cls.objects.select_related('visible_blocks').filter(
+            user_id__in=user_ids,
+            course_id=course_key,
+        )
+
     @classmethod
     def update_or_create_grade(cls, **params):
         """
@@ -382,6 +473,7 @@ class PersistentSubsectionGrade(TimeStampedModel):
         for grade in grades:
             grade.full_clean()
         grades = cls.objects.bulk_create(grades)
+        SUBSECTION_GRADES_BULK_CREATED.send(sender=cls, course_key=course_key, grades=grades)
         for grade in grades:
             cls._emit_grade_calculated_event(grade)
         return grades
@@ -393,7 +485,10 @@ class PersistentSubsectionGrade(TimeStampedModel):
         creating the related VisibleBlocks, if needed.
         """
         cls._prepare_params(params)
-        params['visible_blocks'] = VisibleBlocks.objects.create_from_blockrecords(params['visible_blocks'])
+        if params['visible_blocks'].hash_value in VisibleBlocks.known_hashes(params['course_id']):
+            cls._prepare_params_visible_blocks_id(params)
+        else:
+            params['visible_blocks'] = VisibleBlocks.objects.create_from_blockrecords(params['visible_blocks'])
 
     @classmethod
     def _prepare_params(cls, params):
@@ -515,6 +610,17 @@ class PersistentCourseGrade(TimeStampedModel):
         """
         return cls.objects.get(user_id=user_id, course_id=course_id)
 
+    @classmethod
+    def bulk_read_course_grades(cls, user_ids, course_id):
+        """
+        Reads the grades of the given users in the given course.
+
+        Arguments:
+            user_ids: The users associated with the desired grades
+            course_id: The id of the course associated with the desired grades
+        """
+        return cls.objects.filter(user_id__in=user_ids, course_id=course_id)
+
     @classmethod
     def update_or_create_course_grade(cls, user_id, course_id, **kwargs):
         """
@@ -557,3 +663,69 @@ class PersistentCourseGrade(TimeStampedModel):
                 'grading_policy_hash': unicode(grade.grading_policy_hash),
             }
         )
+
+
+class ScoreDistribution(models.Model):
+    """
+    A django model counting the learners with each score in a scored block
+    of a course: the learners with a raw score on a problem, or with an
+    attempted grade on a subsection.
+
+    Counts are rebuilt from the stored scores shortly after they change,
+    once the distributions of the course are built (see
+    CourseScoreDistributions), while the class dashboard is enabled.
+    """
+    class Meta(object):
+        app_label = "grades"
+        unique_together = [
+            ('course_id', 'usage_key', 'earned', 'possible'),
+        ]
+
+    course_id = CourseKeyField(blank=False, max_length=255)
+    usage_key = UsageKeyField(blank=False, max_length=255)
+    earned = models.FloatField(blank=False)
+    possible = models.FloatField(blank=False)
+    count = models.IntegerField(default=0)
+
+    def __unicode__(self):
+        """
+        Returns a string representation of this model.
+        """
+        return u"{} course: {}, block: {}, {}/{}: {}".format(
+            type(self).__name__, self.course_id, self.usage_key, self.earned, self.possible, self.count,
+        )
+
+    @classmethod
+    def read_distributions(cls, course_id, usage_keys=None):
+        """
+        Returns the counts of the scores of the given blocks of the given
+        course, or of all of its blocks, ordered by block and score.
+        """
+        counts = cls.objects.filter(course_id=course_id, count__gt=0)
+        if usage_keys is not None:
+            counts = counts.filter(usage_key__in=usage_keys)
+        return counts.order_by('usage_key', 'earned', 'possible')
+
+
+class CourseScoreDistributions(models.Model):
+    """
+    A django model recording that the score distributions of a course were
+    built, last from the scores stored at the given time, and are rebuilt
+    as the scores change.
+
+    Counts aren't rebuilt while the class dashboard is disabled, so
+    the distributions need to be cleared (see the clear_score_distributions
+    management command) when it is enabled again, to be rebuilt when next
+    read.
+    """
+    class Meta(object):
+        app_label = "grades"
+
+    course_id = CourseKeyField(blank=False, max_length=255, unique=True)
+    built = models.DateTimeField(auto_now_add=True)
+
+    def __unicode__(self):
+        """
+        Returns a string representation of this model.
+        """
+        return u"{} course: {}, built: {}".format(type(self).__name__, self.course_id, self.built)
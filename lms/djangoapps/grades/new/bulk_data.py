@@ -0,0 +1,129 @@
+"""
+Data for grading a chunk of students in a course at once.
+"""
+from collections import defaultdict
+from lazy import lazy
+
+from courseware.model_data import ScoresClient
+from lms.djangoapps.grades.models import PersistentCourseGrade, PersistentSubsectionGrade
+from lms.djangoapps.grades.scores import possibly_scored
+from student.models import anonymous_id_for_user
+from submissions.models import ScoreSummary
+
+
+class BulkGradingData(object):
+    """
+    The scores and persisted grades of a chunk of students in a course,
+    each fetched for all of the students at once, the first time they're
+    needed for any of them.
+
+    The collected block structure of the course is also shared, so that
+    each student's course structure is only transformed from it.
+    """
+    def __init__(self, course, students, collected_block_structure):
+        self.course = course
+        self.students = list(students)
+        self.collected_block_structure = collected_block_structure
+
+    def csm_scores(self, student):
+        """
+        Returns the ScoresClient of the given student.
+        """
+        return self._csm_scores[student.id]
+
+    def submissions_scores(self, student):
+        """
+        Returns the scores stored by the Submissions API for the given student,
+        in the same format as `submissions.api.get_scores`.
+        """
+        return self._submissions_scores.get(self._anonymous_user_id(student), {})
+
+    def subsection_grades(self, student):
+        """
+        Returns a dict of subsection usage keys to the persisted
+        subsection grades of the given student.
+        """
+        return {
+            record.full_usage_key: record
+            for record in self._subsection_grades.get(student.id, [])
+        }
+
+    def course_grade(self, student):
+        """
+        Returns the persisted course grade of the given student.
+
+        Raises PersistentCourseGrade.DoesNotExist if there is none.
+        """
+        try:
+            return self._course_grades[student.id]
+        except KeyError:
+            raise PersistentCourseGrade.DoesNotExist
+
+    @lazy
+    def _csm_scores(self):
+        """
+        Queries the scores stored in the user state (in CSM) for
+        all of the students.
+        """
+        # Scorable blocks of the collected structure include those
+        # of every student's course structure.
+        scorable_locations = [
+            block_key for block_key in self.collected_block_structure if possibly_scored(block_key)
+        ]
+        return ScoresClient.create_for_users_and_locations(
+            self.course.id,
+            [student.id for student in self.students],
+            scorable_locations,
+        )
+
+    @lazy
+    def _submissions_scores(self):
+        """
+        Queries the scores stored by the Submissions API for all of the
+        students, as `submissions.api.get_scores` does for one of them.
+        """
+        score_summaries = ScoreSummary.objects.filter(
+            student_item__course_id=unicode(self.course.id),
+            student_item__student_id__in=[self._anonymous_user_id(student) for student in self.students],
+        ).select_related('latest', 'student_item')
+
+        scores = defaultdict(dict)
+        for summary in score_summaries:
+            if not summary.latest.is_hidden():
+                scores[summary.student_item.student_id][summary.student_item.item_id] = (
+                    summary.latest.points_earned, summary.latest.points_possible
+                )
+        return scores
+
+    @lazy
+    def _subsection_grades(self):
+        """
+        Queries the persisted subsection grades of all of the students.
+        """
+        grades = defaultdict(list)
+        for record in PersistentSubsectionGrade.bulk_read_grades_for_users(
+                [student.id for student in self.students], self.course.id
+        ):
+            grades[record.user_id].append(record)
+        return grades
+
+    @lazy
+    def _course_grades(self):
+        """
+        Queries the persisted course grades of all of the students.
+        """
+        return {
+            grade.user_id: grade
+            for grade in PersistentCourseGrade.bulk_read_course_grades(
+                [student.id for student in self.students], self.course.id
+            )
+        }
+
+    def _anonymous_user_id(self, student):
+        """
+        Returns the anonymous id of the given student in the course, under
+        which their submissions are stored.
+        """
+        # The id only needs to be computed, not saved, since the student has
+        # already been given it if they made any submissions.
+        return anonymous_id_for_user(student, self.course.id, save=False)
@@ -3,6 +3,7 @@ CourseGrade Class
 """
 
 from collections import defaultdict, namedtuple, OrderedDict
+from itertools import islice
 from logging import getLogger
 
 from django.conf import settings
@@ -12,22 +13,27 @@ from lazy import lazy
 
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
+from openedx.core.djangoapps.content.block_structure.api import get_course_in_cache
 from openedx.core.djangoapps.signals.signals import COURSE_GRADE_CHANGED
 from xmodule import block_metadata_utils
 
+from ..context import course_grading_context
 from ..models import PersistentCourseGrade
+from .bulk_data import BulkGradingData
 from .subsection_grade import SubsectionGradeFactory
-from ..transformer import GradesTransformer
 
 
 log = getLogger(__name__)
 
+# The number of students graded together by CourseGradeFactory.iter.
+BULK_GRADING_CHUNK_SIZE = 100
+
 
 class CourseGrade(object):
     """
     Course Grade class
     """
-    def __init__(self, student, course, course_structure):
+    def __init__(self, student, course, course_structure, bulk_data=None):
         self.student = student
         self.course = course
         self.course_version = getattr(course, 'course_version', None)
@@ -35,7 +41,18 @@ class CourseGrade(object):
         self.course_structure = course_structure
         self._percent = None
         self._letter_grade = None
-        self._subsection_grade_factory = SubsectionGradeFactory(self.student, self.course, self.course_structure)
+        self._collected_block_structure = bulk_data.collected_block_structure if bulk_data else None
+        self._subsection_grade_factory = SubsectionGradeFactory(
+            self.student, self.course, self.course_structure, bulk_data,
+        )
+
+    @lazy
+    def grading_context(self):
+        """
+        Returns the CourseGradingContext of the course, shared with the
+        course grades of other students.
+        """
+        return course_grading_context(self.course, self._collected_block_structure)
 
     @lazy
     def graded_subsections_by_format(self):
@@ -43,13 +60,16 @@ class CourseGrade(object):
         Returns grades for the subsections in the course in
         a dict keyed by subsection format types.
         """
+        # The formats of the course's graded subsections, shared by all students.
+        subsection_formats = self.grading_context.subsection_formats
         subsections_by_format = defaultdict(OrderedDict)
         for chapter in self.chapter_grades:
             for subsection_grade in chapter['sections']:
-                if subsection_grade.graded:
+                if subsection_grade.location in subsection_formats:
                     graded_total = subsection_grade.graded_total
                     if graded_total.possible > 0:
-                        subsections_by_format[subsection_grade.format][subsection_grade.location] = subsection_grade
+                        subsection_format = subsection_formats[subsection_grade.location]
+                        subsections_by_format[subsection_format][subsection_grade.location] = subsection_grade
         return subsections_by_format
 
     @lazy
@@ -68,9 +88,7 @@ class CourseGrade(object):
         """
         Helper function to extract the grade value as calculated by the course's grader.
         """
-        # Grading policy might be overriden by a CCX, need to reset it
-        self.course.set_grading_policy(self.course.grading_policy)
-        grade_value = self.course.grader.grade(
+        grade_value = self.grading_context.grader.grade(
             self.graded_subsections_by_format,
             generate_random_scores=settings.GENERATE_PROFILE_SCORES
         )
@@ -126,8 +144,7 @@ class CourseGrade(object):
         """
         Check user's course passing status. Return True if passed.
         """
-        nonzero_cutoffs = [cutoff for cutoff in self.course.grade_cutoffs.values() if cutoff > 0]
-        success_cutoff = min(nonzero_cutoffs) if nonzero_cutoffs else None
+        success_cutoff = self.grading_context.success_cutoff
         return success_cutoff and self.percent >= success_cutoff
 
     @property
@@ -155,7 +172,7 @@ class CourseGrade(object):
         blocks_total = len(self.locations_to_scores)
         if not read_only:
             self._subsection_grade_factory.bulk_create_unsaved()
-            grading_policy_hash = self.get_grading_policy_hash(self.course.location, self.course_structure)
+            grading_policy_hash = self.grading_context.grading_policy_hash
             PersistentCourseGrade.update_or_create_course_grade(
                 user_id=self.student.id,
                 course_id=self.course.id,
@@ -202,20 +219,8 @@ class CourseGrade(object):
             possible += child_possible
         return earned, possible
 
-    @staticmethod
-    def get_grading_policy_hash(course_location, course_structure):
-        """
-        Gets the grading policy of the course at the given location
-        in the given course structure.
-        """
-        return course_structure.get_transformer_block_field(
-            course_location,
-            GradesTransformer,
-            'grading_policy_hash'
-        )
-
     @classmethod
-    def load_persisted_grade(cls, user, course, course_structure):
+    def load_persisted_grade(cls, user, course, course_structure, bulk_data=None):
         """
         Initializes a CourseGrade object, filling its members with persisted values from the database.
 
@@ -224,12 +229,15 @@ class CourseGrade(object):
         If no persisted values are found, returns None.
         """
         try:
-            persistent_grade = PersistentCourseGrade.read_course_grade(user.id, course.id)
+            if bulk_data:
+                persistent_grade = bulk_data.course_grade(user)
+            else:
+                persistent_grade = PersistentCourseGrade.read_course_grade(user.id, course.id)
         except PersistentCourseGrade.DoesNotExist:
             return None
-        course_grade = CourseGrade(user, course, course_structure)
+        course_grade = CourseGrade(user, course, course_structure, bulk_data)
 
-        current_grading_policy_hash = course_grade.get_grading_policy_hash(course.location, course_structure)
+        current_grading_policy_hash = course_grade.grading_context.grading_policy_hash
         if current_grading_policy_hash != persistent_grade.grading_policy_hash:
             return None
         else:
@@ -273,22 +281,9 @@ class CourseGrade(object):
         Returns a letter grade as defined in grading_policy (e.g. 'A' 'B' 'C' for 6.002x) or None.
 
         Arguments
-        - grade_cutoffs is a dictionary mapping a grade to the lowest
-            possible percentage to earn that grade.
         - percentage is the final percent across all problems in a course
         """
-
-        letter_grade = None
-        grade_cutoffs = self.course.grade_cutoffs
-
-        # Possible grades, sorted in descending order of score
-        descending_grades = sorted(grade_cutoffs, key=lambda x: grade_cutoffs[x], reverse=True)
-        for possible_grade in descending_grades:
-            if percentage >= grade_cutoffs[possible_grade]:
-                letter_grade = possible_grade
-                break
-
-        return letter_grade
+        return self.grading_context.letter_grade(percentage)
 
     def _signal_listeners_when_grade_computed(self):
         """
@@ -323,25 +318,30 @@ class CourseGradeFactory(object):
     """
     Factory class to create Course Grade objects
     """
-    def create(self, student, course, read_only=True):
+    def create(self, student, course, read_only=True, bulk_data=None):
         """
         Returns the CourseGrade object for the given student and course.
 
         If read_only is True, doesn't save any updates to the grades.
+        If bulk_data (BulkGradingData) is given, the student's data is taken from it.
         Raises a PermissionDenied if the user does not have course access.
         """
-        course_structure = get_course_blocks(student, course.location)
+        course_structure = get_course_blocks(
+            student,
+            course.location,
+            collected_block_structure=bulk_data.collected_block_structure if bulk_data else None,
+        )
         # if user does not have access to this course, throw an exception
         if not self._user_has_access_to_course(course_structure):
             raise PermissionDenied("User does not have access to this course")
         return (
-            self._get_saved_grade(student, course, course_structure) or
-            self._compute_and_update_grade(student, course, course_structure, read_only)
+            self._get_saved_grade(student, course, course_structure, bulk_data) or
+            self._compute_and_update_grade(student, course, course_structure, read_only, bulk_data)
         )
 
     GradeResult = namedtuple('GradeResult', ['student', 'course_grade', 'err_msg'])
 
-    def iter(self, course, students):
+    def iter(self, course, students, chunk_size=BULK_GRADING_CHUNK_SIZE):
         """
         Given a course and an iterable of students (User), yield a GradeResult
         for every student enrolled in the course.  GradeResult is a named tuple of:
@@ -350,25 +350,38 @@ class CourseGradeFactory(object):
 
         If an error occurred, course_grade will be None and err_msg will be an
         exception message. If there was no error, err_msg is an empty string.
+
+        Students are graded in chunks of chunk_size students, sharing the
+        course's collected block structure, and with the scores and persisted
+        grades of each chunk fetched for all of its students at once.  If
+        chunk_size is None, each student is graded on their own.
         """
-        for student in students:
-            with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=[u'action:{}'.format(course.id)]):
-
-                try:
-                    course_grade = CourseGradeFactory().create(student, course)
-                    yield self.GradeResult(student, course_grade, "")
-
-                except Exception as exc:  # pylint: disable=broad-except
-                    # Keep marching on even if this student couldn't be graded for
-                    # some reason, but log it for future reference.
-                    log.exception(
-                        'Cannot grade student %s (%s) in course %s because of exception: %s',
-                        student.username,
-                        student.id,
-                        course.id,
-                        exc.message
-                    )
-                    yield self.GradeResult(student, None, exc.message)
+        collected_block_structure = get_course_in_cache(course.id) if chunk_size else None
+        for chunk in self._chunks(students, chunk_size):
+            bulk_data = BulkGradingData(course, chunk, collected_block_structure) if chunk_size else None
+            for student in chunk:
+                with dog_stats_api.timer('lms.grades.CourseGradeFactory.iter', tags=[u'action:{}'.format(course.id)]):
+                    yield self._grade_result(student, course, bulk_data)
+
+    def _grade_result(self, student, course, bulk_data):
+        """
+        Returns the GradeResult of the given student, for iter.
+        """
+        try:
+            course_grade = self.create(student, course, bulk_data=bulk_data)
+            return self.GradeResult(student, course_grade, "")
+
+        except Exception as exc:  # pylint: disable=broad-except
+            # Keep marching on even if this student couldn't be graded for
+            # some reason, but log it for future reference.
+            log.exception(
+                'Cannot grade student %s (%s) in course %s because of exception: %s',
+                student.username,
+                student.id,
+                course.id,
+                exc.message
+            )
+            return self.GradeResult(student, None, exc.message)
 
     def update(self, student, course, course_structure):
         """
@@ -386,7 +399,20 @@ class CourseGradeFactory(object):
 
         return CourseGrade.get_persisted_grade(student, course)
 
-    def _get_saved_grade(self, student, course, course_structure):
+    @staticmethod
+    def _chunks(students, chunk_size):
+        """
+        Yields lists of chunk_size students from the given iterable of
+        students, or lists of one student if chunk_size is None.
+        """
+        students = iter(students)
+        while True:
+            chunk = list(islice(students, chunk_size or 1))
+            if not chunk:
+                return
+            yield chunk
+
+    def _get_saved_grade(self, student, course, course_structure, bulk_data=None):
         """
         Returns the saved grade for the given course and student.
         """
@@ -396,16 +422,17 @@ class CourseGradeFactory(object):
         return CourseGrade.load_persisted_grade(
             student,
             course,
-            course_structure
+            course_structure,
+            bulk_data,
         )
 
-    def _compute_and_update_grade(self, student, course, course_structure, read_only=False):
+    def _compute_and_update_grade(self, student, course, course_structure, read_only=False, bulk_data=None):
         """
         Freshly computes and updates the grade for the student and course.
 
         If read_only is True, doesn't save any updates to the grades.
         """
-        course_grade = CourseGrade(student, course, course_structure)
+        course_grade = CourseGrade(student, course, course_structure, bulk_data)
         course_grade.compute_and_update(read_only)
         return course_grade
 
@@ -196,11 +196,15 @@ class SubsectionGrade(object):
 class SubsectionGradeFactory(object):
     """
     Factory for Subsection Grades.
+
+    If bulk_data (BulkGradingData) is given, the student's scores and
+    persisted grades are taken from it, rather than queried for the student.
     """
-    def __init__(self, student, course, course_structure):
+    def __init__(self, student, course, course_structure, bulk_data=None):
         self.student = student
         self.course = course
         self.course_structure = course_structure
+        self._bulk_data = bulk_data
 
         self._cached_subsection_grades = None
         self._unsaved_subsection_grades = []
@@ -277,6 +281,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns all the scores stored in the user
         state (in CSM) for the course, while caching the result.
         """
+        if self._bulk_data:
+            return self._bulk_data.csm_scores(self.student)
         scorable_locations = [block_key for block_key in self.course_structure if possibly_scored(block_key)]
         return ScoresClient.create_for_locations(self.course.id, self.student.id, scorable_locations)
 
@@ -286,6 +292,8 @@ class SubsectionGradeFactory(object):
         Lazily queries and returns the scores stored by the
         Submissions API for the course, while caching the result.
         """
+        if self._bulk_data:
+            return self._bulk_data.submissions_scores(self.student)
         anonymous_user_id = anonymous_id_for_user(self.student, self.course.id)
         return submissions_api.get_scores(unicode(self.course.id), anonymous_user_id)
 
@@ -311,7 +319,9 @@ class SubsectionGradeFactory(object):
         Returns and caches (for future access) the results of
         a bulk retrieval of all subsection grades in the course.
         """
-        if self._cached_subsection_grades is None:
+        if self._cached_subsection_grades is None and self._bulk_data:
+            self._cached_subsection_grades = self._bulk_data.subsection_grades(self.student)
+        elif self._cached_subsection_grades is None:
             self._cached_subsection_grades = {
                 record.full_usage_key: record
                 for record in PersistentSubsectionGrade.bulk_read_grades(self.student.id, self.course.id)
@@ -0,0 +1,103 @@
+"""
+Score changes of a learner in a course that are waiting for their
+subsection grades to be recalculated, kept in the cache so that a single
+task recalculates the subsection grades for all of those that happen
+within a short time of each other.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+# Long enough for the pending score changes to outlive any recalculation
+# delay, and for the index of the last one taken to outlive the gaps
+# between a learner's submissions.
+PENDING_SCORE_CHANGES_TIMEOUT = 24 * 60 * 60
+
+# Time allowed, besides the recalculation delay, for a scheduled task to
+# start and take the pending score changes.  If it is lost, the score
+# changes added after this time schedule a new task, which takes all of
+# them.
+SCHEDULED_TASK_TIMEOUT_MARGIN = 5 * 60
+
+
+def _scheduled_task_timeout():
+    """
+    Returns the number of seconds a scheduled task is expected to take
+    the pending score changes within.
+    """
+    return 2 * (settings.RECALCULATE_GRADES_COALESCE_DELAY or 0) + SCHEDULED_TASK_TIMEOUT_MARGIN
+
+
+class PendingScoreChanges(object):
+    """
+    The pending score changes of a learner in a course.
+
+    Each score change is stored under its own key, at an index given by a
+    counter in the cache, so that score changes added concurrently don't
+    overwrite each other.  A separate key records that a recalculation
+    task is scheduled, so that only the first score change added after
+    the last one taken schedules one.  That key expires shortly after the
+    task should have run, in case the task was lost.
+    """
+    def __init__(self, user_id, course_id):
+        self._key_prefix = u'grades.pending_score_changes.{}.{}'.format(user_id, course_id)
+
+    def add(self, score_change):
+        """
+        Adds the given score change, a dict of the arguments of the
+        recalculate_subsection_grade task, and returns whether a task
+        needs to be scheduled to recalculate the subsection grades for it,
+        which is the case unless one already is.
+
+        Raises ValueError if the cache can't hold the score changes, in
+        which case the subsection grades need to be recalculated on their
+        own for the score change.
+        """
+        try:
+            index = cache.incr(self._key('last'))
+        except ValueError:
+            cache.add(self._key('last'), 0, PENDING_SCORE_CHANGES_TIMEOUT)
+            index = cache.incr(self._key('last'))
+
+        cache.set(self._key(index), score_change, PENDING_SCORE_CHANGES_TIMEOUT)
+        return cache.add(self._key('scheduled'), True, _scheduled_task_timeout())
+
+    def take(self):
+        """
+        Removes and returns the pending score changes, in the order they
+        were added.
+
+        Any score change added from now on schedules a new task.
+        """
+        cache.delete(self._key('scheduled'))
+        last_index = cache.get(self._key('last'), 0)
+        taken_index = cache.get(self._key('taken'), 0)
+        if taken_index > last_index:
+            # The counter expired and was restarted.
+            taken_index = 0
+        missing_index = cache.get(self._key('missing'))
+
+        indexes = range(taken_index + 1, last_index + 1)
+        stored_score_changes = cache.get_many([self._key(index) for index in indexes])
+        score_changes = []
+        for index in indexes:
+            score_change = stored_score_changes.get(self._key(index))
+            if score_change is None:
+                if index != missing_index:
+                    # The score change was counted but not stored yet: the task that
+                    # it schedules, since ours is no longer scheduled, takes it.
+                    cache.set(self._key('missing'), index, PENDING_SCORE_CHANGES_TIMEOUT)
+                    break
+                # It was already missing for the previous task, so it was evicted from the cache.
+            else:
+                score_changes.append(score_change)
+            taken_index = index
+
+        cache.set(self._key('taken'), taken_index, PENDING_SCORE_CHANGES_TIMEOUT)
+        cache.delete_many([self._key(index) for index in indexes if index <= taken_index])
+        return score_changes
+
+    def _key(self, suffix):
+        """
+        Returns the cache key of the given index or counter.
+        """
+        return u'{}.{}'.format(self._key_prefix, suffix)
@@ -0,0 +1,115 @@
+"""
+Distributions of the scores of learners on the problems and subsections of
+a course, built from the scores stored for the course when first read and
+rebuilt by a task shortly after they change (see
+grades.tasks.enqueue_score_distributions_update), so that they don't need
+to be aggregated when read.
+"""
+from collections import OrderedDict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.utils.timezone import now
+
+from courseware.models import StudentModule
+
+from .models import CourseScoreDistributions, PersistentSubsectionGrade, ScoreDistribution
+
+
+def get_score_distributions(course_key, usage_keys=None):
+    """
+    Returns an OrderedDict of the usage keys of the given blocks of the
+    given course, or of all of its blocks, to lists of (earned, possible,
+    count) tuples, ordered by score, of the number of learners with each
+    score on the block.
+
+    Blocks no learner has a score on are left out.  The distributions of
+    the course are built first if they haven't been.
+    """
+    if not CourseScoreDistributions.objects.filter(course_id=course_key).exists():
+        build_score_distributions(course_key)
+
+    distributions = OrderedDict()
+    for score_count in ScoreDistribution.read_distributions(course_key, usage_keys):
+        usage_key = score_count.usage_key.map_into_course(course_key)
+        distributions.setdefault(usage_key, []).append(
+            (score_count.earned, score_count.possible, score_count.count)
+        )
+    return distributions
+
+
+def build_score_distributions(course_key):
+    """
+    Builds the score distributions of the given course from its scores
+    stored in the courseware StudentModule and its persisted subsection
+    grades, replacing those built previously.
+    """
+    # Recorded as built first, so that the scores that change while they
+    # are aggregated schedule a rebuild.
+    CourseScoreDistributions.objects.get_or_create(course_id=course_key)
+
+    problem_scores = StudentModule.objects.filter(
+        course_id=course_key,
+        module_type='problem',
+        grade__isnull=False,
+        max_grade__isnull=False,
+    ).values('module_state_key', 'grade', 'max_grade').annotate(count=Count('id'))
+    subsection_scores = PersistentSubsectionGrade.objects.filter(
+        course_id=course_key,
+        first_attempted__isnull=False,
+    ).values('usage_key', 'earned_all', 'possible_all').annotate(count=Count('id'))
+
+    score_counts = [
+        ScoreDistribution(
+            course_id=course_key,
+            usage_key=row['module_state_key'],
+            earned=row['grade'],
+            possible=row['max_grade'],
+            count=row['count'],
+        )
+        for row in problem_scores
+    ] + [
+        ScoreDistribution(
+            course_id=course_key,
+            usage_key=row['usage_key'],
+            earned=row['earned_all'],
+            possible=row['possible_all'],
+            count=row['count'],
+        )
+        for row in subsection_scores
+    ]
+
+    try:
+        with transaction.atomic():
+            ScoreDistribution.objects.filter(course_id=course_key).delete()
+            ScoreDistribution.objects.bulk_create(score_counts)
+            CourseScoreDistributions.objects.filter(course_id=course_key).update(built=now())
+    except IntegrityError:
+        # The distributions were built concurrently.
+        pass
+
+
+def rebuild_score_distributions(course_key):
+    """
+    Builds the score distributions of the given course again from its
+    stored scores, if they were built.  Otherwise, they're built when
+    first read.
+    """
+    if CourseScoreDistributions.objects.filter(course_id=course_key).exists():
+        build_score_distributions(course_key)
+
+
+def clear_score_distributions(course_keys=None):
+    """
+    Clears the score distributions of the given courses, or of all courses,
+    so that they are built again when next read.
+    """
+    built_distributions = CourseScoreDistributions.objects.all()
+    score_counts = ScoreDistribution.objects.all()
+    if course_keys is not None:
+        built_distributions = built_distributions.filter(course_id__in=course_keys)
+        score_counts = score_counts.filter(course_id__in=course_keys)
+    with transaction.atomic():
+        built_distributions.delete()
+        score_counts.delete()
+
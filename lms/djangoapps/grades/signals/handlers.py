@@ -4,11 +4,14 @@ Grades related signals.
 
 from logging import getLogger
 
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from openedx.core.lib.grade_utils import is_score_higher
 from submissions.models import score_set, score_reset
 
 from courseware.model_data import get_score, set_score
+from courseware.models import StudentModule
 from eventtracking import tracker
 from student.models import user_by_anonymous_id
 from track.event_transaction_utils import (
@@ -22,10 +25,16 @@ from .signals import (
     PROBLEM_WEIGHTED_SCORE_CHANGED,
     SUBSECTION_SCORE_CHANGED,
     SCORE_PUBLISHED,
+    SUBSECTION_GRADES_BULK_CREATED,
 )
+from ..models import PersistentSubsectionGrade
 from ..new.course_grade import CourseGradeFactory
 from ..scores import weighted_score
-from ..tasks import recalculate_subsection_grade
+from ..tasks import (
+    enqueue_coalesced_subsection_grade_update,
+    enqueue_score_distributions_update,
+    recalculate_subsection_grade,
+)
 
 log = getLogger(__name__)
 
@@ -167,19 +176,21 @@ def enqueue_subsection_update(sender, **kwargs):  # pylint: disable=unused-argum
     enqueueing a subsection update operation to occur asynchronously.
     """
     _emit_problem_submitted_event(kwargs)
-    result = recalculate_subsection_grade.apply_async(
-        kwargs=dict(
-            user_id=kwargs['user_id'],
-            course_id=kwargs['course_id'],
-            usage_id=kwargs['usage_id'],
-            only_if_higher=kwargs.get('only_if_higher'),
-            weighted_earned=kwargs.get('weighted_earned'),
-            weighted_possible=kwargs.get('weighted_possible'),
-            score_deleted=kwargs.get('score_deleted', False),
-            event_transaction_id=unicode(get_event_transaction_id()),
-            event_transaction_type=unicode(get_event_transaction_type()),
-        )
+    task_kwargs = dict(
+        user_id=kwargs['user_id'],
+        course_id=kwargs['course_id'],
+        usage_id=kwargs['usage_id'],
+        only_if_higher=kwargs.get('only_if_higher'),
+        weighted_earned=kwargs.get('weighted_earned'),
+        weighted_possible=kwargs.get('weighted_possible'),
+        score_deleted=kwargs.get('score_deleted', False),
+        event_transaction_id=unicode(get_event_transaction_id()),
+        event_transaction_type=unicode(get_event_transaction_type()),
     )
+    if settings.RECALCULATE_GRADES_COALESCE_DELAY:
+        result = enqueue_coalesced_subsection_grade_update(task_kwargs)
+    else:
+        result = recalculate_subsection_grade.apply_async(kwargs=task_kwargs)
     log.info(
         u'Grades: Request async calculation of subsection grades with args: {}. Task [{}]'.format(
             ', '.join('{}:{}'.format(arg, kwargs[arg]) for arg in sorted(kwargs)),
@@ -222,3 +233,39 @@ def _emit_problem_submitted_event(kwargs):
                 'weighted_possible': kwargs.get('weighted_possible'),
             }
         )
+
+
+def connect_score_distribution_handlers():
+    """
+    Connects the handlers that schedule rebuilds of the score distributions
+    of courses as their stored scores change, if the class dashboard, which
+    reads them, is enabled.
+    """
+    if not settings.FEATURES.get('CLASS_DASHBOARD'):
+        return
+    for sender in (StudentModule, PersistentSubsectionGrade):
+        for signal in (post_save, post_delete):
+            signal.connect(
+                schedule_score_distributions_update, sender=sender, dispatch_uid='schedule_score_distributions_update',
+            )
+    SUBSECTION_GRADES_BULK_CREATED.connect(
+        schedule_bulk_created_score_distributions_update, dispatch_uid='schedule_score_distributions_update',
+    )
+
+
+def schedule_score_distributions_update(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Schedules a rebuild of the score distributions of the course of a saved
+    or deleted StudentModule of a problem or subsection grade.
+    """
+    if isinstance(instance, StudentModule) and instance.module_type != 'problem':
+        return
+    enqueue_score_distributions_update(instance.course_id)
+
+
+def schedule_bulk_created_score_distributions_update(sender, course_key, **kwargs):  # pylint: disable=unused-argument
+    """
+    Schedules a rebuild of the score distributions of a course whose
+    subsection grades were created in bulk.
+    """
+    enqueue_score_distributions_update(course_key)
@@ -70,3 +70,13 @@ SUBSECTION_SCORE_CHANGED = Signal(
         'subsection_grade',  # SubsectionGrade object
     ]
 )
+
+
+# Signal that indicates that subsection grades of a course were created in
+# bulk, for which no post_save signal is sent.
+SUBSECTION_GRADES_BULK_CREATED = Signal(
+    providing_args=[
+        'course_key',  # CourseKey object
+        'grades',  # list of PersistentSubsectionGrade objects
+    ]
+)
@@ -3,8 +3,10 @@ This module contains tasks for asynchronous execution of grade updates.
 """
 
 from celery import task
+import dogstats_wrapper as dog_stats_api
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.db.utils import DatabaseError
 from logging import getLogger
 
@@ -21,6 +23,8 @@ from xmodule.modulestore.django import modulestore
 
 from .config.models import PersistentGradesEnabledFlag
 from .new.subsection_grade import SubsectionGradeFactory
+from .pending_score_changes import SCHEDULED_TASK_TIMEOUT_MARGIN, PendingScoreChanges
+from .score_distributions import rebuild_score_distributions
 from .signals.signals import SUBSECTION_SCORE_CHANGED
 from .transformer import GradesTransformer
 
@@ -78,17 +82,170 @@ def recalculate_subsection_grade(
             user_id, course_id, usage_id, only_if_higher, weighted_earned, weighted_possible, score_deleted,
         )
 
-    _update_subsection_grades(
-        course_key,
-        scored_block_usage_key,
-        only_if_higher,
-        course_id,
+    try:
+        _update_subsection_grades(
+            course_key, [scored_block_usage_key], only_if_higher, user_id, sender=recalculate_subsection_grade,
+        )
+    except DatabaseError as exc:
+        raise _retry_recalculate_subsection_grade(
+            user_id,
+            course_id,
+            usage_id,
+            only_if_higher,
+            weighted_earned,
+            weighted_possible,
+            score_deleted,
+            exc,
+        )
+
+
+def enqueue_coalesced_subsection_grade_update(score_change):
+    """
+    Adds the given score change, a dict of the arguments of the
+    recalculate_subsection_grade task, to the pending score changes of
+    its learner in its course, and schedules a task to recalculate the
+    subsection grades for all of them after
+    settings.RECALCULATE_GRADES_COALESCE_DELAY seconds, unless one is
+    already scheduled.
+
+    Returns the result of the task scheduled, or None if the score change
+    was merged into those of a task already scheduled.
+    """
+    user_id, course_id = score_change['user_id'], score_change['course_id']
+    try:
+        needs_task = PendingScoreChanges(user_id, course_id).add(score_change)
+    except ValueError:
+        log.warning(
+            u'Grades: Unable to coalesce the score change of user %s in course %s. Recalculating it on its own.',
+            user_id,
+            course_id,
+        )
+        return recalculate_subsection_grade.apply_async(kwargs=score_change)
+
+    if not needs_task:
+        dog_stats_api.increment('lms.grades.coalesced_recalculation.merged', tags=[u'course_id:{}'.format(course_id)])
+        return None
+    return recalculate_coalesced_subsection_grades.apply_async(
+        kwargs=dict(user_id=user_id, course_id=course_id),
+        countdown=settings.RECALCULATE_GRADES_COALESCE_DELAY,
+    )
+
+
+@task(default_retry_delay=30, routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY)
+def recalculate_coalesced_subsection_grades(user_id, course_id, score_changes=None):
+    """
+    Updates the saved subsection grades affected by the pending score
+    changes of a learner in a course, taking them from the cache unless
+    given (when the task is retried).
+
+    Each affected subsection grade is updated once, however many of the
+    score changes affect it.  The event transaction of the last score
+    change is used for the events emitted.
+
+    Arguments:
+        user_id (int): id of applicable User object
+        course_id (string): identifying the course
+        score_changes (list): the arguments of the recalculate_subsection_grade
+            task for each of the score changes.
+    """
+    if score_changes is None:
+        score_changes = PendingScoreChanges(user_id, course_id).take()
+        if not score_changes:
+            return
+        dog_stats_api.histogram(
+            'lms.grades.coalesced_recalculation.score_changes',
+            len(score_changes),
+            tags=[u'course_id:{}'.format(course_id)],
+        )
+
+    course_key = CourseLocator.from_string(course_id)
+    if not PersistentGradesEnabledFlag.feature_enabled(course_key):
+        return
+
+    set_event_transaction_id(score_changes[-1].get('event_transaction_id'))
+    set_event_transaction_type(score_changes[-1].get('event_transaction_type'))
+    # The latest score change of each block, since the score changes are in order.
+    latest_score_changes = {
+        UsageKey.from_string(score_change['usage_id']).replace(course_key=course_key): score_change
+        for score_change in score_changes
+    }
+    scored_block_usage_keys = set(latest_score_changes)
+    # Grades are only kept from being lowered if none of the score changes allows it.
+    only_if_higher = all(score_change.get('only_if_higher') for score_change in score_changes)
+
+    # Verify the database has been updated with the latest score of each
+    # block, as in recalculate_subsection_grade.  Earlier score changes of a
+    # block were superseded, so the database no longer has their scores.
+    for scored_block_usage_key, score_change in latest_score_changes.iteritems():
+        if not _has_database_updated_with_new_score(
+                user_id,
+                scored_block_usage_key,
+                score_change['weighted_earned'],
+                score_change['weighted_possible'],
+                score_change['score_deleted'],
+        ):
+            raise recalculate_coalesced_subsection_grades.retry(
+                kwargs=dict(user_id=user_id, course_id=course_id, score_changes=score_changes),
+            )
+
+    log.info(
+        u'Grades: Recalculating subsection grades of user %s in course %s for %d score changes of %d blocks.',
         user_id,
-        usage_id,
-        weighted_earned,
-        weighted_possible,
-        score_deleted,
+        course_id,
+        len(score_changes),
+        len(scored_block_usage_keys),
     )
+    try:
+        _update_subsection_grades(
+            course_key,
+            scored_block_usage_keys,
+            only_if_higher,
+            user_id,
+            sender=recalculate_coalesced_subsection_grades,
+        )
+    except DatabaseError as exc:
+        raise recalculate_coalesced_subsection_grades.retry(
+            kwargs=dict(user_id=user_id, course_id=course_id, score_changes=score_changes),
+            exc=exc,
+        )
+
+
+def enqueue_score_distributions_update(course_id):
+    """
+    Schedules a task to rebuild the score distributions of the given course
+    after settings.SCORE_DISTRIBUTIONS_UPDATE_DELAY seconds, unless one is
+    already scheduled, so that the scores that change in the meantime are
+    aggregated once.
+
+    Returns the result of the task scheduled, or None if one already is.
+    """
+    delay = settings.SCORE_DISTRIBUTIONS_UPDATE_DELAY
+    # The key expires shortly after the task should have run, in case it was lost.
+    if not cache.add(_score_distributions_update_key(course_id), True, 2 * delay + SCHEDULED_TASK_TIMEOUT_MARGIN):
+        return None
+    return update_score_distributions.apply_async(kwargs=dict(course_id=unicode(course_id)), countdown=delay)
+
+
+@task(routing_key=settings.RECALCULATE_GRADES_ROUTING_KEY)
+def update_score_distributions(course_id):
+    """
+    Rebuilds the score distributions of a course from its stored scores,
+    if they were built (see grades.score_distributions).
+
+    Arguments:
+        course_id (string): identifying the course
+    """
+    # Any score changed from now on schedules a new task.
+    cache.delete(_score_distributions_update_key(course_id))
+    rebuild_score_distributions(CourseLocator.from_string(course_id))
+
+
+def _score_distributions_update_key(course_id):
+    """
+    Returns the cache key recording that a task to update the score
+    distributions of the given course is scheduled.
+    """
+    return u'grades.score_distributions.update_scheduled.{}'.format(course_id)
 
 
 def _has_database_updated_with_new_score(
@@ -104,60 +261,41 @@ def _has_database_updated_with_new_score(
     return True
 
 
-def _update_subsection_grades(
-        course_key,
-        scored_block_usage_key,
-        only_if_higher,
-        course_id,
-        user_id,
-        usage_id,
-        weighted_earned,
-        weighted_possible,
-        score_deleted,
-):
+def _update_subsection_grades(course_key, scored_block_usage_keys, only_if_higher, user_id, sender):
     """
     A helper function to update subsection grades in the database
-    for each subsection containing the given block, and to signal
-    that those subsection grades were updated.
+    for each subsection containing any of the given blocks, and to
+    signal that those subsection grades were updated.
+
+    Raises DatabaseError if a subsection grade can't be saved.
     """
     student = User.objects.get(id=user_id)
     course_structure = get_course_blocks(student, modulestore().make_course_usage_key(course_key))
-    subsections_to_update = course_structure.get_transformer_block_field(
-        scored_block_usage_key,
-        GradesTransformer,
-        'subsections',
-        set(),
-    )
+    subsections_to_update = set()
+    for scored_block_usage_key in scored_block_usage_keys:
+        subsections_to_update.update(course_structure.get_transformer_block_field(
+            scored_block_usage_key,
+            GradesTransformer,
+            'subsections',
+            set(),
+        ))
 
     course = modulestore().get_course(course_key, depth=0)
     subsection_grade_factory = SubsectionGradeFactory(student, course, course_structure)
 
-    try:
-        for subsection_usage_key in subsections_to_update:
-            if subsection_usage_key in course_structure:
-                subsection_grade = subsection_grade_factory.update(
-                    course_structure[subsection_usage_key],
-                    only_if_higher,
-                )
-                SUBSECTION_SCORE_CHANGED.send(
-                    sender=recalculate_subsection_grade,
-                    course=course,
-                    course_structure=course_structure,
-                    user=student,
-                    subsection_grade=subsection_grade,
-                )
-
-    except DatabaseError as exc:
-        raise _retry_recalculate_subsection_grade(
-            user_id,
-            course_id,
-            usage_id,
-            only_if_higher,
-            weighted_earned,
-            weighted_possible,
-            score_deleted,
-            exc,
-        )
+    for subsection_usage_key in subsections_to_update:
+        if subsection_usage_key in course_structure:
+            subsection_grade = subsection_grade_factory.update(
+                course_structure[subsection_usage_key],
+                only_if_higher,
+            )
+            SUBSECTION_SCORE_CHANGED.send(
+                sender=sender,
+                course=course,
+                course_structure=course_structure,
+                user=student,
+                subsection_grade=subsection_grade,
+            )
 
 
 def _retry_recalculate_subsection_grade(
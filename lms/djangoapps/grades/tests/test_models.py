@@ -189,6 +189,42 @@ class VisibleBlocksTest(GradesModelTestCase):
         with self.assertRaises(AttributeError):
             visible_blocks.blocks = expected_blocks
 
+    @patch('lms.djangoapps.grades.models.VisibleBlocks._in_transaction', return_value=False)
+    @patch.dict('lms.djangoapps.grades.models._VISIBLE_BLOCKS_HASHES', clear=True)
+    def test_bulk_get_or_create_known_hashes(self, _):
+        """
+        Ensures that VisibleBlocks known to exist aren't looked up again.
+        """
+        stored_blocks = BlockRecordList.from_list([self.record_a], self.course_key)
+        self._create_block_record_list(stored_blocks)
+        new_blocks = BlockRecordList.from_list([self.record_b], self.course_key)
+
+        # Only the new blocks are looked up and created.
+        with self.assertNumQueries(2):
+            VisibleBlocks.bulk_get_or_create([stored_blocks, new_blocks, new_blocks], self.course_key)
+        self.assertEqual(
+            set(VisibleBlocks.bulk_read(self.course_key).values_list('hashed', flat=True)),
+            {stored_blocks.hash_value, new_blocks.hash_value},
+        )
+        with self.assertNumQueries(0):
+            VisibleBlocks.bulk_get_or_create([stored_blocks, new_blocks], self.course_key)
+
+    @patch('lms.djangoapps.grades.models.VisibleBlocks._in_transaction', return_value=False)
+    @patch('lms.djangoapps.grades.models.VISIBLE_BLOCKS_HASHES_MAX_COURSES', 1)
+    @patch.dict('lms.djangoapps.grades.models._VISIBLE_BLOCKS_HASHES', clear=True)
+    def test_known_hashes_least_recently_used_course_evicted(self, _):
+        """
+        Ensures that the hashes of only the most recently used courses are kept.
+        """
+        other_course_key = CourseLocator(org='other_org', course='other_course', run='other_run')
+        with self.assertNumQueries(1):
+            VisibleBlocks.known_hashes(self.course_key)
+            VisibleBlocks.known_hashes(self.course_key)
+        with self.assertNumQueries(1):
+            VisibleBlocks.known_hashes(other_course_key)
+        with self.assertNumQueries(1):
+            VisibleBlocks.known_hashes(self.course_key)
+
 
 @ddt.ddt
 class PersistentSubsectionGradeTest(GradesModelTestCase):
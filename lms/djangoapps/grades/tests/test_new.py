@@ -7,13 +7,16 @@ import datetime
 
 import ddt
 from django.conf import settings
+from django.db import connection
 from django.db.utils import DatabaseError
+from django.test.utils import CaptureQueriesContext
 import itertools
 
 from mock import patch
 import pytz
 
 from capa.tests.response_xml_factory import MultipleChoiceResponseXMLFactory
+from courseware.model_data import set_score
 from courseware.tests.test_submitting_problems import ProblemSubmissionTestMixin
 from lms.djangoapps.course_blocks.api import get_course_blocks
 from lms.djangoapps.grades.config.tests.utils import persistent_grades_feature_flags
@@ -172,6 +175,45 @@ class TestCourseGradeFactory(GradeTestBase):
         self.assertEqual(course_grade.letter_grade, u'Pass')
         self.assertEqual(course_grade.percent, 0.5)
 
+    @ddt.data(True, False)
+    def test_iter_in_chunks(self, save_grades):
+        students = [self.request.user, UserFactory(), UserFactory()]
+        for earned, student in enumerate(students):
+            CourseEnrollment.enroll(student, self.course.id)
+            set_score(student.id, self.problem.location, earned, 2)
+            if save_grades:
+                CourseGradeFactory().create(student, self.course, read_only=False)
+
+        def grade_percents(chunk_size):
+            """
+            Returns the grade percents of the students, and the number of queries made to get them.
+            """
+            with CaptureQueriesContext(connection) as queries:
+                percents = [
+                    course_grade.percent
+                    for __, course_grade, __ in CourseGradeFactory().iter(self.course, students, chunk_size=chunk_size)
+                ]
+            return percents, len(queries)
+
+        grade_percents(chunk_size=None)  # warm up the caches
+        percents, num_queries = grade_percents(chunk_size=None)
+        chunked_percents, chunked_num_queries = grade_percents(chunk_size=2)
+        self.assertEqual(percents, [0.0, 0.5, 1.0])
+        self.assertEqual(chunked_percents, percents)
+        self.assertLess(chunked_num_queries, num_queries)
+
+    def test_grading_context_shared(self):
+        grade_factory = CourseGradeFactory()
+        with mock_get_score(1, 2):
+            grading_context = grade_factory.create(self.request.user, self.course).grading_context
+            self.assertIs(grade_factory.create(UserFactory(), self.course).grading_context, grading_context)
+
+            # a new grading policy gets a new grading context
+            self.course.set_grading_policy({"GRADER": [], "GRADE_CUTOFFS": {"Pass": 0.9}})
+            course_grade = grade_factory.create(self.request.user, self.course)
+        self.assertIsNot(course_grade.grading_context, grading_context)
+        self.assertIsNone(course_grade.letter_grade)
+
 
 @ddt.ddt
 class TestSubsectionGradeFactory(ProblemSubmissionTestMixin, GradeTestBase):
@@ -0,0 +1,147 @@
+"""
+Tests for the score distributions of courses.
+"""
+import ddt
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.test.utils import override_settings
+from mock import patch
+from opaque_keys.edx.locator import BlockUsageLocator, CourseLocator
+
+from courseware.model_data import set_score
+from courseware.models import StudentModule
+from courseware.tests.factories import StudentModuleFactory
+from openedx.core.djangolib.testing.utils import CacheIsolationTestCase
+
+from ..models import CourseScoreDistributions, PersistentSubsectionGrade, ScoreDistribution
+from ..score_distributions import build_score_distributions, clear_score_distributions, get_score_distributions
+from ..signals.handlers import connect_score_distribution_handlers
+from ..tasks import update_score_distributions
+
+
+@ddt.ddt
+@override_settings(SCORE_DISTRIBUTIONS_UPDATE_DELAY=5)
+class ScoreDistributionsTest(CacheIsolationTestCase):
+    """
+    Tests that score distributions are built from the stored scores and
+    rebuilt as they change.
+    """
+    ENABLED_CACHES = ['default']
+
+    def setUp(self):
+        super(ScoreDistributionsTest, self).setUp()
+        self.course_key = CourseLocator(org='some_org', course='some_course', run='some_run')
+        self.problem = BlockUsageLocator(course_key=self.course_key, block_type='problem', block_id='problem')
+        self.subsection = BlockUsageLocator(course_key=self.course_key, block_type='sequential', block_id='subsection')
+        self.student_modules = [
+            StudentModuleFactory(course_id=self.course_key, module_state_key=self.problem, grade=grade, max_grade=2)
+            for grade in [0, 1, 1, None]
+        ]
+
+    def test_build(self):
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(0, 2, 1), (1, 2, 2)]},
+        )
+
+    def test_built_recorded_before_aggregating(self):
+        def assert_built_recorded(*args, **kwargs):
+            """
+            Asserts the distributions are recorded as built when the scores are aggregated.
+            """
+            self.assertTrue(CourseScoreDistributions.objects.filter(course_id=self.course_key).exists())
+            return filter_scores(*args, **kwargs)
+
+        filter_scores = StudentModule.objects.filter
+        with patch.object(StudentModule.objects, 'filter', side_effect=assert_built_recorded) as mock_filter:
+            build_score_distributions(self.course_key)
+        self.assertTrue(mock_filter.called)
+
+    def test_score_changes(self):
+        build_score_distributions(self.course_key)
+        set_score(self.student_modules[0].student_id, self.problem, 2, 2)
+        set_score(self.student_modules[3].student_id, self.problem, 1, 2)
+        self.student_modules[1].delete()
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(1, 2, 2), (2, 2, 1)]},
+        )
+
+    def test_score_changes_rebuilt_later(self):
+        build_score_distributions(self.course_key)
+        with patch(
+            'lms.djangoapps.grades.tasks.update_score_distributions.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            set_score(self.student_modules[0].student_id, self.problem, 2, 2)
+            set_score(self.student_modules[3].student_id, self.problem, 1, 2)
+        mock_task_apply.assert_called_once_with(kwargs=dict(course_id=unicode(self.course_key)), countdown=5)
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(0, 2, 1), (1, 2, 2)]},
+        )
+
+        update_score_distributions.apply(kwargs=mock_task_apply.call_args[1]['kwargs'])
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(1, 2, 3), (2, 2, 1)]},
+        )
+
+    def test_score_changes_before_build(self):
+        set_score(self.student_modules[0].student_id, self.problem, 2, 2)
+        self.assertFalse(ScoreDistribution.objects.exists())
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(1, 2, 2), (2, 2, 1)]},
+        )
+
+    def test_clear_after_disabled(self):
+        build_score_distributions(self.course_key)
+        # The handlers aren't connected while the class dashboard is disabled.
+        with patch('lms.djangoapps.grades.signals.handlers.enqueue_score_distributions_update'):
+            set_score(self.student_modules[0].student_id, self.problem, 2, 2)
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(0, 2, 1), (1, 2, 2)]},
+        )
+        clear_score_distributions([self.course_key])
+        self.assertEqual(
+            get_score_distributions(self.course_key),
+            {self.problem: [(1, 2, 2), (2, 2, 1)]},
+        )
+
+    @ddt.data(True, False)
+    def test_handlers_connected_if_enabled(self, enabled):
+        with patch.dict(settings.FEATURES, {'CLASS_DASHBOARD': enabled}):
+            with patch.object(post_save, 'connect') as mock_connect:
+                connect_score_distribution_handlers()
+        self.assertEqual(mock_connect.called, enabled)
+
+    def test_subsection_grades(self):
+        build_score_distributions(self.course_key)
+        grade_params = {
+            "user_id": 12345,
+            "usage_key": self.subsection,
+            "course_version": "deadbeef",
+            "subtree_edited_timestamp": "2016-08-01 18:53:24.354741",
+            "earned_all": 6.0,
+            "possible_all": 12.0,
+            "earned_graded": 6.0,
+            "possible_graded": 8.0,
+            "visible_blocks": [],
+            "attempted": True,
+        }
+        PersistentSubsectionGrade.create_grade(**grade_params)
+        PersistentSubsectionGrade.bulk_create_grades(
+            [dict(grade_params, user_id=12346), dict(grade_params, user_id=12347, attempted=False)], self.course_key,
+        )
+        self.assertEqual(
+            get_score_distributions(self.course_key, [self.subsection]),
+            {self.subsection: [(6.0, 12.0, 2)]},
+        )
+
+        PersistentSubsectionGrade.update_or_create_grade(**dict(grade_params, earned_all=12.0))
+        self.assertEqual(
+            get_score_distributions(self.course_key, [self.subsection]),
+            {self.subsection: [(6.0, 12.0, 1), (12.0, 12.0, 1)]},
+        )
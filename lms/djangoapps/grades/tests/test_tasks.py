@@ -5,8 +5,10 @@ Tests for the functionality and infrastructure of grades tasks.
 from collections import OrderedDict
 from contextlib import contextmanager
 import ddt
+import time
 from django.conf import settings
 from django.db.utils import IntegrityError
+from django.test.utils import override_settings
 from mock import patch
 from unittest import skip
 
@@ -22,8 +24,9 @@ from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory, check_mongo_calls
 
 from lms.djangoapps.grades.config.models import PersistentGradesEnabledFlag
+from lms.djangoapps.grades.pending_score_changes import SCHEDULED_TASK_TIMEOUT_MARGIN
 from lms.djangoapps.grades.signals.signals import PROBLEM_WEIGHTED_SCORE_CHANGED
-from lms.djangoapps.grades.tasks import recalculate_subsection_grade
+from lms.djangoapps.grades.tasks import recalculate_coalesced_subsection_grades, recalculate_subsection_grade
 
 
 @patch.dict(settings.FEATURES, {'PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS': False})
@@ -238,3 +241,122 @@ class RecalculateSubsectionGradeTest(ModuleStoreTestCase):
         """
         self.assertTrue(mock_retry.called)
         self.assertEquals(len(mock_retry.call_args[1]['kwargs']), len(self.recalculate_subsection_grade_kwargs))
+
+
+@patch.dict(settings.FEATURES, {'PERSISTENT_GRADES_ENABLED_FOR_ALL_TESTS': False})
+@override_settings(RECALCULATE_GRADES_COALESCE_DELAY=5)
+class RecalculateCoalescedSubsectionGradesTest(ModuleStoreTestCase):
+    """
+    Ensures that score changes close in time are recalculated by a single task.
+    """
+    def setUp(self):
+        super(RecalculateCoalescedSubsectionGradesTest, self).setUp()
+        self.user = UserFactory()
+        PersistentGradesEnabledFlag.objects.create(enabled_for_all_courses=True, enabled=True)
+        self.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=self.course, category="chapter")
+        self.sequentials = [ItemFactory.create(parent=chapter, category='sequential') for __ in range(2)]
+        self.problems = [
+            ItemFactory.create(parent=sequential, category='problem')
+            for sequential in self.sequentials
+            for __ in range(2)
+        ]
+
+    def send_score_changes(self):
+        """
+        Sends a score change for each problem, three times.
+        """
+        for __ in range(3):
+            for problem in self.problems:
+                PROBLEM_WEIGHTED_SCORE_CHANGED.send(
+                    sender=None,
+                    weighted_earned=1.0,
+                    weighted_possible=2.0,
+                    user_id=self.user.id,
+                    course_id=unicode(self.course.id),
+                    usage_id=unicode(problem.location),
+                    only_if_higher=None,
+                )
+
+    @patch('lms.djangoapps.grades.signals.signals.SUBSECTION_SCORE_CHANGED.send')
+    def test_score_changes_coalesced(self, mock_subsection_signal):
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            self.send_score_changes()
+        mock_task_apply.assert_called_once_with(
+            kwargs=dict(user_id=self.user.id, course_id=unicode(self.course.id)),
+            countdown=5,
+        )
+
+        with patch('lms.djangoapps.grades.tasks.dog_stats_api.histogram') as mock_histogram:
+            recalculate_coalesced_subsection_grades.apply(kwargs=mock_task_apply.call_args[1]['kwargs'])
+        self.assertEqual(mock_histogram.call_args[0][1], 3 * len(self.problems))
+        self.assertSetEqual(
+            {args[1]['subsection_grade'].location for args in mock_subsection_signal.call_args_list},
+            {sequential.location for sequential in self.sequentials},
+        )
+        self.assertEqual(mock_subsection_signal.call_count, len(self.sequentials))
+
+        # The score changes were taken, so the next one schedules a new task.
+        mock_subsection_signal.reset_mock()
+        recalculate_coalesced_subsection_grades.apply(kwargs=mock_task_apply.call_args[1]['kwargs'])
+        self.assertFalse(mock_subsection_signal.called)
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            self.send_score_changes()
+        self.assertEqual(mock_task_apply.call_count, 1)
+
+    def test_lost_task_rescheduled(self):
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            self.send_score_changes()
+            # The task scheduled never ran, so once it should have, the next score change schedules another.
+            with patch('time.time', return_value=time.time() + 2 * 5 + SCHEDULED_TASK_TIMEOUT_MARGIN + 1):
+                self.send_score_changes()
+        self.assertEqual(mock_task_apply.call_count, 2)
+
+        with patch('lms.djangoapps.grades.tasks.dog_stats_api.histogram') as mock_histogram:
+            recalculate_coalesced_subsection_grades.apply(kwargs=mock_task_apply.call_args[1]['kwargs'])
+        self.assertEqual(mock_histogram.call_args[0][1], 2 * 3 * len(self.problems))
+
+    @patch('lms.djangoapps.grades.tasks._has_database_updated_with_new_score', return_value=True)
+    def test_latest_scores_checked(self, mock_has_database_updated):
+        with patch(
+            'lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.apply_async',
+            return_value=None
+        ) as mock_task_apply:
+            for weighted_earned in (1.0, 2.0):
+                PROBLEM_WEIGHTED_SCORE_CHANGED.send(
+                    sender=None,
+                    weighted_earned=weighted_earned,
+                    weighted_possible=2.0,
+                    user_id=self.user.id,
+                    course_id=unicode(self.course.id),
+                    usage_id=unicode(self.problems[0].location),
+                    only_if_higher=None,
+                )
+        recalculate_coalesced_subsection_grades.apply(kwargs=mock_task_apply.call_args[1]['kwargs'])
+        mock_has_database_updated.assert_called_once_with(self.user.id, self.problems[0].location, 2.0, 2.0, False)
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.retry')
+    @patch('lms.djangoapps.grades.tasks._has_database_updated_with_new_score', return_value=False)
+    @patch('lms.djangoapps.grades.new.subsection_grade.SubsectionGradeFactory.update')
+    def test_retry_on_update_not_complete(self, mock_update, mock_has_database_updated, mock_retry):
+        self.send_score_changes()
+        self.assertTrue(mock_retry.called)
+        self.assertTrue(mock_has_database_updated.called)
+        self.assertFalse(mock_update.called)
+
+    @patch('lms.djangoapps.grades.tasks.recalculate_coalesced_subsection_grades.retry')
+    @patch('lms.djangoapps.grades.new.subsection_grade.SubsectionGradeFactory.update')
+    def test_retry_with_score_changes(self, mock_update, mock_retry):
+        mock_update.side_effect = IntegrityError("WHAMMY")
+        self.send_score_changes()
+        self.assertTrue(mock_retry.called)
+        self.assertEqual(len(mock_retry.call_args[1]['kwargs']['score_changes']), 1)
@@ -0,0 +1,168 @@
+"""
+Attributes of the learners of a course shown in its grade report, besides
+their grades, loaded for chunks of learners at once.
+"""
+from itertools import islice
+
+from certificates.models import certificate_info_from_status, certificate_statuses_for_students
+from lms.djangoapps.grades.new.course_grade import BULK_GRADING_CHUNK_SIZE
+from lms.djangoapps.teams.models import CourseTeamMembership
+from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
+from openedx.core.djangoapps.course_groups.models import CohortMembership
+import openedx.core.djangoapps.user_api.course_tag.api as course_tag_api
+from student.models import CourseEnrollment, UserProfile
+from xmodule.partitions.partitions import NoSuchUserPartitionGroupError
+
+
+class LearnerAttributes(object):
+    """
+    Loads the cohort, experiment groups, team, enrollment mode, verification
+    status and certificate status of a chunk of learners of a course in a
+    few bulk queries, rather than a few queries for each learner, and serves
+    them from memory.
+
+    Only the attributes of the last chunk of learners loaded are kept.
+    Those of a learner who isn't in it are loaded on their own.
+    """
+    def __init__(self, course_id, course_is_cohorted, experiment_partitions, teams_enabled):
+        self.course_id = course_id
+        self.course_is_cohorted = course_is_cohorted
+        self.experiment_partitions = experiment_partitions
+        self.teams_enabled = teams_enabled
+        self._user_ids = set()
+
+    def prefetch(self, students, chunk_size=BULK_GRADING_CHUNK_SIZE):
+        """
+        Yields the given students, loading the attributes of each chunk of
+        chunk_size of them before yielding it.
+
+        The default chunk size is the one in which CourseGradeFactory.iter
+        grades students, so that the students of each of its chunks are
+        loaded together.
+        """
+        students = iter(students)
+        while True:
+            chunk = list(islice(students, chunk_size))
+            if not chunk:
+                return
+            self.load(chunk)
+            for student in chunk:
+                yield student
+
+    def load(self, students):
+        """
+        Loads the attributes of the given students, replacing those loaded
+        previously.
+        """
+        user_ids = [student.id for student in students]
+        self._user_ids = set(user_ids)
+
+        self._cohort_names = {}
+        if self.course_is_cohorted:
+            self._cohort_names = {
+                membership.user_id: membership.course_user_group.name
+                for membership in CohortMembership.objects.filter(
+                    course_id=self.course_id, user_id__in=user_ids,
+                ).select_related('course_user_group')
+            }
+
+        self._experiment_groups = {}
+        if self.experiment_partitions:
+            self._experiment_groups = course_tag_api.get_course_tags_for_users(
+                user_ids,
+                self.course_id,
+                [partition.scheme.key_for_partition(partition) for partition in self.experiment_partitions],
+            )
+
+        self._team_names = {}
+        if self.teams_enabled:
+            self._team_names = {
+                membership.user_id: membership.team.name
+                for membership in CourseTeamMembership.objects.filter(
+                    user_id__in=user_ids, team__course_id=self.course_id,
+                ).select_related('team')
+            }
+
+        self._enrollment_modes = dict.fromkeys(user_ids)
+        self._enrollment_modes.update(
+            CourseEnrollment.objects.filter(
+                course_id=self.course_id, user_id__in=user_ids,
+            ).values_list('user_id', 'mode')
+        )
+        self._verification_statuses = SoftwareSecurePhotoVerification.verification_statuses_for_users(
+            self._enrollment_modes
+        )
+
+        self._certificate_statuses = certificate_statuses_for_students(user_ids, self.course_id)
+        self._allow_certificate = dict(
+            UserProfile.objects.filter(user_id__in=user_ids).values_list('user_id', 'allow_certificate')
+        )
+
+    def cohort_name(self, student):
+        """
+        Returns the name of the student's cohort, or '' if they have none.
+        """
+        self._load_missing(student)
+        return self._cohort_names.get(student.id, '')
+
+    def experiment_group_names(self, student):
+        """
+        Returns the names of the student's groups in each experiment
+        partition, or '' for those they aren't assigned a group in.
+        """
+        self._load_missing(student)
+        group_names = []
+        for partition in self.experiment_partitions:
+            # Experiment partitions use the random scheme, which stores each user's group as a course tag.
+            group_id = self._experiment_groups.get((student.id, partition.scheme.key_for_partition(partition)))
+            group = None
+            if group_id is not None:
+                try:
+                    group = partition.get_group(int(group_id))
+                except NoSuchUserPartitionGroupError:
+                    pass
+            group_names.append(group.name if group else '')
+        return group_names
+
+    def team_name(self, student):
+        """
+        Returns the name of the student's team, or '' if they have none.
+        """
+        self._load_missing(student)
+        return self._team_names.get(student.id, '')
+
+    def enrollment_mode(self, student):
+        """
+        Returns the student's enrollment mode, or None if they aren't enrolled.
+        """
+        self._load_missing(student)
+        return self._enrollment_modes[student.id]
+
+    def verification_status(self, student):
+        """
+        Returns the student's verification status, as
+        `SoftwareSecurePhotoVerification.verification_status_for_user` does.
+        """
+        self._load_missing(student)
+        return self._verification_statuses[student.id]
+
+    def certificate_info(self, student, grade, user_is_whitelisted):
+        """
+        Returns the student's certificate info, as `certificate_info_for_user` does.
+        """
+        self._load_missing(student)
+        try:
+            allow_certificate = self._allow_certificate[student.id]
+        except KeyError:
+            # Raises UserProfile.DoesNotExist, as certificate_info_for_user does.
+            allow_certificate = student.profile.allow_certificate
+        return certificate_info_from_status(
+            self._certificate_statuses[student.id], grade, user_is_whitelisted, allow_certificate
+        )
+
+    def _load_missing(self, student):
+        """
+        Loads the attributes of the given student if they aren't loaded.
+        """
+        if student.id not in self._user_ids:
+            self.load([student])
@@ -17,10 +17,12 @@ import csv
 import json
 import hashlib
 import os.path
+import shutil
+from tempfile import SpooledTemporaryFile
 
 from django.conf import settings
 from django.contrib.auth.models import User
-from django.core.files.base import ContentFile
+from django.core.files.base import File
 from django.db import models, transaction
 
 from openedx.core.storage import get_storage
@@ -31,6 +33,9 @@ from openedx.core.djangoapps.xmodule_django.models import CourseKeyField
 QUEUING = 'QUEUING'
 PROGRESS = 'PROGRESS'
 
+# Reports are written to temporary files that are kept in memory up to this size (in bytes).
+REPORT_BUFFER_MAX_SIZE = 5 * 1024 * 1024
+
 
 class InstructorTask(models.Model):
     """
@@ -264,12 +269,49 @@ class DjangoStorageReportStore(ReportStore):
         """
         Given a course_id, filename, and rows (each row is an iterable of
         strings), write the rows to the storage backend in csv format.
+
+        `rows` may be any iterable, such as a generator: the rows are written
+        as they are produced, to a temporary file that is only kept in memory
+        while it is small.
+        """
+        with SpooledTemporaryFile(max_size=REPORT_BUFFER_MAX_SIZE) as output_buffer:
+            csvwriter = csv.writer(output_buffer)
+            csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+            output_buffer.seek(0)
+            self.store(course_id, filename, File(output_buffer))
+
+    def store_concatenated(self, course_id, filename, part_filenames):
+        """
+        Store the concatenation of the given files, previously stored for the
+        course_id, as `filename`.  The parts are copied to a temporary file
+        one at a time, so they're never all held in memory.
+        """
+        with SpooledTemporaryFile(max_size=REPORT_BUFFER_MAX_SIZE) as output_buffer:
+            for part_filename in part_filenames:
+                with self.open(course_id, part_filename) as part_file:
+                    shutil.copyfileobj(part_file, output_buffer)
+            output_buffer.seek(0)
+            self.store(course_id, filename, File(output_buffer))
+
+    def open(self, course_id, filename):
+        """
+        Open the file stored for the course_id as `filename`, for reading.
         """
-        output_buffer = ContentFile('')
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        output_buffer.seek(0)
-        self.store(course_id, filename, output_buffer)
+        return self.storage.open(self.path_to(course_id, filename))
+
+    def exists(self, course_id, filename):
+        """
+        Return whether a file is stored for the course_id as `filename`.
+        """
+        return self.storage.exists(self.path_to(course_id, filename))
+
+    def delete(self, course_id, filename):
+        """
+        Delete the file stored for the course_id as `filename`, if there is one.
+        """
+        path = self.path_to(course_id, filename)
+        if self.storage.exists(path):
+            self.storage.delete(path)
 
     def links_for(self, course_id):
         """
@@ -8,7 +8,7 @@ import psutil
 from contextlib import contextmanager
 import logging
 
-from celery.states import SUCCESS, READY_STATES, RETRY
+from celery.states import SUCCESS, FAILURE, READY_STATES, RETRY
 import dogstats_wrapper as dog_stats_api
 
 from django.db import transaction, DatabaseError
@@ -463,7 +463,7 @@ def check_subtask_is_valid(entry_id, current_task_id, new_subtask_status):
         raise DuplicateTaskException(msg)
 
 
-def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0):
+def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count=0, defer_success=False):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -474,9 +474,14 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
     The subtask lock acquired in the call to check_subtask_is_valid() is released here, only when
     the attempting of retries has concluded.
+
+    Returns True if this update completed the last of the subtasks of the InstructorTask, so that
+    the subtask can do any work that's left once all subtasks are done.  If `defer_success` is
+    True, the InstructorTask is then left in progress until that work is done, for the subtask
+    to mark it as completed with `complete_subtasks_task`.
     """
     try:
-        _update_subtask_status(entry_id, current_task_id, new_subtask_status)
+        return _update_subtask_status(entry_id, current_task_id, new_subtask_status, defer_success)
     except DatabaseError:
         # If we fail, try again recursively.
         retry_count += 1
@@ -484,7 +489,9 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
             TASK_LOG.info("Retrying to update status for subtask %s of instructor task %d with status %s:  retry %d",
                           current_task_id, entry_id, new_subtask_status, retry_count)
             dog_stats_api.increment('instructor_task.subtask.retry_after_failed_update')
-            update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_count)
+            return update_subtask_status(
+                entry_id, current_task_id, new_subtask_status, retry_count, defer_success=defer_success,
+            )
         else:
             TASK_LOG.info("Failed to update status after %d retries for subtask %s of instructor task %d with status %s",
                           retry_count, current_task_id, entry_id, new_subtask_status)
@@ -498,7 +505,7 @@ def update_subtask_status(entry_id, current_task_id, new_subtask_status, retry_c
 
 
 @transaction.atomic
-def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
+def _update_subtask_status(entry_id, current_task_id, new_subtask_status, defer_success=False):
     """
     Update the status of the subtask in the parent InstructorTask object tracking its progress.
 
@@ -524,6 +531,11 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
     information for each subtask.  At the moment, the value for each subtask (keyed by its task_id)
     is the value of the SubtaskStatus.to_dict(), but could be expanded in future to store information
     about failure messages, progress made, etc.
+
+    Unless `defer_success` is True, the InstructorTask's "status" is changed to SUCCESS once the
+    subtasks are done.
+
+    Returns True if this update completed the last of the subtasks.
     """
     TASK_LOG.info("Preparing to update status for subtask %s for instructor task %d with status %s",
                   current_task_id, entry_id, new_subtask_status)
@@ -564,6 +576,7 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # Figure out if we're actually done (i.e. this is the last task to complete).
         # This is easier if we just maintain a counter, rather than scanning the
         # entire new_subtask_status dict.
+        previously_remaining = subtask_dict['total'] - subtask_dict['succeeded'] - subtask_dict['failed']
         if new_state == SUCCESS:
             subtask_dict['succeeded'] += 1
         elif new_state in READY_STATES:
@@ -574,7 +587,8 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         # At present, we mark the task as having succeeded.  In future, we should see
         # if there was a catastrophic failure that occurred, and figure out how to
         # report that here.
-        if num_remaining <= 0:
+        completed = num_remaining <= 0 < previously_remaining
+        if num_remaining <= 0 and not defer_success:
             entry.task_state = SUCCESS
         entry.subtasks = json.dumps(subtask_dict)
         entry.task_output = InstructorTask.create_output_for_success(task_progress)
@@ -587,3 +601,20 @@ def _update_subtask_status(entry_id, current_task_id, new_subtask_status):
         TASK_LOG.exception("Unexpected error while updating InstructorTask.")
         dog_stats_api.increment('instructor_task.subtask.update_exception')
         raise
+    return completed
+
+
+@transaction.atomic
+def complete_subtasks_task(entry_id, exception=None, traceback_string=None):
+    """
+    Marks the InstructorTask, whose subtasks' status was last updated with `defer_success`,
+    as having succeeded once the work left after its subtasks is done, or as having failed
+    with the given exception if that work failed.
+    """
+    entry = InstructorTask.objects.select_for_update().get(pk=entry_id)
+    if exception is None:
+        entry.task_state = SUCCESS
+    else:
+        entry.task_state = FAILURE
+        entry.task_output = InstructorTask.create_output_for_failure(exception, traceback_string)
+    entry.save()
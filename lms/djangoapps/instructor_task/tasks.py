@@ -37,6 +37,7 @@ from lms.djangoapps.instructor_task.tasks_helper import (
     upload_problem_responses_csv,
     upload_grades_csv,
     upload_problem_grade_report,
+    generate_grade_report_shard,
     upload_students_csv,
     cohort_students_and_upload,
     upload_enrollment_report,
@@ -193,6 +194,19 @@ def calculate_problem_grade_report(entry_id, xmodule_instance_args):
     return run_main_task(entry_id, task_fn, action_name)
 
 
+@task(routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
+def calculate_grade_report_shard(entry_id, report_type, learner_ids, shard_index, subtask_status_dict):
+    """
+    Grade a shard of the learners of a course, for a grade report generated by
+    subtasks of the InstructorTask, and store their rows of the report.
+
+    `report_type` is the name of the report, `learner_ids` the ids of the learners of
+    the shard, and `shard_index` its position among the shards.  The subtask that
+    completes last merges the rows of all of the shards and uploads the report.
+    """
+    return generate_grade_report_shard(entry_id, report_type, learner_ids, shard_index, subtask_status_dict)
+
+
 @task(base=BaseInstructorTask, routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY)  # pylint: disable=not-callable
 def calculate_students_features_csv(entry_id, xmodule_instance_args):
     """
@@ -8,8 +8,10 @@ import logging
 from StringIO import StringIO
 from collections import OrderedDict
 from datetime import datetime
-from itertools import chain
+from itertools import chain, count
 from time import time
+import traceback
+from uuid import uuid4
 
 import dogstats_wrapper as dog_stats_api
 import re
@@ -18,6 +20,7 @@ from celery import Task, current_task
 from celery.states import SUCCESS, FAILURE
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
 from django.core.files.storage import DefaultStorage
 from django.db import reset_queries
 from django.db.models import Q
@@ -25,8 +28,6 @@ from django.utils.translation import ugettext as _
 from eventtracking import tracker
 from lms.djangoapps.grades.scores import weighted_score
 from lms.djangoapps.instructor.paidcourse_enrollment_report import PaidCourseEnrollmentReportProvider
-from lms.djangoapps.teams.models import CourseTeamMembership
-from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
 from pytz import UTC
 from xmodule.modulestore.django import modulestore
 from xmodule.split_test_module import get_split_user_partitions
@@ -34,12 +35,11 @@ from xmodule.split_test_module import get_split_user_partitions
 from certificates.api import generate_user_certificates
 from certificates.models import (
     CertificateWhitelist,
-    certificate_info_for_user,
     CertificateStatuses,
     GeneratedCertificate
 )
 from courseware.courses import get_course_by_id, get_problems_in_section
-from lms.djangoapps.grades.context import grading_context_for_course
+from lms.djangoapps.grades.context import course_grading_context
 from lms.djangoapps.grades.new.course_grade import CourseGradeFactory
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from courseware.models import StudentModule
@@ -57,9 +57,15 @@ from shoppingcart.models import (
     Invoice, CouponRedemption, RegistrationCodeRedemption, CourseRegistrationCode
 )
 from openassessment.data import OraAggregateData
+from lms.djangoapps.instructor_task.learner_attributes import LearnerAttributes
 from lms.djangoapps.instructor_task.models import ReportStore, InstructorTask, PROGRESS
-from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
-from openedx.core.djangoapps.course_groups.cohorts import get_cohort
+from lms.djangoapps.instructor_task.subtasks import (
+    SubtaskStatus,
+    check_subtask_is_valid,
+    complete_subtasks_task,
+    queue_subtasks_for_query,
+    update_subtask_status,
+)
 from openedx.core.djangoapps.course_groups.models import CourseUserGroup
 from opaque_keys.edx.keys import UsageKey
 from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort, is_course_cohorted
@@ -88,6 +94,9 @@ GRADES_RESCORE_EVENT_TYPE = 'edx.grades.problem.rescored'
 # The setting name used for events when "settings" (account settings, preferences, profile information) change.
 REPORT_REQUESTED_EVENT_NAME = u'edx.instructor.report.requested'
 
+# Number of learners whose rows are stored between checkpoints of a CheckpointedCsvReport.
+REPORT_CHECKPOINT_INTERVAL = 1000
+
 
 class BaseInstructorTask(Task):
     """
@@ -650,16 +659,24 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     report_store = ReportStore.from_config(config_name)
     report_store.store_rows(
         course_id,
-        u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
-            course_prefix=course_filename_prefix_generator(course_id),
-            csv_name=csv_name,
-            timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
-        ),
+        report_filename(course_id, csv_name, timestamp),
         rows
     )
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
 
 
+def report_filename(course_id, csv_name, timestamp):
+    """
+    Returns the filename of the CSV report of the given name, generated at
+    the given time.
+    """
+    return u"{course_prefix}_{csv_name}_{timestamp_str}.csv".format(
+        course_prefix=course_filename_prefix_generator(course_id),
+        csv_name=csv_name,
+        timestamp_str=timestamp.strftime("%Y-%m-%d-%H%M")
+    )
+
+
 def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at, config_name='FINANCIAL_REPORTS'):
     """
     Upload Executive Summary Html file using ReportStore.
@@ -686,7 +703,190 @@ def upload_exec_summary_to_store(data_dict, report_name, course_id, generated_at
     tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": report_name})
 
 
-def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):  # pylint: disable=too-many-statements
+class CheckpointedCsvReport(object):
+    """
+    Writes the CSV files of a report that has a row (or a few) per learner,
+    as the rows are produced, so that no more than `checkpoint_interval`
+    learners' rows are ever held in memory.
+
+    Every `checkpoint_interval` learners, the rows produced since the last
+    checkpoint are stored in the ReportStore as the next part of each CSV
+    file, along with a checkpoint of the report's progress.  When the task
+    is run again for the same InstructorTask, after its worker crashed say,
+    the report resumes from its last checkpoint: `resume_after` is the id of
+    the last learner whose rows were stored.  Learners are expected to be
+    processed in order of their ids.
+
+    Once all rows are produced, `upload` concatenates the parts of each CSV
+    file into the final report file, and `close` deletes the parts and the
+    checkpoint.
+    """
+    def __init__(self, course_id, entry_id, csv_names, config_name='GRADES_DOWNLOAD',
+                 checkpoint_interval=REPORT_CHECKPOINT_INTERVAL):
+        self.course_id = course_id
+        self.entry_id = entry_id
+        self.csv_names = csv_names
+        self.checkpoint_interval = checkpoint_interval
+        self.report_store = ReportStore.from_config(config_name)
+        # Without an InstructorTask to resume, the parts are only stored apart from other reports'.
+        self._directory = u'checkpoints/{}'.format(entry_id if entry_id is not None else uuid4().hex)
+
+        self._rows = {csv_name: [] for csv_name in csv_names}
+        self._learners_since_checkpoint = 0
+        self._checkpoint = self._load_checkpoint() or {
+            'resume_after': None,
+            'progress': {},
+            'parts': {csv_name: [] for csv_name in csv_names},
+            'num_rows': {csv_name: 0 for csv_name in csv_names},
+        }
+
+    @property
+    def resume_after(self):
+        """
+        The id of the last learner whose rows were stored at the last
+        checkpoint, or None if the report is starting afresh.
+        """
+        return self._checkpoint['resume_after']
+
+    @property
+    def progress(self):
+        """
+        The progress recorded at the last checkpoint, as a dict of
+        TaskProgress counts.
+        """
+        return self._checkpoint['progress']
+
+    def learners_to_report(self, enrolled_students):
+        """
+        Returns the given queryset of learners ordered by id, without those
+        whose rows were already stored if the report is resumed.
+        """
+        enrolled_students = enrolled_students.order_by('id')
+        if self.resume_after is not None:
+            enrolled_students = enrolled_students.filter(id__gt=self.resume_after)
+        return enrolled_students
+
+    def restore_progress(self, task_progress):
+        """
+        Restores the counts of the given TaskProgress recorded at the last
+        checkpoint.
+        """
+        for attr, value in self.progress.iteritems():
+            setattr(task_progress, attr, value)
+
+    def num_rows(self, csv_name):
+        """
+        The number of rows written to the given CSV file so far.
+        """
+        return self._checkpoint['num_rows'][csv_name] + len(self._rows[csv_name])
+
+    def add_row(self, csv_name, row):
+        """
+        Adds a row to the given CSV file.
+        """
+        self._rows[csv_name].append(row)
+
+    def learner_completed(self, learner_id, task_progress):
+        """
+        Records that all rows of the given learner have been added, storing
+        a checkpoint if `checkpoint_interval` learners have been completed
+        since the last one.  `task_progress` is a TaskProgress, or any object
+        with the same counts, such as a SubtaskStatus.
+        """
+        self._learners_since_checkpoint += 1
+        if self._learners_since_checkpoint >= self.checkpoint_interval:
+            self.store_checkpoint(learner_id, task_progress)
+
+    def store_checkpoint(self, learner_id, task_progress):
+        """
+        Stores the rows added since the last checkpoint, and a new checkpoint
+        after the given learner.
+        """
+        for csv_name in self.csv_names:
+            self._store_part(csv_name)
+        self._checkpoint['resume_after'] = learner_id
+        self._checkpoint['progress'] = {
+            'attempted': task_progress.attempted,
+            'succeeded': task_progress.succeeded,
+            'skipped': task_progress.skipped,
+            'failed': task_progress.failed,
+        }
+        self._learners_since_checkpoint = 0
+        if self.entry_id is not None:
+            checkpoint_filename = self._checkpoint_filename()
+            self.report_store.delete(self.course_id, checkpoint_filename)
+            self.report_store.store(self.course_id, checkpoint_filename, ContentFile(json.dumps(self._checkpoint)))
+
+    def upload(self, csv_name, timestamp):
+        """
+        Uploads the given CSV file, like `upload_csv_to_report_store`.
+        """
+        self.store(csv_name, report_filename(self.course_id, csv_name, timestamp))
+        tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
+
+    def store(self, csv_name, filename):
+        """
+        Stores the given CSV file, concatenated from its parts, as `filename`.
+        """
+        self._store_part(csv_name)
+        self.report_store.store_concatenated(self.course_id, filename, self._checkpoint['parts'][csv_name])
+
+    def close(self):
+        """
+        Deletes the parts of the CSV files and the checkpoint.
+        """
+        for csv_name in self.csv_names:
+            for part_filename in self._checkpoint['parts'][csv_name]:
+                self.report_store.delete(self.course_id, part_filename)
+        if self.entry_id is not None:
+            self.report_store.delete(self.course_id, self._checkpoint_filename())
+
+    def _store_part(self, csv_name):
+        """
+        Stores the rows of the given CSV file added since its last part was
+        stored, as its next part.
+        """
+        rows = self._rows[csv_name]
+        if not rows:
+            return
+        parts = self._checkpoint['parts'][csv_name]
+        part_filename = u'{directory}/{csv_name}_{index}.csv'.format(
+            directory=self._checkpoint_directory(),
+            csv_name=csv_name,
+            index=len(parts),
+        )
+        # A part may have been stored after the last checkpoint, before the task was interrupted.
+        self.report_store.delete(self.course_id, part_filename)
+        self.report_store.store_rows(self.course_id, part_filename, rows)
+        parts.append(part_filename)
+        self._checkpoint['num_rows'][csv_name] += len(rows)
+        self._rows[csv_name] = []
+
+    def _checkpoint_directory(self):
+        """
+        Returns the directory in which the parts and checkpoint of this
+        report are stored.  It's a subdirectory of the course's reports
+        directory, so its files aren't listed as reports.
+        """
+        return self._directory
+
+    def _checkpoint_filename(self):
+        """
+        Returns the filename of the checkpoint.
+        """
+        return u'{}/checkpoint.json'.format(self._checkpoint_directory())
+
+    def _load_checkpoint(self):
+        """
+        Returns the stored checkpoint of this report, if any.
+        """
+        if self.entry_id is None or not self.report_store.exists(self.course_id, self._checkpoint_filename()):
+            return None
+        with self.report_store.open(self.course_id, self._checkpoint_filename()) as checkpoint_file:
+            return json.load(checkpoint_file)
+
+
+def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
     """
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
@@ -699,12 +899,232 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     make a more general CSVDoc class instead of building out the rows like we
     do here.
     """
+    return _upload_grade_report(
+        CourseGradeReport, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name
+    )
+
+
+class GradeReport(object):
+    """
+    The rows of a report with a row of grades for each learner of a course,
+    and a row of the error for each learner who couldn't be graded.
+
+    Subclasses define the CSV files of the report, and their rows.
+    """
+    # Name of the report, used to generate it in subtasks.
+    report_type = None
+    # Names of the CSV files of the report.
+    csv_names = []
+    # Names of the CSV files uploaded even if they have no rows but their header.
+    upload_if_empty = []
+
+    def __init__(self, course_id):
+        self.course = get_course_by_id(course_id)
+
+    def header_rows(self):
+        """
+        Returns a list of the names of the CSV files with their header row.
+        """
+        raise NotImplementedError
+
+    def prefetch(self, students):
+        """
+        Returns an iterable of the given students to grade, which may load
+        data for the report's rows of chunks of them as it's iterated over.
+        """
+        return students
+
+    def add_learner_rows(self, report, student, course_grade, err_msg):
+        """
+        Adds the rows of the given learner, as returned by
+        `CourseGradeFactory.iter`, to the given CheckpointedCsvReport.
+
+        Returns whether the learner was graded.
+        """
+        raise NotImplementedError
+
+    def should_upload(self, csv_name, has_rows):
+        """
+        Returns whether the given CSV file should be uploaded, given whether
+        it has any rows but its header.
+        """
+        return has_rows or csv_name in self.upload_if_empty
+
+
+class CourseGradeReport(GradeReport):
+    """
+    The rows of a course's grade report, with each learner's grade of each
+    graded subsection and assignment type.
+    """
+    report_type = 'grade_report'
+    csv_names = ['grade_report', 'grade_report_err']
+    upload_if_empty = ['grade_report']
+
+    def __init__(self, course_id):
+        super(CourseGradeReport, self).__init__(course_id)
+        self.course_is_cohorted = is_course_cohorted(self.course.id)
+        self.teams_enabled = self.course.teams_enabled
+        self.experiment_partitions = get_split_user_partitions(self.course.user_partitions)
+
+        certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
+        self.whitelisted_user_ids = set(entry.user_id for entry in certificate_whitelist)
+
+        self.graded_assignments = _graded_assignments(self.course)
+        self.learner_attributes = LearnerAttributes(
+            self.course.id, self.course_is_cohorted, self.experiment_partitions, self.teams_enabled
+        )
+
+    def header_rows(self):
+        cohorts_header = ['Cohort Name'] if self.course_is_cohorted else []
+        teams_header = ['Team Name'] if self.teams_enabled else []
+        group_configs_header = [
+            u'Experiment Group ({})'.format(partition.name) for partition in self.experiment_partitions
+        ]
+        certificate_info_header = ['Certificate Eligible', 'Certificate Delivered', 'Certificate Type']
+
+        grade_header = []
+        for assignment_info in self.graded_assignments.itervalues():
+            if assignment_info['use_subsection_headers']:
+                grade_header.extend(assignment_info['subsection_headers'].itervalues())
+            grade_header.append(assignment_info['average_header'])
+
+        return [
+            ('grade_report', (
+                ["Student ID", "Email", "Username", "Grade"] +
+                grade_header +
+                cohorts_header +
+                group_configs_header +
+                teams_header +
+                ['Enrollment Track', 'Verification Status'] +
+                certificate_info_header
+            )),
+            ('grade_report_err', ["id", "username", "error_msg"]),
+        ]
+
+    def prefetch(self, students):
+        return self.learner_attributes.prefetch(students)
+
+    def add_learner_rows(self, report, student, course_grade, err_msg):
+        if not course_grade:
+            # An empty gradeset means we failed to grade a student.
+            report.add_row('grade_report_err', [student.id, student.username, err_msg])
+            return False
+
+        learner_attributes = self.learner_attributes
+        cohorts_group_name = [learner_attributes.cohort_name(student)] if self.course_is_cohorted else []
+        group_configs_group_names = learner_attributes.experiment_group_names(student)
+        team_name = [learner_attributes.team_name(student)] if self.teams_enabled else []
+        enrollment_mode = learner_attributes.enrollment_mode(student)
+        verification_status = learner_attributes.verification_status(student)
+        certificate_info = learner_attributes.certificate_info(
+            student,
+            course_grade.letter_grade,
+            student.id in self.whitelisted_user_ids
+        )
+
+        grade_results = []
+        for assignment_type, assignment_info in self.graded_assignments.iteritems():
+            for subsection_location in assignment_info['subsection_headers']:
+                try:
+                    subsection_grade = course_grade.graded_subsections_by_format[assignment_type][subsection_location]
+                except KeyError:
+                    grade_results.append([u'Not Available'])
+                else:
+                    if subsection_grade.graded_total.attempted:
+                        grade_results.append(
+                            [subsection_grade.graded_total.earned / subsection_grade.graded_total.possible]
+                        )
+                    else:
+                        grade_results.append([u'Not Attempted'])
+            if assignment_info['use_subsection_headers']:
+                assignment_average = course_grade.grade_value['grade_breakdown'].get(assignment_type, {}).get('percent')
+                grade_results.append([assignment_average])
+
+        grade_results = list(chain.from_iterable(grade_results))
+
+        report.add_row('grade_report', (
+            [student.id, student.email, student.username, course_grade.percent] +
+            grade_results + cohorts_group_name + group_configs_group_names + team_name +
+            [enrollment_mode] + [verification_status] + certificate_info
+        ))
+        return True
+
+
+class ProblemGradeReport(GradeReport):
+    """
+    The rows of a course's problem grade report, with each learner's score
+    of each graded problem.
+    """
+    report_type = 'problem_grade_report'
+    csv_names = ['problem_grade_report', 'problem_grade_report_err']
+
+    # This struct encapsulates both the display names of each static item in the
+    # header row as values as well as the django User field names of those items
+    # as the keys.  It is structured in this way to keep the values related.
+    header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
+
+    def __init__(self, course_id):
+        super(ProblemGradeReport, self).__init__(course_id)
+        self.graded_scorable_blocks = _graded_scorable_blocks_to_header(self.course)
+
+    def header_rows(self):
+        return [
+            (
+                'problem_grade_report',
+                list(self.header_row.values()) + ['Grade'] +
+                list(chain.from_iterable(self.graded_scorable_blocks.values()))
+            ),
+            ('problem_grade_report_err', list(self.header_row.values()) + ['error_msg']),
+        ]
+
+    def add_learner_rows(self, report, student, course_grade, err_msg):
+        student_fields = [getattr(student, field_name) for field_name in self.header_row]
+
+        if not course_grade:
+            # There was an error grading this student.
+            if not err_msg:
+                err_msg = u'Unknown error'
+            report.add_row('problem_grade_report_err', student_fields + [err_msg])
+            return False
+
+        earned_possible_values = []
+        for block_location in self.graded_scorable_blocks:
+            try:
+                problem_score = course_grade.locations_to_scores[block_location]
+            except KeyError:
+                earned_possible_values.append([u'Not Available', u'Not Available'])
+            else:
+                if problem_score.attempted:
+                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+                else:
+                    earned_possible_values.append([u'Not Attempted', problem_score.possible])
+
+        report.add_row(
+            'problem_grade_report',
+            student_fields + [course_grade.percent] + list(chain.from_iterable(earned_possible_values))
+        )
+        return True
+
+
+GRADE_REPORTS = {
+    grade_report_class.report_type: grade_report_class
+    for grade_report_class in [CourseGradeReport, ProblemGradeReport]
+}
+
+
+def _upload_grade_report(grade_report_class, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name):
+    """
+    Generates the grade report of the given GradeReport class for all
+    enrolled students, and uploads its CSV files.
+
+    The students are graded in subtasks, in parallel, if there are more of
+    them than `settings.GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK`.
+    """
     start_time = time()
     start_date = datetime.now(UTC)
     status_interval = 100
     enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
     total_enrolled_students = enrolled_students.count()
-    task_progress = TaskProgress(action_name, total_enrolled_students, start_time)
 
     fmt = u'Task: {task_id}, InstructorTask ID: {entry_id}, Course: {course_id}, Input: {task_input}'
     task_info_string = fmt.format(
@@ -715,25 +1135,30 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
-    course = get_course_by_id(course_id)
-    course_is_cohorted = is_course_cohorted(course.id)
-    teams_enabled = course.teams_enabled
-    cohorts_header = ['Cohort Name'] if course_is_cohorted else []
-    teams_header = ['Team Name'] if teams_enabled else []
-
-    experiment_partitions = get_split_user_partitions(course.user_partitions)
-    group_configs_header = [u'Experiment Group ({})'.format(partition.name) for partition in experiment_partitions]
-
-    certificate_info_header = ['Certificate Eligible', 'Certificate Delivered', 'Certificate Type']
-    certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
-    whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
+    learners_per_subtask = settings.GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK
+    if _entry_id is not None and learners_per_subtask and total_enrolled_students > learners_per_subtask:
+        TASK_LOG.info(
+            u'%s, Task type: %s, Queuing subtasks to grade %s students',
+            task_info_string,
+            action_name,
+            total_enrolled_students,
+        )
+        return _queue_grade_report_shards(
+            grade_report_class, _entry_id, action_name, enrolled_students, total_enrolled_students
+        )
 
-    # Loop over all our students and build our CSV lists in memory
-    rows = []
-    err_rows = [["id", "username", "error_msg"]]
+    task_progress = TaskProgress(action_name, total_enrolled_students, start_time)
+    grade_report = grade_report_class(course_id)
+
+    # Loop over all our students and write their rows as we go, with periodic checkpoints
+    report = CheckpointedCsvReport(course_id, _entry_id, grade_report.csv_names)
+    report.restore_progress(task_progress)
+    if report.resume_after is None:
+        for csv_name, header_row in grade_report.header_rows():
+            report.add_row(csv_name, header_row)
     current_step = {'step': 'Calculating Grades'}
 
-    student_counter = 0
+    student_counter = task_progress.attempted
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
         task_info_string,
@@ -742,24 +1167,8 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         total_enrolled_students,
     )
 
-    graded_assignments = _graded_assignments(course_id)
-    grade_header = []
-    for assignment_info in graded_assignments.itervalues():
-        if assignment_info['use_subsection_headers']:
-            grade_header.extend(assignment_info['subsection_headers'].itervalues())
-        grade_header.append(assignment_info['average_header'])
-
-    rows.append(
-        ["Student ID", "Email", "Username", "Grade"] +
-        grade_header +
-        cohorts_header +
-        group_configs_header +
-        teams_header +
-        ['Enrollment Track', 'Verification Status'] +
-        certificate_info_header
-    )
-
-    for student, course_grade, err_msg in CourseGradeFactory().iter(course, enrolled_students):
+    learners_to_report = grade_report.prefetch(report.learners_to_report(enrolled_students))
+    for student, course_grade, err_msg in CourseGradeFactory().iter(grade_report.course, learners_to_report):
         # Periodically update task status (this is a cache write)
         if task_progress.attempted % status_interval == 0:
             task_progress.update_task_state(extra_meta=current_step)
@@ -777,71 +1186,11 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             total_enrolled_students
         )
 
-        if not course_grade:
-            # An empty gradeset means we failed to grade a student.
+        if grade_report.add_learner_rows(report, student, course_grade, err_msg):
+            task_progress.succeeded += 1
+        else:
             task_progress.failed += 1
-            err_rows.append([student.id, student.username, err_msg])
-            continue
-
-        # We were able to successfully grade this student for this course.
-        task_progress.succeeded += 1
-
-        cohorts_group_name = []
-        if course_is_cohorted:
-            group = get_cohort(student, course_id, assign=False)
-            cohorts_group_name.append(group.name if group else '')
-
-        group_configs_group_names = []
-        for partition in experiment_partitions:
-            group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
-            group_configs_group_names.append(group.name if group else '')
-
-        team_name = []
-        if teams_enabled:
-            try:
-                membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
-                team_name.append(membership.team.name)
-            except CourseTeamMembership.DoesNotExist:
-                team_name.append('')
-
-        enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
-        verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
-            student,
-            course_id,
-            enrollment_mode
-        )
-        certificate_info = certificate_info_for_user(
-            student,
-            course_id,
-            course_grade.letter_grade,
-            student.id in whitelisted_user_ids
-        )
-
-        grade_results = []
-        for assignment_type, assignment_info in graded_assignments.iteritems():
-            for subsection_location in assignment_info['subsection_headers']:
-                try:
-                    subsection_grade = course_grade.graded_subsections_by_format[assignment_type][subsection_location]
-                except KeyError:
-                    grade_results.append([u'Not Available'])
-                else:
-                    if subsection_grade.graded_total.attempted:
-                        grade_results.append(
-                            [subsection_grade.graded_total.earned / subsection_grade.graded_total.possible]
-                        )
-                    else:
-                        grade_results.append([u'Not Attempted'])
-            if assignment_info['use_subsection_headers']:
-                assignment_average = course_grade.grade_value['grade_breakdown'].get(assignment_type, {}).get('percent')
-                grade_results.append([assignment_average])
-
-        grade_results = list(chain.from_iterable(grade_results))
-
-        rows.append(
-            [student.id, student.email, student.username, course_grade.percent] +
-            grade_results + cohorts_group_name + group_configs_group_names + team_name +
-            [enrollment_mode] + [verification_status] + certificate_info
-        )
+        report.learner_completed(student.id, task_progress)
 
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
@@ -852,28 +1201,198 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
         total_enrolled_students
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
+    # By this point, we've written all the rows of our CSV files.
     current_step = {'step': 'Uploading CSVs'}
     task_progress.update_task_state(extra_meta=current_step)
     TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
-
-    # If there are any error rows (don't count the header), write them out as well
-    if len(err_rows) > 1:
-        upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
+    # Perform the actual upload, of error files only if they have rows (don't count the header)
+    for csv_name in grade_report.csv_names:
+        if grade_report.should_upload(csv_name, report.num_rows(csv_name) > 1):
+            report.upload(csv_name, start_date)
+    report.close()
 
     # One last update before we close out...
     TASK_LOG.info(u'%s, Task type: %s, Finalizing grade task', task_info_string, action_name)
     return task_progress.update_task_state(extra_meta=current_step)
 
 
-def _graded_assignments(course_key):
+def _queue_grade_report_shards(grade_report_class, entry_id, action_name, enrolled_students, total_enrolled_students):
+    """
+    Queues subtasks that each grade a shard of the enrolled students, of at
+    most `settings.GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK` students, for the
+    grade report of the given GradeReport class.
+
+    Returns the task progress as stored in the InstructorTask object, which
+    is updated by the subtasks as they complete.
+    """
+    # Imported here, since the subtask is defined along with the tasks that use this module.
+    from lms.djangoapps.instructor_task.tasks import calculate_grade_report_shard
+
+    entry = InstructorTask.objects.get(pk=entry_id)
+    # If the subtasks have already been queued, by an earlier run of this
+    # task that lost its connection to the broker, don't queue them again.
+    if entry.subtasks and entry.task_output:
+        TASK_LOG.warning(u'Task %s has already queued grade report subtasks: %s', entry.task_id, entry)
+        return json.loads(entry.task_output)
+
+    shard_indexes = count()
+
+    def _create_grade_report_shard_subtask(learners, initial_subtask_status):
+        """Creates a subtask to grade the given learners."""
+        return calculate_grade_report_shard.subtask(
+            (
+                entry_id,
+                grade_report_class.report_type,
+                [learner['pk'] for learner in learners],
+                next(shard_indexes),
+                initial_subtask_status.to_dict(),
+            ),
+            task_id=initial_subtask_status.task_id,
+            routing_key=settings.GRADES_DOWNLOAD_ROUTING_KEY,
+        )
+
+    # Learners are sharded in order of their ids, for the rows of the shards
+    # to be in the same order as they would be in a report generated by a single task.
+    return queue_subtasks_for_query(
+        entry,
+        action_name,
+        _create_grade_report_shard_subtask,
+        [enrolled_students.order_by('id')],
+        [],
+        settings.GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK,
+        total_enrolled_students,
+    )
+
+
+def _grade_report_shard_filename(entry_id, csv_name, shard_index):
+    """
+    Returns the filename of the part of the given CSV file generated by the
+    given shard.  Shards' parts are stored in a subdirectory of the course's
+    reports directory, so they aren't listed as reports.
+    """
+    return u'shards/{entry_id}/{csv_name}_{shard_index}.csv'.format(
+        entry_id=entry_id,
+        csv_name=csv_name,
+        shard_index=shard_index,
+    )
+
+
+def generate_grade_report_shard(entry_id, report_type, learner_ids, shard_index, subtask_status_dict):
+    """
+    Grades the given learners for a grade report generated by subtasks, and
+    stores their rows of each CSV file of the report as a part in the
+    ReportStore.
+
+    The subtask that completes last, whether it succeeded or failed, merges
+    the parts of all of the shards into the report's CSV files.
+
+    Returns the subtask's status, as a dict.
+    """
+    subtask_status = SubtaskStatus.from_dict(subtask_status_dict)
+    current_task_id = subtask_status.task_id
+    TASK_LOG.info(
+        u'Preparing to grade %s learners for %s as subtask %s (shard %s) of instructor task %d',
+        len(learner_ids), report_type, current_task_id, shard_index, entry_id,
+    )
+
+    # Check that the requested subtask is actually known to the current InstructorTask
+    # entry, and hasn't already been completed, as bulk email subtasks do.
+    check_subtask_is_valid(entry_id, current_task_id, subtask_status)
+
+    try:
+        course_id = InstructorTask.objects.get(pk=entry_id).course_id
+        grade_report = GRADE_REPORTS[report_type](course_id)
+        report = CheckpointedCsvReport(course_id, None, grade_report.csv_names)
+
+        learners = grade_report.prefetch(User.objects.filter(id__in=learner_ids).order_by('id'))
+        for student, course_grade, err_msg in CourseGradeFactory().iter(grade_report.course, learners):
+            if grade_report.add_learner_rows(report, student, course_grade, err_msg):
+                subtask_status.increment(succeeded=1)
+            else:
+                subtask_status.increment(failed=1)
+            report.learner_completed(student.id, subtask_status)
+
+        for csv_name in grade_report.csv_names:
+            if report.num_rows(csv_name):
+                report.store(csv_name, _grade_report_shard_filename(entry_id, csv_name, shard_index))
+        report.close()
+    except Exception:
+        # Count the learners who weren't graded as having failed, to keep the counts consistent.
+        TASK_LOG.exception(
+            u'Grade report subtask %s of instructor task %d: failed unexpectedly!', current_task_id, entry_id
+        )
+        subtask_status.increment(failed=len(learner_ids) - subtask_status.attempted, state=FAILURE)
+        if update_subtask_status(entry_id, current_task_id, subtask_status, defer_success=True):
+            _complete_grade_report_shards(report_type, entry_id)
+        raise
+
+    # Learners who unenrolled since the subtasks were queued are skipped.
+    subtask_status.increment(skipped=len(learner_ids) - subtask_status.attempted, state=SUCCESS)
+    if update_subtask_status(entry_id, current_task_id, subtask_status, defer_success=True):
+        _complete_grade_report_shards(report_type, entry_id, grade_report)
+
+    TASK_LOG.info(
+        u'Grade report subtask %s of instructor task %d: returning status %s', current_task_id, entry_id, subtask_status
+    )
+    return subtask_status.to_dict()
+
+
+def _complete_grade_report_shards(report_type, entry_id, grade_report=None):
+    """
+    Merges the parts stored by the shards of the grade report of the given
+    type, once all of them are done, and marks the InstructorTask as having
+    succeeded, or as having failed if the parts couldn't be merged.
+    """
+    try:
+        if grade_report is None:
+            grade_report = GRADE_REPORTS[report_type](InstructorTask.objects.get(pk=entry_id).course_id)
+        _merge_grade_report_shards(grade_report, entry_id)
+    except Exception as exc:
+        TASK_LOG.exception(u'Grade report of instructor task %d: failed to merge the shards!', entry_id)
+        complete_subtasks_task(entry_id, exc, traceback.format_exc())
+        raise
+    complete_subtasks_task(entry_id)
+
+
+def _merge_grade_report_shards(grade_report, entry_id):
+    """
+    Uploads the CSV files of the given GradeReport, each concatenated from
+    its header and the parts stored by each of the shards of the InstructorTask.
+    """
+    course_id = grade_report.course.id
+    num_shards = json.loads(InstructorTask.objects.get(pk=entry_id).subtasks)['total']
+    report_store = ReportStore.from_config('GRADES_DOWNLOAD')
+    timestamp = datetime.now(UTC)
+
+    for csv_name, header_row in grade_report.header_rows():
+        # A shard only stores a part of a CSV file if it has rows, and a failed shard stores none.
+        part_filenames = [
+            part_filename
+            for part_filename in (
+                _grade_report_shard_filename(entry_id, csv_name, shard_index) for shard_index in xrange(num_shards)
+            )
+            if report_store.exists(course_id, part_filename)
+        ]
+        if grade_report.should_upload(csv_name, bool(part_filenames)):
+            header_filename = _grade_report_shard_filename(entry_id, csv_name, 'header')
+            report_store.store_rows(course_id, header_filename, [header_row])
+            report_store.store_concatenated(
+                course_id,
+                report_filename(course_id, csv_name, timestamp),
+                [header_filename] + part_filenames,
+            )
+            tracker.emit(REPORT_REQUESTED_EVENT_NAME, {"report_type": csv_name, })
+            part_filenames.append(header_filename)
+        for part_filename in part_filenames:
+            report_store.delete(course_id, part_filename)
+
+
+def _graded_assignments(course):
     """
     Returns an OrderedDict that maps an assignment type to a dict of subsection-headers and average-header.
     """
-    grading_context = grading_context_for_course(course_key)
+    grading_context = course_grading_context(course).grading_context
     graded_assignments_map = OrderedDict()
     for assignment_type_name, subsection_infos in grading_context['all_graded_subsections_by_type'].iteritems():
         graded_subsections_map = OrderedDict()
@@ -903,13 +1422,13 @@ def _graded_assignments(course_key):
     return graded_assignments_map
 
 
-def _graded_scorable_blocks_to_header(course_key):
+def _graded_scorable_blocks_to_header(course):
     """
     Returns an OrderedDict that maps a scorable block's id to its
     headers in the final report.
     """
     scorable_blocks_map = OrderedDict()
-    grading_context = grading_context_for_course(course_key)
+    grading_context = course_grading_context(course).grading_context
     for assignment_type_name, subsection_infos in grading_context['all_graded_subsections_by_type'].iteritems():
         for subsection_index, subsection_info in enumerate(subsection_infos, start=1):
             for scorable_block in subsection_info['scored_descendants']:
@@ -965,63 +1484,9 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
     Generate a CSV containing all students' problem grades within a given
     `course_id`.
     """
-    start_time = time()
-    start_date = datetime.now(UTC)
-    status_interval = 100
-    enrolled_students = CourseEnrollment.objects.users_enrolled_in(course_id)
-    task_progress = TaskProgress(action_name, enrolled_students.count(), start_time)
-
-    # This struct encapsulates both the display names of each static item in the
-    # header row as values as well as the django User field names of those items
-    # as the keys.  It is structured in this way to keep the values related.
-    header_row = OrderedDict([('id', 'Student ID'), ('email', 'Email'), ('username', 'Username')])
-
-    graded_scorable_blocks = _graded_scorable_blocks_to_header(course_id)
-
-    # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Grade'] + list(chain.from_iterable(graded_scorable_blocks.values()))]
-    error_rows = [list(header_row.values()) + ['error_msg']]
-    current_step = {'step': 'Calculating Grades'}
-
-    course = get_course_by_id(course_id)
-    for student, course_grade, err_msg in CourseGradeFactory().iter(course, enrolled_students):
-        student_fields = [getattr(student, field_name) for field_name in header_row]
-        task_progress.attempted += 1
-
-        if not course_grade:
-            # There was an error grading this student.
-            if not err_msg:
-                err_msg = u'Unknown error'
-            error_rows.append(student_fields + [err_msg])
-            task_progress.failed += 1
-            continue
-
-        earned_possible_values = []
-        for block_location in graded_scorable_blocks:
-            try:
-                problem_score = course_grade.locations_to_scores[block_location]
-            except KeyError:
-                earned_possible_values.append([u'Not Available', u'Not Available'])
-            else:
-                if problem_score.attempted:
-                    earned_possible_values.append([problem_score.earned, problem_score.possible])
-                else:
-                    earned_possible_values.append([u'Not Attempted', problem_score.possible])
-
-        rows.append(student_fields + [course_grade.percent] + list(chain.from_iterable(earned_possible_values)))
-
-        task_progress.succeeded += 1
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
-    # If there are any error rows, write them out as well
-    if len(error_rows) > 1:
-        upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
-
-    return task_progress.update_task_state(extra_meta={'step': 'Uploading CSV'})
+    return _upload_grade_report(
+        ProblemGradeReport, _xmodule_instance_args, _entry_id, course_id, _task_input, action_name
+    )
 
 
 def upload_students_csv(_xmodule_instance_args, _entry_id, course_id, task_input, action_name):
@@ -0,0 +1,101 @@
+"""
+Tests for the bulk loading of the learner attributes shown in grade reports.
+"""
+from nose.plugins.attrib import attr
+
+from certificates.models import CertificateStatuses, certificate_info_for_user
+from certificates.tests.factories import GeneratedCertificateFactory
+from course_modes.models import CourseMode
+from lms.djangoapps.instructor_task.learner_attributes import LearnerAttributes
+from lms.djangoapps.instructor_task.tests.test_base import InstructorTaskCourseTestCase
+from lms.djangoapps.lms_xblock.runtime import LmsPartitionService
+from teams.tests.factories import CourseTeamFactory, CourseTeamMembershipFactory
+from lms.djangoapps.verify_student.models import SoftwareSecurePhotoVerification
+from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
+from openedx.core.djangoapps.course_groups.cohorts import add_user_to_cohort, get_cohort
+from openedx.core.djangoapps.course_groups.tests.helpers import CohortFactory
+import openedx.core.djangoapps.user_api.course_tag.api as course_tag_api
+from openedx.core.djangoapps.user_api.partition_schemes import RandomUserPartitionScheme
+from student.models import CourseEnrollment
+from xmodule.partitions.partitions import Group, UserPartition
+
+
+@attr(shard=3)
+class TestLearnerAttributes(InstructorTaskCourseTestCase):
+    """
+    Tests that LearnerAttributes loads the same attributes as the functions
+    that load them for one learner, in a number of queries that doesn't
+    depend on the number of learners.
+    """
+    def setUp(self):
+        super(TestLearnerAttributes, self).setUp()
+        self.initialize_course(course_factory_kwargs={'cohort_config': {'cohorted': True}})
+        self.partition = UserPartition(
+            0, 'Experiment', 'An experiment', [Group(0, 'Group A'), Group(1, 'Group B')],
+            scheme=RandomUserPartitionScheme,
+        )
+
+        self.students = [
+            self.create_student('student{}'.format(index), mode=mode)
+            for index, mode in enumerate([CourseMode.HONOR, CourseMode.VERIFIED, CourseMode.VERIFIED, CourseMode.AUDIT])
+        ]
+        cohort = CohortFactory(course_id=self.course.id, name='Cohort')
+        add_user_to_cohort(cohort, self.students[0].username)
+        team = CourseTeamFactory(course_id=self.course.id, name='Team')
+        CourseTeamMembershipFactory(user=self.students[1], team=team)
+        course_tag_api.set_course_tag(
+            self.students[2], self.course.id, RandomUserPartitionScheme.key_for_partition(self.partition), '1'
+        )
+        SoftwareSecurePhotoVerificationFactory(user=self.students[1], status='approved')
+        GeneratedCertificateFactory(
+            user=self.students[1], course_id=self.course.id, status=CertificateStatuses.downloadable, mode='verified'
+        )
+
+    def create_learner_attributes(self):
+        """
+        Returns the LearnerAttributes of the test course.
+        """
+        return LearnerAttributes(self.course.id, True, [self.partition], True)
+
+    def test_attributes(self):
+        learner_attributes = self.create_learner_attributes()
+        for student in learner_attributes.prefetch(self.students):
+            cohort = get_cohort(student, self.course.id, assign=False)
+            self.assertEqual(learner_attributes.cohort_name(student), cohort.name if cohort else '')
+
+            group = LmsPartitionService(student, self.course.id).get_group(self.partition, assign=False)
+            self.assertEqual(learner_attributes.experiment_group_names(student), [group.name if group else ''])
+
+            self.assertEqual(learner_attributes.team_name(student), 'Team' if student == self.students[1] else '')
+
+            enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, self.course.id)[0]
+            self.assertEqual(learner_attributes.enrollment_mode(student), enrollment_mode)
+            self.assertEqual(
+                learner_attributes.verification_status(student),
+                SoftwareSecurePhotoVerification.verification_status_for_user(student, self.course.id, enrollment_mode),
+            )
+            for grade in ['Pass', None]:
+                self.assertEqual(
+                    learner_attributes.certificate_info(student, grade, False),
+                    certificate_info_for_user(student, self.course.id, grade, False),
+                )
+
+    def test_num_queries(self):
+        learner_attributes = self.create_learner_attributes()
+        # cohort memberships, course tags, team memberships, enrollments,
+        # verifications, certificates and profiles
+        with self.assertNumQueries(7):
+            students = list(learner_attributes.prefetch(self.students))
+            for student in students:
+                learner_attributes.cohort_name(student)
+                learner_attributes.experiment_group_names(student)
+                learner_attributes.team_name(student)
+                learner_attributes.enrollment_mode(student)
+                learner_attributes.verification_status(student)
+                learner_attributes.certificate_info(student, None, False)
+
+    def test_learner_not_loaded(self):
+        learner_attributes = self.create_learner_attributes()
+        learner_attributes.load(self.students[:1])
+        self.assertEqual(learner_attributes.team_name(self.students[1]), 'Team')
+        self.assertEqual(learner_attributes.cohort_name(self.students[0]), 'Cohort')
@@ -8,12 +8,15 @@ Unit tests for LMS instructor-initiated background tasks helper functions.
 
 """
 
+import json
 import os
 import shutil
 from datetime import datetime
 import urllib
+from uuid import uuid4
 
 import ddt
+from celery.states import SUCCESS, FAILURE
 from freezegun import freeze_time
 from mock import Mock, patch, MagicMock
 from nose.plugins.attrib import attr
@@ -48,9 +51,13 @@ from student.models import CourseEnrollment, CourseEnrollmentAllowed, ManualEnro
 from lms.djangoapps.verify_student.tests.factories import SoftwareSecurePhotoVerificationFactory
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from xmodule.partitions.partitions import Group, UserPartition
-from lms.djangoapps.instructor_task.models import ReportStore
+from lms.djangoapps.instructor_task.models import InstructorTask, ReportStore
+from lms.djangoapps.instructor_task.tests.factories import InstructorTaskFactory
 from survey.models import SurveyForm, SurveyAnswer
 from lms.djangoapps.instructor_task.tasks_helper import (
+    CheckpointedCsvReport,
+    CourseGradeReport,
+    TaskProgress,
     cohort_students_and_upload,
     upload_problem_responses_csv,
     upload_grades_csv,
@@ -311,6 +318,151 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         result = upload_grades_csv(None, None, self.course.id, None, 'graded')
         self.assertDictContainsSubset({'attempted': 1, 'succeeded': 1, 'failed': 0}, result)
 
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    def test_resume_from_checkpoint(self, _mock_current_task):
+        """
+        Tests that a grade report resumes from its last checkpoint, with the
+        rows of the learners before it and without grading them again.
+        """
+        entry_id = 42
+        students = [self.create_student('student{}'.format(i)) for i in range(3)]
+
+        # Store a checkpoint after the first learner, as an interrupted run would have.
+        report = CheckpointedCsvReport(self.course.id, entry_id, ['grade_report', 'grade_report_err'])
+        report.add_row('grade_report', ['Student ID', 'Email', 'Username', 'Grade'])
+        report.add_row('grade_report', [students[0].id, students[0].email, students[0].username, 0.0])
+        task_progress = TaskProgress('graded', len(students), 0)
+        task_progress.attempted = task_progress.succeeded = 1
+        report.store_checkpoint(students[0].id, task_progress)
+
+        with patch('lms.djangoapps.grades.new.course_grade.CourseGradeFactory.create') as mock_create:
+            mock_create.return_value = MagicMock(percent=0.0, letter_grade=None)
+            result = upload_grades_csv(None, entry_id, self.course.id, None, 'graded')
+        self.assertEqual([call[0][0] for call in mock_create.call_args_list], students[1:])
+        self.assertDictContainsSubset({'attempted': 3, 'succeeded': 3, 'failed': 0}, result)
+
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        links = report_store.links_for(self.course.id)
+        self.assertEqual(len(links), 1)
+        with report_store.storage.open(report_store.path_to(self.course.id, links[0][0])) as csv_file:
+            rows = list(unicodecsv.reader(csv_file))
+        self.assertEqual(rows[0][:4], ['Student ID', 'Email', 'Username', 'Grade'])
+        self.assertEqual([row[2] for row in rows[1:]], [student.username for student in students])
+        self.assertFalse(report_store.exists(self.course.id, 'checkpoints/{}/checkpoint.json'.format(entry_id)))
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    def test_sharded_grade_report(self, _mock_current_task):
+        """
+        Tests that the grade report of a course with more learners than
+        GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK is generated by subtasks, and
+        merged in order with combined progress.
+        """
+        students = [self.create_student('student{}'.format(i)) for i in range(5)]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        with override_settings(GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK=2):
+            upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertEqual(json.loads(entry.subtasks)['total'], 3)
+        self.assertDictContainsSubset(
+            {'attempted': 5, 'succeeded': 5, 'failed': 0, 'total': 5},
+            json.loads(entry.task_output),
+        )
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{'Username': student.username} for student in students],
+            ignore_other_columns=True,
+        )
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    def test_sharded_grade_report_last_shard_failed(self, _mock_current_task):
+        """
+        Tests that the shards of a grade report are merged when the last
+        shard to complete failed.
+        """
+        students = [self.create_student('student{}'.format(i)) for i in range(5)]
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        add_learner_rows = CourseGradeReport.add_learner_rows
+
+        def _fail_last_learner(grade_report, report, student, course_grade, err_msg):
+            """Fails the shard of the last learner."""
+            if student == students[-1]:
+                raise ValueError('last shard failed')
+            return add_learner_rows(grade_report, report, student, course_grade, err_msg)
+
+        with override_settings(GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK=2):
+            with patch.object(CourseGradeReport, 'add_learner_rows', autospec=True, side_effect=_fail_last_learner):
+                upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, SUCCESS)
+        self.assertDictContainsSubset({'succeeded': 4, 'failed': 1}, json.loads(entry.task_output))
+        report_store = ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+        self.assertEqual(len(report_store.links_for(self.course.id)), 1)
+        self.verify_rows_in_csv(
+            [{'Username': student.username} for student in students[:-1]],
+            ignore_other_columns=True,
+        )
+
+    @patch('lms.djangoapps.instructor_task.tasks_helper._get_current_task')
+    @patch('lms.djangoapps.instructor_task.tasks_helper._merge_grade_report_shards', side_effect=ValueError('merge'))
+    def test_sharded_grade_report_merge_failed(self, _mock_merge, _mock_current_task):
+        """
+        Tests that the task of a grade report whose shards couldn't be merged
+        is marked as failed, rather than as having succeeded.
+        """
+        for i in range(3):
+            self.create_student('student{}'.format(i))
+        entry = InstructorTaskFactory.create(
+            course_id=self.course.id,
+            task_id=str(uuid4()),
+            task_key='dummy_task_key',
+            task_type='grade_course',
+        )
+        with override_settings(GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK=2):
+            upload_grades_csv(None, entry.id, self.course.id, None, 'graded')
+
+        entry = InstructorTask.objects.get(pk=entry.id)
+        self.assertEqual(entry.task_state, FAILURE)
+        self.assertEqual(json.loads(entry.task_output)['message'], 'merge')
+
+    def test_checkpointed_csv_report(self):
+        """
+        Tests that the rows of a report are stored in parts at each
+        checkpoint, and concatenated on upload.
+        """
+        report = CheckpointedCsvReport(self.course.id, 1, ['test_report'], checkpoint_interval=2)
+        report.add_row('test_report', ['learner'])
+        for learner_id in range(1, 6):
+            report.add_row('test_report', [learner_id])
+            report.learner_completed(learner_id, TaskProgress('test', 5, 0))
+        self.assertEqual(report.resume_after, 4)
+        self.assertEqual(report.num_rows('test_report'), 6)
+
+        resumed_report = CheckpointedCsvReport(self.course.id, 1, ['test_report'])
+        self.assertEqual(resumed_report.resume_after, 4)
+        self.assertEqual(resumed_report.num_rows('test_report'), 5)
+
+        report.upload('test_report', datetime.now(UTC))
+        report.close()
+        self.verify_rows_in_csv(
+            [{'learner': unicode(learner_id)} for learner_id in range(1, 6)],
+            file_index=0,
+        )
+        self.assertIsNone(CheckpointedCsvReport(self.course.id, 1, ['test_report']).resume_after)
+
 
 class TestTeamGradeReport(InstructorGradeReportTestCase):
     """ Test that teams appear correctly in the grade report when it is enabled for the course. """
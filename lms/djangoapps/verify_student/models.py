@@ -969,6 +969,36 @@ class SoftwareSecurePhotoVerification(PhotoVerification):
         else:
             return 'ID Verified'
 
+    @classmethod
+    def verification_statuses_for_users(cls, user_enrollment_modes):
+        """
+        Returns the verification statuses for use in grade report of many
+        users at once, as a dict of user ids to statuses.
+
+        `user_enrollment_modes` is a dict of the ids of the users to their
+        enrollment modes.
+        """
+        verified_mode_user_ids = [
+            user_id for user_id, mode in user_enrollment_modes.iteritems() if mode in CourseMode.VERIFIED_MODES
+        ]
+        verified_user_ids = set()
+        if verified_mode_user_ids:
+            verified_user_ids = set(cls.objects.filter(
+                user_id__in=verified_mode_user_ids,
+                status="approved",
+                created_at__gte=cls._earliest_allowed_date()
+            ).values_list('user_id', flat=True))
+
+        statuses = {}
+        for user_id, mode in user_enrollment_modes.iteritems():
+            if mode not in CourseMode.VERIFIED_MODES:
+                statuses[user_id] = 'N/A'
+            elif user_id in verified_user_ids:
+                statuses[user_id] = 'ID Verified'
+            else:
+                statuses[user_id] = 'Not ID Verified'
+        return statuses
+
     @classmethod
     def is_verification_expiring_soon(cls, expiration_datetime):
         """
@@ -60,6 +60,16 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+# Connections to the comments service.  When POOL_CONNECTIONS is True, the
+# requests of each process share a session keeping up to POOL_SIZE connections
+# alive, failed connections are retried up to MAX_RETRIES times, and batches
+# of requests are sent concurrently.
+COMMENTS_SERVICE_CONNECTION_SETTINGS = {
+    'POOL_CONNECTIONS': False,
+    'POOL_SIZE': 10,
+    'MAX_RETRIES': 0,
+}
+
 LMS_ROOT_URL = "http://localhost:8000"
 
 # Features
@@ -361,6 +371,20 @@ FEATURES = {
     # Note: This has no effect unless ANALYTICS_DASHBOARD_URL is already set,
     #       because without that setting, the tab does not show up for any courses.
     'ENABLE_CCX_ANALYTICS_DASHBOARD_URL': False,
+
+    # Build the courseware's table of contents from the course's cached
+    # block structure, rather than from the bound modules of its chapters
+    # and sections.
+    'ENABLE_COURSE_BLOCKS_NAVIGATION': False,
+
+    # Serve outdated course overviews as they are when loading them in bulk,
+    # while they are recreated asynchronously.
+    'ASYNC_COURSE_OVERVIEW_REGENERATION': False,
+
+    # Read the inline discussions of a course that a user has access to from
+    # the course's cached block structure, rather than loading and checking
+    # access to each of them.
+    'ENABLE_DISCUSSION_INDEX': False,
 }
 
 # Ignore static asset files on import which match this pattern
@@ -759,6 +783,11 @@ MODULESTORE = {
     }
 }
 
+# Maximum total size, in bytes, of the uncompressed course structures held in
+# each process's local tier of the split modulestore's course structure cache.
+# Set to 0 to disable the local tier.
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -1813,6 +1842,35 @@ BLOCK_STRUCTURES_SETTINGS = dict(
 
     # Maximum number of retries per task.
     BLOCK_STRUCTURES_TASK_MAX_RETRIES=5,
+
+    # Whether to update the block structures cache incrementally after a
+    # course is published, recollecting data only for changed blocks and
+    # keeping the previously cached data available until then, rather
+    # than clearing the cache and recollecting the whole course.
+    BLOCK_STRUCTURES_INCREMENTAL_UPDATE=False,
+
+    # Whether to store block structures in the cache as a root index and
+    # a chunk per chapter, rather than as a single value.  Chunked block
+    # structures stay under the cache's item size limit for large courses,
+    # and only the needed chunks are read when transforming part of a course.
+    BLOCK_STRUCTURES_CHUNKED_CACHE=False,
+
+    # Whether to transform block structures in their compact, array-backed
+    # representation, which makes traversing and pruning large courses
+    # cheaper.
+    BLOCK_STRUCTURES_COMPACT_TRANSFORMS=False,
+
+    # The name of the compressor of the block structures stored in the
+    # cache, from openedx.core.lib.cache_utils.COMPRESSORS, such as
+    # 'zlib-fast' for faster writes of somewhat larger values.  If None,
+    # they are compressed with zlib, in the format used before compressors
+    # could be chosen.  Values stored with any compressor can be read.
+    BLOCK_STRUCTURES_CACHE_COMPRESSOR=None,
+
+    # Whether to store block structures in the cache in a schema-aware
+    # encoding, which is faster to write and read, rather than pickled.
+    # Values stored in either encoding can be read.
+    BLOCK_STRUCTURES_SCHEMA_ENCODED_CACHE=False,
 )
 
 ################################ Bulk Email ###################################
@@ -1864,6 +1922,17 @@ BULK_EMAIL_RETRY_DELAY_BETWEEN_SENDS = 0.02
 # Queue to use for updating persistent grades
 RECALCULATE_GRADES_ROUTING_KEY = LOW_PRIORITY_QUEUE
 
+# Number of seconds to wait before recalculating a learner's subsection grades
+# after a score change, during which their other score changes in the course are
+# recalculated by the same task. Each score change is recalculated on its own
+# if not set.
+RECALCULATE_GRADES_COALESCE_DELAY = None
+
+# Number of seconds to wait before rebuilding the score distributions of a course
+# read by the class dashboard after one of its scores changes, during which its
+# other score changes are aggregated by the same rebuild.
+SCORE_DISTRIBUTIONS_UPDATE_DELAY = 5 * 60
+
 ############################# Email Opt In ####################################
 
 # Minimum age for organization-wide email opt in
@@ -2330,6 +2399,10 @@ VERIFY_STUDENT = {
 }
 
 ### This enables the Metrics tab for the Instructor dashboard ###########
+# The score distributions it reads are only rebuilt as scores change while
+# it is enabled (see SCORE_DISTRIBUTIONS_UPDATE_DELAY): when enabling it
+# again, run the clear_score_distributions management command so that they
+# are rebuilt.
 FEATURES['CLASS_DASHBOARD'] = False
 if FEATURES.get('CLASS_DASHBOARD'):
     INSTALLED_APPS += ('class_dashboard',)
@@ -2405,6 +2478,10 @@ BADGR_TIMEOUT = 10
 # the ones that contain information other than grades.
 GRADES_DOWNLOAD_ROUTING_KEY = HIGH_MEM_QUEUE
 
+# Grade reports of courses with more enrolled learners than this are generated by
+# subtasks that each grade this many learners, in parallel.  None disables this.
+GRADES_DOWNLOAD_LEARNERS_PER_SUBTASK = None
+
 GRADES_DOWNLOAD = {
     'STORAGE_TYPE': 'localfs',
     'BUCKET': 'edx-grades',
@@ -230,6 +230,9 @@ CACHES = {
     },
 }
 
+# Don't keep course structures in a process-local cache between tests
+COURSE_STRUCTURE_LOCAL_CACHE_MAX_BYTES = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
@@ -1,6 +1,6 @@
 import logging
 
-from .utils import extract, perform_request, CommentClientRequestError
+from .utils import extract, perform_request, perform_requests, CommentClientRequestError
 
 
 log = logging.getLogger(__name__)
@@ -67,16 +67,50 @@ class Model(object):
         return self
 
     def _retrieve(self, *args, **kwargs):
-        url = self.url(action='get', params=self.attributes)
+        url, params = self._retrieve_request(*args, **kwargs)
         response = perform_request(
             'get',
             url,
-            self.default_retrieve_params,
+            params,
             metric_tags=self._metric_tags,
             metric_action='model.retrieve'
         )
         self._update_from_response(response)
 
+    def _retrieve_request(self, *args, **kwargs):
+        """
+        Returns the (url, params) of the request retrieving this instance.
+        """
+        return self.url(action='get', params=self.attributes), self.default_retrieve_params
+
+    @classmethod
+    def retrieve_all(cls, instances, *args, **kwargs):
+        """
+        Retrieves those of the given instances that haven't been retrieved,
+        in a batch of requests to the comments service.  If any of the
+        requests fails, the instances are retrieved one by one instead, as
+        retrieve does.
+        """
+        # pylint: disable=protected-access
+        instances = [instance for instance in instances if not instance.retrieved]
+        try:
+            responses = perform_requests(
+                'get',
+                [
+                    instance._retrieve_request(*args, **kwargs) + (instance._metric_tags,)
+                    for instance in instances
+                ],
+                metric_action='model.retrieve'
+            )
+        except CommentClientRequestError:
+            for instance in instances:
+                instance.retrieve(*args, **kwargs)
+            return
+
+        for instance, response in zip(instances, responses):
+            instance._update_from_response(response)
+            instance.retrieved = True
+
     @property
     def _metric_tags(self):
         """
@@ -127,10 +127,7 @@ class Thread(models.Model):
         else:
             return super(Thread, cls).url(action, params)
 
-    # TODO: This is currently overriding Model._retrieve only to add parameters
-    # for the request. Model._retrieve should be modified to handle this such
-    # that subclasses don't need to override for this.
-    def _retrieve(self, *args, **kwargs):
+    def _retrieve_request(self, *args, **kwargs):
         url = self.url(action='get', params=self.attributes)
         request_params = {
             'recursive': kwargs.get('recursive'),
@@ -140,16 +137,7 @@ class Thread(models.Model):
             'resp_skip': kwargs.get('response_skip'),
             'resp_limit': kwargs.get('response_limit'),
         }
-        request_params = strip_none(request_params)
-
-        response = perform_request(
-            'get',
-            url,
-            request_params,
-            metric_action='model.retrieve',
-            metric_tags=self._metric_tags
-        )
-        self._update_from_response(response)
+        return url, strip_none(request_params)
 
     def flagAbuse(self, user, voteable):
         if voteable.type == 'thread':
@@ -134,7 +134,7 @@ class User(models.Model):
             thread_count=response.get('thread_count', 0)
         )
 
-    def _retrieve(self, *args, **kwargs):
+    def _retrieve_request(self, *args, **kwargs):
         url = self.url(action='get', params=self.attributes)
         retrieve_params = self.default_retrieve_params.copy()
         retrieve_params.update(kwargs)
@@ -142,6 +142,10 @@ class User(models.Model):
             retrieve_params['course_id'] = self.course_id.to_deprecated_string()
         if self.attributes.get('group_id'):
             retrieve_params['group_id'] = self.group_id
+        return url, retrieve_params
+
+    def _retrieve(self, *args, **kwargs):
+        url, retrieve_params = self._retrieve_request(*args, **kwargs)
         try:
             response = perform_request(
                 'get',
@@ -2,14 +2,25 @@
 from contextlib import contextmanager
 import dogstats_wrapper as dog_stats_api
 import logging
+from multiprocessing.pool import ThreadPool
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
 from django.conf import settings
+from threading import Lock
 from time import time
 from uuid import uuid4
 from django.utils.translation import get_language
 
 log = logging.getLogger(__name__)
 
+# The session shared by the requests of the process to the comments service,
+# and the pool of threads sending batches of requests over it, when
+# connections are pooled.
+_session = None
+_request_pool = None
+_session_lock = Lock()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -51,15 +62,119 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
-def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+def _connection_settings():
+    """
+    Returns the settings of the connections to the comments service.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_CONNECTION_SETTINGS', {})
+
+
+def get_session():
+    """
+    Returns the session shared by the requests of the process to the
+    comments service, keeping its connections alive, or None if connections
+    aren't pooled.
+    """
+    global _session  # pylint: disable=global-statement
+    connection_settings = _connection_settings()
+    if not connection_settings.get('POOL_CONNECTIONS', False):
+        return None
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                pool_size = connection_settings.get('POOL_SIZE', 10)
+                # Only failed connections are retried, since other failed
+                # requests may have been processed by the comments service.
+                adapter = HTTPAdapter(
+                    pool_connections=pool_size,
+                    pool_maxsize=pool_size,
+                    max_retries=Retry(total=connection_settings.get('MAX_RETRIES', 0), read=False),
+                )
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _get_request_pool():
+    """
+    Returns the pool of threads shared by the batches of requests of the
+    process, with a thread for each of the pooled session's connections.
+    It's created when first needed, so that its threads are those of the
+    process using it.
+    """
+    global _request_pool  # pylint: disable=global-statement
+    if _request_pool is None:
+        with _session_lock:
+            if _request_pool is None:
+                _request_pool = ThreadPool(_connection_settings().get('POOL_SIZE', 10))
+    return _request_pool
+
+
+def _get_forums_config():
+    """
+    Returns the current ForumsConfig, raising a CommentClientMaintenanceError
+    if the comments service is disabled.
+    """
     # To avoid dependency conflict
     from django_comment_common.models import ForumsConfig
     config = ForumsConfig.current()
 
     if not config.enabled:
         raise CommentClientMaintenanceError('service disabled')
+    return config
 
+
+def perform_request(method, url, data_or_params=None, raw=False,
+                    metric_action=None, metric_tags=None, paged_results=False):
+    config = _get_forums_config()
+    session = get_session()
+    request = _build_request(config, get_language(), method, url, data_or_params, metric_action, metric_tags)
+    response = _send_request(session, request)
+    return _process_response(request, response, raw, paged_results)
+
+
+def perform_requests(method, requests_args, raw=False, metric_action=None):
+    """
+    Performs a batch of requests to the comments service, returning their
+    results in order, as perform_request does for each of them.
+
+    When connections are pooled, the requests are sent concurrently over
+    the pooled session.  Otherwise, they are sent one after another.  If
+    any of the requests fails, the error of the first of them is raised.
+
+    Arguments:
+        method (str): The HTTP method of the requests.
+        requests_args (list): (url, data_or_params, metric_tags) tuples
+            of the requests.
+        raw (bool): Whether to return the text of the responses, rather
+            than their parsed JSON.
+        metric_action (str): The action recorded in the metrics of the
+            requests.
+    """
+    config = _get_forums_config()
+    session = get_session()
+    language = get_language()
+    batch = [
+        _build_request(config, language, method, url, data_or_params, metric_action, metric_tags)
+        for url, data_or_params, metric_tags in requests_args
+    ]
+
+    if session is None or len(batch) < 2:
+        responses = [_send_request(session, request) for request in batch]
+    else:
+        responses = _get_request_pool().map(lambda request: _send_request(session, request), batch)
+
+    return [_process_response(request, response, raw) for request, response in zip(batch, responses)]
+
+
+def _build_request(config, language, method, url, data_or_params, metric_action, metric_tags):
+    """
+    Returns a dict of the arguments of a request to the comments service,
+    with its id and metric tags.
+    """
     if metric_tags is None:
         metric_tags = []
 
@@ -71,7 +186,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data_or_params = {}
     headers = {
         'X-Edx-Api-Key': config.api_key,
-        'Accept-Language': get_language(),
+        'Accept-Language': language,
     }
     request_id = uuid4()
     request_id_dict = {'request_id': request_id}
@@ -82,16 +197,42 @@ def perform_request(method, url, data_or_params=None, raw=False,
     else:
         data = None
         params = merge_dict(data_or_params, request_id_dict)
-    with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
-            method,
-            url,
-            data=data,
-            params=params,
-            headers=headers,
-            timeout=config.connection_timeout
+    return {
+        'request_id': request_id,
+        'metric_tags': metric_tags,
+        'method': method,
+        'url': url,
+        'data': data,
+        'params': params,
+        'headers': headers,
+        'timeout': config.connection_timeout,
+    }
+
+
+def _send_request(session, request):
+    """
+    Sends the given request, over the given session if any, and returns
+    its response.
+    """
+    send = requests.request if session is None else session.request
+    with request_timer(request['request_id'], request['method'], request['url'], request['metric_tags']):
+        return send(
+            request['method'],
+            request['url'],
+            data=request['data'],
+            params=request['params'],
+            headers=request['headers'],
+            timeout=request['timeout']
         )
 
+
+def _process_response(request, response, raw, paged_results=False):
+    """
+    Returns the result of the response to the given request, raising the
+    CommentClientError of a failed request.
+    """
+    request_id = request['request_id']
+    metric_tags = request['metric_tags']
     metric_tags.append(u'status_code:{}'.format(response.status_code))
     if response.status_code > 200:
         metric_tags.append(u'result:failure')
@@ -1,6 +1,7 @@
 """
 Higher order functions built on the BlockStructureManager to interact with a django cache.
 """
+from django.conf import settings
 from django.core.cache import cache
 from openedx.core.lib.block_structure.manager import BlockStructureManager
 from xmodule.modulestore.django import modulestore
@@ -19,13 +20,16 @@ def get_course_in_cache(course_key):
     return get_block_structure_manager(course_key).get_collected()
 
 
-def update_course_in_cache(course_key):
+def update_course_in_cache(course_key, incremental=False):
     """
     A higher order function implemented on top of the
     block_structure.updated_collected function that updates the block
     structure in the cache for the given course_key.
+
+    If incremental is True, only the data of blocks that changed since
+    the cached block structure was collected is recollected.
     """
-    return get_block_structure_manager(course_key).update_collected()
+    return get_block_structure_manager(course_key).update_collected(incremental=incremental)
 
 
 def clear_course_from_cache(course_key):
@@ -48,7 +52,15 @@ def get_block_structure_manager(course_key):
     """
     store = modulestore()
     course_usage_key = store.make_course_usage_key(course_key)
-    return BlockStructureManager(course_usage_key, store, get_cache())
+    return BlockStructureManager(
+        course_usage_key,
+        store,
+        get_cache(),
+        chunked_cache=settings.BLOCK_STRUCTURES_SETTINGS.get('BLOCK_STRUCTURES_CHUNKED_CACHE', False),
+        compact_transforms=settings.BLOCK_STRUCTURES_SETTINGS.get('BLOCK_STRUCTURES_COMPACT_TRANSFORMS', False),
+        cache_compressor=settings.BLOCK_STRUCTURES_SETTINGS.get('BLOCK_STRUCTURES_CACHE_COMPRESSOR'),
+        schema_encoded_cache=settings.BLOCK_STRUCTURES_SETTINGS.get('BLOCK_STRUCTURES_SCHEMA_ENCODED_CACHE', False),
+    )
 
 
 def get_cache():
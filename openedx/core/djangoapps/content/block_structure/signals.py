@@ -15,13 +15,19 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
     """
     Catches the signal that a course has been published in the module
     store and creates/updates the corresponding cache entry.
+
+    When updating incrementally, the cache entry is kept until the
+    update task replaces it, so there is no cold cache window.
     """
-    clear_course_from_cache(course_key)
+    incremental = settings.BLOCK_STRUCTURES_SETTINGS.get('BLOCK_STRUCTURES_INCREMENTAL_UPDATE', False)
+    if not incremental:
+        clear_course_from_cache(course_key)
 
     # The countdown=0 kwarg ensures the call occurs after the signal emitter
     # has finished all operations.
     update_course_in_cache.apply_async(
         [unicode(course_key)],
+        {'incremental': incremental},
         countdown=settings.BLOCK_STRUCTURES_SETTINGS['BLOCK_STRUCTURES_COURSE_PUBLISH_TASK_DELAY'],
     )
 
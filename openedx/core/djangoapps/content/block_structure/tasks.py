@@ -15,17 +15,17 @@ log = logging.getLogger('edx.celery.task')
     default_retry_delay=settings.BLOCK_STRUCTURES_SETTINGS['BLOCK_STRUCTURES_TASK_DEFAULT_RETRY_DELAY'],
     max_retries=settings.BLOCK_STRUCTURES_SETTINGS['BLOCK_STRUCTURES_TASK_MAX_RETRIES'],
 )
-def update_course_in_cache(course_id):
+def update_course_in_cache(course_id, incremental=False):
     """
     Updates the course blocks (in the database) for the specified course.
     """
     try:
         course_key = CourseKey.from_string(course_id)
-        api.update_course_in_cache(course_key)
+        api.update_course_in_cache(course_key, incremental=incremental)
     except Exception as exc:   # pylint: disable=broad-except
         # TODO: TNL-5799, check splunk logs to narrow down the broad except above
         log.info("update_course_in_cache. Retry #{} for this task, exception: {}".format(
             update_course_in_cache.request.retries,
             repr(exc)
         ))
-        raise update_course_in_cache.retry(args=[course_id], exc=exc)
+        raise update_course_in_cache.retry(args=[course_id], kwargs={'incremental': incremental}, exc=exc)
@@ -5,6 +5,8 @@ import json
 import logging
 from urlparse import urlparse, urlunparse
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models.fields import BooleanField, DateTimeField, DecimalField, TextField, FloatField, IntegerField
 from django.db.utils import IntegrityError
@@ -29,6 +31,11 @@ from openedx.core.djangoapps.xmodule_django.models import CourseKeyField, UsageK
 
 log = logging.getLogger(__name__)
 
+# How long, in seconds, CourseOverviews stay in the cache.  Entries are
+# invalidated when their CourseOverview changes, so this only limits how
+# long the rare entry written concurrently with a change stays stale.
+COURSE_OVERVIEW_CACHE_TIMEOUT = 60 * 60
+
 
 class CourseOverview(TimeStampedModel):
     """
@@ -277,6 +284,115 @@ class CourseOverview(TimeStampedModel):
 
         return course_overview or cls.load_from_module_store(course_id)
 
+    @classmethod
+    def get_from_ids(cls, course_ids):
+        """
+        Load the CourseOverview objects for the given course IDs.
+
+        CourseOverviews are read from the cache, then from the database in a
+        single query.  Those that are missing or outdated are then created
+        from the modulestore, as get_from_id does.  When the
+        ASYNC_COURSE_OVERVIEW_REGENERATION feature is enabled, outdated
+        CourseOverviews are returned as they are instead, and recreated
+        asynchronously.
+
+        Arguments:
+            course_ids (iterable[CourseKey]): the IDs of the course overviews
+                to be loaded.
+
+        Returns:
+            dict[CourseKey, CourseOverview]: overviews of the requested
+                courses, by course ID.  Courses that don't exist, or whose
+                overview couldn't be created, are left out.
+        """
+        course_ids = set(course_ids)
+        cache_keys = {cls._cache_key(course_id): course_id for course_id in course_ids}
+        course_overviews = {
+            cache_keys[cache_key]: course_overview
+            for cache_key, course_overview in cache.get_many(cache_keys.keys()).iteritems()
+        }
+
+        uncached_course_ids = course_ids - set(course_overviews)
+        if uncached_course_ids:
+            outdated_course_overviews = {}
+            for course_overview in cls.objects.select_related('image_set').filter(id__in=uncached_course_ids):
+                if course_overview.version < cls.VERSION:
+                    outdated_course_overviews[course_overview.id] = course_overview
+                else:
+                    course_overviews[course_overview.id] = course_overview
+
+            if outdated_course_overviews and settings.FEATURES.get('ASYNC_COURSE_OVERVIEW_REGENERATION', False):
+                from .tasks import regenerate_course_overviews
+                regenerate_course_overviews.delay([unicode(course_id) for course_id in outdated_course_overviews])
+                course_overviews.update(outdated_course_overviews)
+            else:
+                course_overviews.update(
+                    cls.regenerate(course_ids - set(course_overviews), outdated_course_overviews.keys())
+                )
+
+        for course_overview in course_overviews.itervalues():
+            # Regenerate the thumbnail images if they're missing, as get_from_id does.
+            if not hasattr(course_overview, 'image_set'):
+                CourseOverviewImageSet.create_for_course(course_overview)
+
+        cache.set_many(
+            {
+                cls._cache_key(course_id): course_overview
+                for course_id, course_overview in course_overviews.iteritems()
+                if course_id in uncached_course_ids and course_overview.version >= cls.VERSION
+            },
+            COURSE_OVERVIEW_CACHE_TIMEOUT,
+        )
+        return course_overviews
+
+    @classmethod
+    def regenerate(cls, course_ids, outdated_course_ids=()):
+        """
+        Creates the CourseOverview objects of the given courses from the
+        modulestore, after deleting their outdated ones at once.
+
+        Arguments:
+            course_ids (iterable[CourseKey]): the IDs of the courses.
+            outdated_course_ids (iterable[CourseKey]): the IDs of those
+                courses whose CourseOverview is outdated.
+
+        Returns:
+            dict[CourseKey, CourseOverview]: the created overviews, by
+                course ID.  Courses that don't exist, or whose overview
+                couldn't be created, are left out.
+        """
+        if outdated_course_ids:
+            # Throw away old versions of CourseOverview, as they might contain stale data.
+            cls.objects.filter(id__in=outdated_course_ids, version__lt=cls.VERSION).delete()
+
+        course_overviews = {}
+        for course_id in course_ids:
+            try:
+                course_overviews[course_id] = cls.load_from_module_store(course_id)
+            except cls.DoesNotExist:
+                pass
+            except Exception as ex:  # pylint: disable=broad-except
+                log.exception(
+                    'An error occurred while generating course overview for %s: %s',
+                    unicode(course_id),
+                    ex.message,
+                )
+        return course_overviews
+
+    @classmethod
+    def _cache_key(cls, course_id):
+        """
+        Returns the key of the given course's CourseOverview in the cache.
+        """
+        return u'course_overviews.{}.{}'.format(cls.VERSION, course_id)
+
+    @classmethod
+    def invalidate_cache(cls, course_id):
+        """
+        Removes the given course's CourseOverview from the cache.
+        """
+        cache.delete(cls._cache_key(course_id))
+
     def clean_id(self, padding_char='='):
         """
         Returns a unique deterministic base32-encoded ID for the course.
@@ -456,24 +572,14 @@ class CourseOverview(TimeStampedModel):
         """
         Returns CourseOverview objects for the given course_keys.
         """
-        course_overviews = []
-
         log.info('Generating course overview for %d courses.', len(course_keys))
         log.debug('Generating course overview(s) for the following courses: %s', course_keys)
 
-        for course_key in course_keys:
-            try:
-                course_overviews.append(CourseOverview.get_from_id(course_key))
-            except Exception as ex:  # pylint: disable=broad-except
-                log.exception(
-                    'An error occurred while generating course overview for %s: %s',
-                    unicode(course_key),
-                    ex.message,
-                )
+        course_overviews = CourseOverview.get_from_ids(course_keys)
 
         log.info('Finished generating course overviews.')
 
-        return course_overviews
+        return [course_overviews[course_key] for course_key in course_keys if course_key in course_overviews]
 
     @classmethod
     def get_all_courses(cls, org=None, filter_=None):
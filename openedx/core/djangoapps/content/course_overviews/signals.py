@@ -1,9 +1,10 @@
 """
 Signal handler for invalidating cached course overviews
 """
+from django.db.models.signals import post_delete, post_save
 from django.dispatch.dispatcher import receiver
 
-from .models import CourseOverview
+from .models import CourseOverview, CourseOverviewImageSet
 from xmodule.modulestore.django import SignalHandler
 
 
@@ -28,3 +29,22 @@ def _listen_for_course_delete(sender, course_key, **kwargs):  # pylint: disable=
     from cms.djangoapps.contentstore.courseware_index import CourseAboutSearchIndexer
     # Delete course entry from Course About Search_index
     CourseAboutSearchIndexer.remove_deleted_items(course_key)
+
+
+@receiver(post_save, sender=CourseOverview)
+@receiver(post_delete, sender=CourseOverview)
+def _invalidate_cached_course_overview(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes a CourseOverview from the cache when it's saved or deleted.
+    """
+    CourseOverview.invalidate_cache(instance.id)
+
+
+@receiver(post_save, sender=CourseOverviewImageSet)
+@receiver(post_delete, sender=CourseOverviewImageSet)
+def _invalidate_cached_course_overview_image_set(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Removes the CourseOverview of a CourseOverviewImageSet from the cache
+    when the image set is saved or deleted.
+    """
+    CourseOverview.invalidate_cache(instance.course_overview_id)
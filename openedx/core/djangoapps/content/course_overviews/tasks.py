@@ -0,0 +1,24 @@
+"""
+Asynchronous tasks related to the course_overviews app.
+"""
+from celery.task import task
+from opaque_keys.edx.keys import CourseKey
+
+from .models import CourseOverview
+
+
+@task()
+def regenerate_course_overviews(course_ids):
+    """
+    Recreates the outdated CourseOverviews of the given courses from the
+    modulestore.
+    """
+    # Skip the CourseOverviews that were recreated since the task was scheduled.
+    outdated_course_keys = [
+        CourseKey.from_string(course_id)
+        for course_id in CourseOverview.objects.filter(
+            id__in=[CourseKey.from_string(course_id) for course_id in course_ids],
+            version__lt=CourseOverview.VERSION,
+        ).values_list('id', flat=True)
+    ]
+    CourseOverview.regenerate(outdated_course_keys, outdated_course_keys)
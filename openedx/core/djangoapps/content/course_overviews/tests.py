@@ -16,6 +16,7 @@ from django.utils import timezone
 from PIL import Image
 
 from lms.djangoapps.certificates.api import get_active_web_certificate
+from opaque_keys.edx.locator import CourseLocator
 from openedx.core.djangoapps.models.course_details import CourseDetails
 from openedx.core.lib.courses import course_image_url
 from static_replace.models import AssetBaseUrlConfig
@@ -459,6 +460,42 @@ class CourseOverviewTestCase(ModuleStoreTestCase):
             set(select_course_ids),
         )
 
+    def test_get_from_ids(self):
+        course_ids = [CourseFactory.create().id for __ in range(3)]
+        missing_course_id = CourseLocator('org', 'missing', 'run')
+        course_overviews = CourseOverview.get_from_ids(course_ids + [missing_course_id])
+        self.assertEqual(set(course_overviews), set(course_ids))
+        self.assertEqual(
+            {course_overview.display_name for course_overview in course_overviews.itervalues()},
+            {course.display_name for course in (self.store.get_course(course_id) for course_id in course_ids)},
+        )
+
+        # The course overviews are now served from the cache, until they change.
+        CourseOverview.objects.filter(id__in=course_ids).update(display_name='Changed')
+        self.assertNotIn(
+            'Changed',
+            {course_overview.display_name for course_overview in CourseOverview.get_from_ids(course_ids).itervalues()},
+        )
+        course_overviews[course_ids[0]].display_name = 'Saved'
+        course_overviews[course_ids[0]].save()
+        self.assertEqual(CourseOverview.get_from_ids(course_ids)[course_ids[0]].display_name, 'Saved')
+
+    @ddt.data(False, True)
+    def test_get_from_ids_outdated(self, async_regeneration):
+        course_id = CourseFactory.create().id
+        CourseOverview.get_from_ids([course_id])
+        CourseOverview.objects.filter(id=course_id).update(version=CourseOverview.VERSION - 1)
+        CourseOverview.invalidate_cache(course_id)
+
+        with mock.patch.dict(settings.FEATURES, {'ASYNC_COURSE_OVERVIEW_REGENERATION': async_regeneration}):
+            course_overview = CourseOverview.get_from_ids([course_id])[course_id]
+        # Outdated overviews are served while they're regenerated asynchronously.
+        self.assertEqual(
+            course_overview.version,
+            CourseOverview.VERSION - 1 if async_regeneration else CourseOverview.VERSION,
+        )
+        self.assertEqual(CourseOverview.objects.get(id=course_id).version, CourseOverview.VERSION)
+
     def test_get_all_courses(self):
         course_ids = [CourseFactory.create(emit_signals=True).id for __ in range(3)]
         self.assertEqual(
@@ -4,14 +4,16 @@ Middleware to serve assets.
 
 import logging
 import datetime
+from uuid import uuid4
+
 import newrelic.agent
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect)
+    HttpResponseBadRequest, HttpResponseNotFound, HttpResponsePermanentRedirect, StreamingHttpResponse)
 from student.models import CourseEnrollment
 
 from xmodule.assetstore.assetmgr import AssetManager
-from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
+from xmodule.contentstore.content import StaticContent, StaticContentStream, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
@@ -28,6 +30,9 @@ from .models import CourseAssetCacheTtlConfig, CdnUserAgentsConfig
 log = logging.getLogger(__name__)
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Content smaller than this is loaded into memory and cached, larger content is streamed.
+MAX_CACHED_CONTENT_LENGTH = 1048576
+
 
 class StaticContentServer(object):
     """
@@ -110,18 +115,17 @@ class StaticContentServer(object):
                 if if_modified_since == last_modified_at_str:
                     return HttpResponseNotModified()
 
-            # *** File streaming within a byte range ***
+            # *** File streaming within byte ranges ***
             # If a Range is provided, parse Range attribute of the request
             # Add Content-Range in the response if Range is structurally correct
-            # Request -> Range attribute structure: "Range: bytes=first-[last]"
+            # Request -> Range attribute structure: "Range: bytes=first-[last][, first-[last]...]"
             # Response -> Content-Range attribute structure: "Content-Range: bytes first-last/totalLength"
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
+            #
+            # Both in memory (cached) content and streamed content can serve byte ranges, so
+            # the content is never loaded again from the contentstore to do so.
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if isinstance(content, StaticContent):
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -134,35 +138,34 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
-                        log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                        )
                     else:
-                        first, last = ranges[0]
+                        # Unsatisfiable ranges are ignored, unless none of them are satisfiable.
+                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35.1
+                        ranges = [(first, last) for first, last in ranges if 0 <= first <= last < content.length]
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        if len(ranges) == 1:
+                            first, last = ranges[0]
+                            response = self.get_content_response(content, content.stream_data_in_range(first, last))
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
-
-                            newrelic.agent.add_custom_parameter('contentserver.ranged', True)
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            # Content for multiple ranges is sent as a multipart message.
+                            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                            response = self.get_multipart_byteranges_response(content, ranges)
+                        response.status_code = 206  # Partial Content
+
+                        newrelic.agent.add_custom_parameter('contentserver.ranged', True)
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = self.get_content_response(content, content.stream_data())
                 response['Content-Length'] = content.length
 
             newrelic.agent.add_custom_parameter('contentserver.content_len', content.length)
@@ -170,7 +173,6 @@ class StaticContentServer(object):
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -180,6 +182,58 @@ class StaticContentServer(object):
 
             return response
 
+    @staticmethod
+    def get_content_response(content, data, content_type=None):
+        """
+        Returns a response with the given data of the content, and the content's type
+        unless another content_type is given.
+
+        Streamed content is sent in chunks as it is read from the contentstore, rather
+        than being read into memory first.
+        """
+        content_type = content_type or content.content_type
+        if isinstance(content, StaticContentStream):
+            return StreamingHttpResponse(close_after_streaming(content, data), content_type=content_type)
+        return HttpResponse(data, content_type=content_type)
+
+    def get_multipart_byteranges_response(self, content, ranges):
+        """
+        Returns a "multipart/byteranges" response with a part for each of the
+        given (first, last) byte ranges of the content.
+        """
+        boundary = uuid4().hex
+        part_headers = [
+            (
+                u'--{boundary}\r\n'
+                u'Content-Type: {content_type}\r\n'
+                u'Content-Range: bytes {first}-{last}/{length}\r\n\r\n'
+            ).format(
+                boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length,
+            ).encode('utf-8')
+            for first, last in ranges
+        ]
+        closing_boundary = '--{boundary}--\r\n'.format(boundary=boundary)
+
+        def stream_parts():
+            """
+            Yields the body of the multipart message.
+            """
+            for part_header, (first, last) in zip(part_headers, ranges):
+                yield part_header
+                for chunk in content.stream_data_in_range(first, last):
+                    yield chunk
+                yield '\r\n'
+            yield closing_boundary
+
+        response = self.get_content_response(
+            content, stream_parts(), content_type='multipart/byteranges; boundary={}'.format(boundary)
+        )
+        response['Content-Length'] = str(
+            sum(len(part_header) + (last - first + 1) + 2 for part_header, (first, last) in zip(part_headers, ranges)) +
+            len(closing_boundary)
+        )
+        return response
+
     def set_caching_headers(self, content, response):
         """
         Sets caching headers based on whether or not the asset is locked.
@@ -261,6 +315,10 @@ class StaticContentServer(object):
         """
         Loads an asset based on its location, either retrieving it from a cache
         or loading it directly from the contentstore.
+
+        Assets that aren't cached are loaded as a `StaticContentStream`, for which only
+        the asset's metadata is fetched: its data is only read from GridFS as it is sent,
+        so existence, lock and digest checks don't read the data of large assets.
         """
 
         # See if we can load this item from cache.
@@ -275,7 +333,7 @@ class StaticContentServer(object):
             # Now that we fetched it, let's go ahead and try to cache it. We cap this at 1MB
             # because it's the default for memcached and also we don't want to do too much
             # buffering in memory when we're serving an actual request.
-            if content.length is not None and content.length < 1048576:
+            if content.length is not None and content.length < MAX_CACHED_CONTENT_LENGTH:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
 
@@ -323,3 +381,14 @@ def parse_range_header(header_value, content_length):
         raise ValueError('Invalid syntax')
 
     return unit, ranges
+
+
+def close_after_streaming(content, data):
+    """
+    Yields the given data of streamed content, closing the content's stream once done.
+    """
+    try:
+        for chunk in data:
+            yield chunk
+    finally:
+        content.close()
@@ -242,16 +242,59 @@ class ContentStoreToyCourseTest(SharedModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart message with a part for each range.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
         self.assertNotIn('Content-Range', resp)
-        self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], str(len(resp.content)))
+
+        content_type, boundary = resp['Content-Type'].split('; boundary=')
+        self.assertEqual(content_type, 'multipart/byteranges')
+        data = self.contentstore.find(self.unlocked_asset).data
+        parts = resp.content.split('--{}'.format(boundary))
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        self.assertEqual(len(parts[1:-1]), len(expected_ranges))
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, body = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+                first=first, last=last, length=self.length_unlocked), headers)
+            self.assertEqual(body, data[first:last + 1] + '\r\n')
+
+    def test_range_request_multiple_ranges_one_satisfiable(self):
+        """
+        Test that unsatisfiable ranges are ignored when other ranges in the request are satisfiable.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-, 0-9'.format(
+            first=self.length_unlocked))
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(resp['Content-Length'], '10')
+
+    @patch('openedx.core.djangoapps.contentserver.middleware.MAX_CACHED_CONTENT_LENGTH', 0)
+    @patch('openedx.core.djangoapps.contentserver.middleware.get_cached_content', return_value=None)
+    @patch('openedx.core.djangoapps.contentserver.middleware.set_cached_content')
+    def test_large_content_is_streamed(self, mock_set_cached_content, __):
+        """
+        Test that content too large to be cached is streamed, both whole and in ranges.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertTrue(resp.streaming)
+        self.assertEqual(len(''.join(resp.streaming_content)), self.length_unlocked)
+
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, 20-29')
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp['Content-Length'], str(len(''.join(resp.streaming_content))))
+
+        self.assertFalse(mock_set_cached_content.called)
 
     @ddt.data(
         'bytes 0-',
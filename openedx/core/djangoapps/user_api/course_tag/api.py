@@ -39,6 +39,29 @@ def get_course_tag(user, course_id, key):
         return None
 
 
+def get_course_tags_for_users(user_ids, course_id, keys):
+    """
+    Gets the values of the course tags of many users for the specified keys
+    in the specified course_id, all at once.
+
+    Args:
+        user_ids: the ids of the users
+        course_id: course identifier (string)
+        keys: list of arbitrary (<=255 char string) keys
+
+    Returns:
+        dict of (user id, key) to string value, for the tags with a value saved
+    """
+    return {
+        (user_id, key): value
+        for user_id, key, value in UserCourseTag.objects.filter(
+            user_id__in=user_ids,
+            course_id=course_id,
+            key__in=keys,
+        ).values_list('user_id', 'key', 'value')
+    }
+
+
 def set_course_tag(user, course_id, key, value):
     """
     Sets the value of the user's course tag for the specified key in the specified
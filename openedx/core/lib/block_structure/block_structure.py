@@ -14,6 +14,7 @@ from logging import getLogger
 
 from openedx.core.lib.graph_traversals import traverse_topologically, traverse_post_order
 
+from .compact_graph import CompactBlockGraph
 from .exceptions import TransformerException
 
 
@@ -23,6 +24,12 @@ logger = getLogger(__name__)  # pylint: disable=invalid-name
 # A dictionary key value for storing a transformer's version number.
 TRANSFORMER_VERSION_KEY = '_version'
 
+# The name of the xBlock field that is collected for every block to
+# identify the version of its content.  A block whose value for this
+# field changed since the last collection is considered to be changed
+# when the collected data is updated incrementally.
+EDIT_VERSION_XBLOCK_FIELD = 'edited_on'
+
 
 class _BlockRelations(object):
     """
@@ -62,6 +69,19 @@ class BlockStructure(object):
         # dict {UsageKey: _BlockRelations}
         self._block_relations = {}
 
+        # Set of usage keys of the blocks whose relations are owned by
+        # this block structure, when its relations are shared with
+        # another block structure until they're modified.  None if
+        # all of the relations are owned by this block structure.
+        # set {UsageKey} or None
+        self._owned_block_relations = None
+
+        # Compact representation of the block relations, used instead
+        # of _block_relations once this block structure is compacted.
+        # See the compact method.
+        # CompactBlockGraph or None
+        self._compact_graph = None
+
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
@@ -74,6 +94,8 @@ class BlockStructure(object):
         return self.get_block_keys()
 
     def __len__(self):
+        if self._compact_graph is not None:
+            return len(self._compact_graph)
         return len(self._block_relations)
 
     #--- Block structure relation methods ---#
@@ -91,6 +113,8 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's parents.
         """
+        if self._compact_graph is not None:
+            return self._compact_graph.get_parents(usage_key)
         return self._block_relations[usage_key].parents if usage_key in self else []
 
     def get_children(self, usage_key):
@@ -105,6 +129,8 @@ class BlockStructure(object):
         Returns:
             [UsageKey] - A list of usage keys of the block's children.
         """
+        if self._compact_graph is not None:
+            return self._compact_graph.get_children(usage_key)
         return self._block_relations[usage_key].children if usage_key in self else []
 
     def set_root_block(self, usage_key):
@@ -120,7 +146,10 @@ class BlockStructure(object):
                 new root of the block structure.
         """
         self.root_block_usage_key = usage_key
-        self._block_relations[usage_key].parents = []
+        if self._compact_graph is not None:
+            self._compact_graph.set_root(self._compact_graph.block_ids[usage_key])
+        else:
+            self._get_writable_relations(usage_key).parents = []
 
     def __contains__(self, usage_key):
         """
@@ -135,6 +164,8 @@ class BlockStructure(object):
             bool - Whether or not a block with the given usage_key
                 is present in this block structure.
         """
+        if self._compact_graph is not None:
+            return usage_key in self._compact_graph
         return usage_key in self._block_relations
 
     def get_block_keys(self):
@@ -145,8 +176,31 @@ class BlockStructure(object):
             iterator(UsageKey) - An iterator of the usage
             keys of all the blocks in the block structure.
         """
+        if self._compact_graph is not None:
+            return self._compact_graph.iter_block_keys()
         return self._block_relations.iterkeys()
 
+    def compact(self):
+        """
+        Switches this block structure to a compact representation of
+        its relations, which maps the blocks to integer ids and stores
+        their relations in flat arrays (see compact_graph).  Traversals
+        and pruning of a compacted block structure operate on the ids,
+        which is faster and uses less memory for large structures, and
+        the arrays are shared with copy_on_write copies.
+
+        The behavior of the block structure is otherwise unchanged.
+        Adding a new block to a compacted block structure switches it
+        back to the regular representation.
+        """
+        if self._compact_graph is None:
+            self._compact_graph = CompactBlockGraph.from_block_relations(
+                self.root_block_usage_key,
+                self._block_relations,
+            )
+            self._block_relations = None
+            self._owned_block_relations = None
+
     #--- Block structure traversal methods ---#
 
     def topological_traversal(
@@ -167,8 +221,16 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_topologically method.
         """
+        start_node = start_node or self.root_block_usage_key
+        start_id = self._compact_graph.get_block_id(start_node) if self._compact_graph is not None else None
+        if start_id is not None:
+            return self._compact_graph.traverse_topologically(
+                start_id,
+                filter_func=filter_func,
+                yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+            )
         return traverse_topologically(
-            start_node=start_node or self.root_block_usage_key,
+            start_node=start_node,
             get_parents=self.get_parents,
             get_children=self.get_children,
             filter_func=filter_func,
@@ -192,8 +254,12 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_post_order method.
         """
+        start_node = start_node or self.root_block_usage_key
+        start_id = self._compact_graph.get_block_id(start_node) if self._compact_graph is not None else None
+        if start_id is not None:
+            return self._compact_graph.traverse_post_order(start_id, filter_func=filter_func)
         return traverse_post_order(
-            start_node=start_node or self.root_block_usage_key,
+            start_node=start_node,
             get_children=self.get_children,
             filter_func=filter_func,
         )
@@ -205,6 +271,11 @@ class BlockStructure(object):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
+        if self._compact_graph is not None:
+            self._compact_graph = self._compact_graph.pruned(
+                self._compact_graph.block_ids[self.root_block_usage_key]
+            )
+            return
 
         # Create a new block relations map to store only those blocks
         # that are still linked
@@ -228,6 +299,7 @@ class BlockStructure(object):
 
         # Replace this structure's relations with the newly pruned one.
         self._block_relations = pruned_block_relations
+        self._owned_block_relations = None
 
     def _add_relation(self, parent_key, child_key):
         """
@@ -237,8 +309,61 @@ class BlockStructure(object):
             parent_key (UsageKey) - Usage key of the parent block.
             child_key (UsageKey) - Usage key of the child block.
         """
+        if self._compact_graph is not None:
+            parent_id = self._compact_graph.get_block_id(parent_key)
+            child_id = self._compact_graph.get_block_id(child_key)
+            if parent_id is not None and child_id is not None:
+                self._compact_graph.add_relation(parent_id, child_id)
+                return
+            self._decompact()
+
+        if self._owned_block_relations is not None:
+            for usage_key in (parent_key, child_key):
+                if usage_key in self._block_relations:
+                    self._get_writable_relations(usage_key)
+                else:
+                    self._owned_block_relations.add(usage_key)
         self._add_to_relations(self._block_relations, parent_key, child_key)
 
+    def _get_block_relations(self):
+        """
+        Returns the map of usage keys to block relations of this block
+        structure, building it if this block structure is compacted.
+        """
+        if self._compact_graph is None:
+            return self._block_relations
+
+        block_relations = {}
+        for usage_key, parents, children in self._compact_graph.iter_relations():
+            relations = _BlockRelations()
+            relations.parents = parents
+            relations.children = children
+            block_relations[usage_key] = relations
+        return block_relations
+
+    def _decompact(self):
+        """
+        Switches this block structure back from its compact
+        representation to the regular one.
+        """
+        self._block_relations = self._get_block_relations()
+        self._compact_graph = None
+
+    def _get_writable_relations(self, usage_key):
+        """
+        Returns the relations of the given block, after copying them
+        if they're shared with another block structure.
+        """
+        block_relations = self._block_relations[usage_key]
+        if self._owned_block_relations is not None and usage_key not in self._owned_block_relations:
+            shared_block_relations = block_relations
+            block_relations = _BlockRelations()
+            block_relations.parents = list(shared_block_relations.parents)
+            block_relations.children = list(shared_block_relations.children)
+            self._block_relations[usage_key] = block_relations
+            self._owned_block_relations.add(usage_key)
+        return block_relations
+
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
         """
@@ -374,6 +499,18 @@ class TransformerDataMap(dict):
         except AttributeError:
             return key
 
+    def copy(self):
+        """
+        Returns a copy of this map, with copies of its TransformerData
+        objects that share their field values with the originals.
+        """
+        copied_map = TransformerDataMap()
+        for key, transformer_data in self.iteritems():
+            copied_transformer_data = TransformerData()
+            copied_transformer_data.fields = dict(transformer_data.fields)
+            dict.__setitem__(copied_map, key, copied_transformer_data)
+        return copied_map
+
 
 class BlockData(FieldData):
     """
@@ -391,6 +528,16 @@ class BlockData(FieldData):
         # Map of transformer name to its block-specific data.
         self.transformer_data = TransformerDataMap()
 
+    def copy(self):
+        """
+        Returns a copy of this BlockData that can be modified without
+        affecting this one, while sharing its field values.
+        """
+        copied_block_data = BlockData(self.location)
+        copied_block_data.fields = dict(self.fields)
+        copied_block_data.transformer_data = self.transformer_data.copy()
+        return copied_block_data
+
 
 class BlockStructureBlockData(BlockStructure):
     """
@@ -414,6 +561,13 @@ class BlockStructureBlockData(BlockStructure):
         # Map of a transformer's name to its non-block-specific data.
         self.transformer_data = TransformerDataMap()
 
+        # Set of usage keys of the blocks whose data is owned by this
+        # block structure, when its block data is shared with another
+        # block structure until it's modified.  None if all of the
+        # block data is owned by this block structure.
+        # set {UsageKey} or None
+        self._owned_block_data = None
+
     def copy(self):
         """
         Returns a new instance of BlockStructureBlockData with a
@@ -422,11 +576,45 @@ class BlockStructureBlockData(BlockStructure):
         from .factory import BlockStructureFactory
         return BlockStructureFactory.create_new(
             self.root_block_usage_key,
-            deepcopy(self._block_relations),
+            deepcopy(self._get_block_relations()),
             deepcopy(self.transformer_data),
             deepcopy(self._block_data_map),
         )
 
+    def copy_on_write(self):
+        """
+        Returns a new instance of BlockStructureBlockData that shares
+        this instance's block relations and block data, copying each
+        block's relations and data only when the new instance first
+        modifies them.
+
+        This makes it cheap to transform a copy of a collected block
+        structure, since transformers only modify a fraction of the
+        blocks.  Collected values themselves are shared, so neither
+        instance may mutate them in place; any changes must go through
+        this class's methods.  This instance must not be modified
+        while the copy is in use.
+        """
+        from .factory import BlockStructureFactory
+        if self._compact_graph is not None:
+            block_structure = BlockStructureFactory.create_new(
+                self.root_block_usage_key,
+                None,
+                self.transformer_data.copy(),
+                dict(self._block_data_map),
+            )
+            block_structure._compact_graph = self._compact_graph.copy()  # pylint: disable=protected-access
+        else:
+            block_structure = BlockStructureFactory.create_new(
+                self.root_block_usage_key,
+                dict(self._block_relations),
+                self.transformer_data.copy(),
+                dict(self._block_data_map),
+            )
+            block_structure._owned_block_relations = set()  # pylint: disable=protected-access
+        block_structure._owned_block_data = set()  # pylint: disable=protected-access
+        return block_structure
+
     def iteritems(self):
         """
         Returns iterator of (UsageKey, BlockData) pairs for all
@@ -503,6 +691,7 @@ class BlockStructureBlockData(BlockStructure):
         """
         Returns the TransformerData for the given
         transformer for the block identified by the given usage_key.
+        The returned TransformerData must not be modified in place.
 
         Raises KeyError if not found.
 
@@ -576,8 +765,10 @@ class BlockStructureBlockData(BlockStructure):
             transformer (BlockStructureTransformer) - The transformer
                 whose data entry is to be deleted.
         """
+        if usage_key not in self._block_data_map:
+            return
         try:
-            transformer_block_data = self.get_transformer_block_data(usage_key, transformer)
+            transformer_block_data = self._get_or_create_block(usage_key).transformer_data[transformer]
             delattr(transformer_block_data, key)
         except (AttributeError, KeyError):
             pass
@@ -602,16 +793,24 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
+        if self._compact_graph is not None:
+            block_id = self._compact_graph.get_block_id(usage_key)
+            if block_id is None:
+                raise KeyError(usage_key)
+            self._compact_graph.remove(block_id, keep_descendants)
+            self._block_data_map.pop(usage_key, None)
+            return
+
         children = self._block_relations[usage_key].children
         parents = self._block_relations[usage_key].parents
 
         # Remove block from its children.
         for child in children:
-            self._block_relations[child].parents.remove(usage_key)
+            self._get_writable_relations(child).parents.remove(usage_key)
 
         # Remove block from its parents.
         for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
+            self._get_writable_relations(parent).children.remove(usage_key)
 
         # Remove block.
         self._block_relations.pop(usage_key, None)
@@ -736,16 +935,25 @@ class BlockStructureBlockData(BlockStructure):
 
     def _get_or_create_block(self, usage_key):
         """
-        Returns the BlockData associated with the given usage_key.
+        Returns the BlockData associated with the given usage_key,
+        after copying it if it's shared with another block structure.
         If not found, creates and returns a new BlockData and
         maps it to the given key.
         """
         try:
-            return self._block_data_map[usage_key]
+            block_data = self._block_data_map[usage_key]
         except KeyError:
             block_data = BlockData(usage_key)
             self._block_data_map[usage_key] = block_data
-            return block_data
+        else:
+            if self._owned_block_data is None or usage_key in self._owned_block_data:
+                return block_data
+            block_data = block_data.copy()
+            self._block_data_map[usage_key] = block_data
+
+        if self._owned_block_data is not None:
+            self._owned_block_data.add(usage_key)
+        return block_data
 
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
@@ -770,6 +978,31 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         # set(string)
         self._requested_xblock_fields = set()
 
+        # Set of usage keys of the blocks whose data is to be collected,
+        # when only part of the structure is being recollected.  While
+        # set, traversals only yield blocks in this set.  None means
+        # that data is collected for all blocks.
+        # set(UsageKey) or NoneType
+        self._collect_scope = None
+
+    def topological_traversal(self, *args, **kwargs):
+        """
+        See BlockStructure.topological_traversal.  Only yields blocks
+        within the collect scope, if one is set.
+        """
+        return self._filter_by_collect_scope(
+            super(BlockStructureModulestoreData, self).topological_traversal(*args, **kwargs)
+        )
+
+    def post_order_traversal(self, *args, **kwargs):
+        """
+        See BlockStructure.post_order_traversal.  Only yields blocks
+        within the collect scope, if one is set.
+        """
+        return self._filter_by_collect_scope(
+            super(BlockStructureModulestoreData, self).post_order_traversal(*args, **kwargs)
+        )
+
     def request_xblock_fields(self, *field_names):
         """
         Records request for collecting data for the given xBlock fields.
@@ -814,12 +1047,96 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         self._xblock_map[usage_key] = xblock
 
+    def _filter_by_collect_scope(self, usage_keys):
+        """
+        Returns an iterator over the given usage keys that are within
+        the collect scope, if one is set.
+        """
+        if self._collect_scope is None:
+            return usage_keys
+        return (usage_key for usage_key in usage_keys if usage_key in self._collect_scope)
+
+    def _get_changed_block_keys(self, collected_block_structure):
+        """
+        Returns the set of usage keys of the blocks in this structure
+        whose content may have changed since the given block structure
+        was collected: blocks that are new, whose children changed, or
+        whose edit version changed or is unknown.
+
+        Arguments:
+            collected_block_structure (BlockStructureBlockData) - A
+                block structure previously collected for the same root.
+        """
+        changed_block_keys = set()
+        for usage_key, xblock in self._xblock_map.iteritems():
+            edit_version = getattr(xblock, EDIT_VERSION_XBLOCK_FIELD, None)
+            if (
+                    usage_key not in collected_block_structure or
+                    edit_version is None or
+                    edit_version != collected_block_structure.get_xblock_field(usage_key, EDIT_VERSION_XBLOCK_FIELD) or
+                    self.get_children(usage_key) != collected_block_structure.get_children(usage_key)
+            ):
+                changed_block_keys.add(usage_key)
+        return changed_block_keys
+
+    def _get_affected_block_keys(self, changed_block_keys):
+        """
+        Returns the set of usage keys of the given changed blocks along
+        with all of their ancestors and descendants, since collected
+        data is percolated both down (e.g., merged start dates) and up
+        (e.g., aggregated counts) the structure.
+        """
+        affected_block_keys = set()
+        for get_relatives in (self.get_parents, self.get_children):
+            visited = set()
+            stack = [usage_key for usage_key in changed_block_keys if usage_key in self]
+            while stack:
+                usage_key = stack.pop()
+                if usage_key not in visited:
+                    visited.add(usage_key)
+                    stack.extend(get_relatives(usage_key))
+            affected_block_keys |= visited
+        return affected_block_keys
+
+    def _set_collect_scope_from(self, collected_block_structure):
+        """
+        Prepares this structure for recollecting only the blocks
+        affected by changes since the given block structure was
+        collected: the collected data of all other blocks, along with
+        the structure-wide transformer data, is carried over and the
+        collect scope is restricted to the affected blocks.
+
+        Returns the set of usage keys of the affected blocks.
+
+        Arguments:
+            collected_block_structure (BlockStructureBlockData) - A
+                block structure previously collected for the same root.
+        """
+        affected_block_keys = self._get_affected_block_keys(
+            self._get_changed_block_keys(collected_block_structure)
+        )
+        collected_block_data_map = collected_block_structure._block_data_map
+        for usage_key in self:
+            if usage_key not in affected_block_keys and usage_key in collected_block_data_map:
+                self._block_data_map[usage_key] = collected_block_data_map[usage_key]
+        self.transformer_data = collected_block_structure.transformer_data
+        self._collect_scope = affected_block_keys
+        return affected_block_keys
+
+    def _clear_collect_scope(self):
+        """
+        Removes any collect scope, so that traversals yield all blocks.
+        """
+        self._collect_scope = None
+
     def _collect_requested_xblock_fields(self):
         """
         Iterates through all instantiated xBlocks that were added and
         collects all xBlock fields that were requested.
         """
         for xblock_usage_key, xblock in self._xblock_map.iteritems():
+            if self._collect_scope is not None and xblock_usage_key not in self._collect_scope:
+                continue
             block_data = self._get_or_create_block(xblock_usage_key)
             for field_name in self._requested_xblock_fields:
                 self._set_xblock_field(block_data, xblock, field_name)
@@ -2,10 +2,13 @@
 Module for the Cache class for BlockStructure objects.
 """
 # pylint: disable=protected-access
+from collections import defaultdict
 from logging import getLogger
+from uuid import uuid4
 
-from openedx.core.lib.cache_utils import zpickle, zunpickle
+from openedx.core.lib.cache_utils import zcompress, zdecompress, zpickle
 
+from . import encoding
 from .block_structure import BlockStructureBlockData
 from .factory import BlockStructureFactory
 
@@ -16,52 +19,95 @@ logger = getLogger(__name__)  # pylint: disable=C0103
 class BlockStructureCache(object):
     """
     Cache for BlockStructure objects.
+
+    A block structure is stored either as a single cache value, or - when
+    chunked - as a root index holding the root's own data, followed by one
+    chunk per child of the root (for a course, one per chapter), each holding
+    the data of the blocks in that child's subtree.  Chunked structures can be
+    partially loaded, when only the subtree of a given block is needed, and
+    keep each cache value well under the cache backend's item size limit.
+
+    Structures are read back regardless of the format, encoding and
+    compressor they were stored with.
     """
-    def __init__(self, cache):
+    # Set the timeout value for the cache to 1 day as a fail-safe
+    # in case the signal to invalidate the cache doesn't come through.
+    TIMEOUT_IN_SECONDS = 60 * 60 * 24
+
+    def __init__(self, cache, chunked=False, compressor=None, schema_encoding=False):
         """
         Arguments:
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache into which cacheable data of the block structure
                 is to be serialized.
+
+            chunked (bool) - Whether block structures are stored in
+                per-subtree chunks, rather than as a single value.
+
+            compressor (string) - The name of the compressor, in
+                cache_utils.COMPRESSORS, that the stored values are
+                compressed with.  If None, they are compressed with zlib,
+                as they were before compressors could be chosen.
+
+            schema_encoding (bool) - Whether block structures are stored
+                in the encoding of the encoding module, which is faster
+                to serialize and deserialize, rather than pickled.
         """
         self._cache = cache
+        self._chunked = chunked
+        self._compressor = compressor
+        self._schema_encoding = schema_encoding
 
     def add(self, block_structure):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store a compressed serialization of the given block structure
+        into the given cache.
 
         The key in the cache is 'root.key.<root_block_usage_key>'.
         The data stored in the cache includes the structure's
-        block relations, transformer data, and block data.
+        block relations, transformer data, and block data.  When
+        chunked, the value stored at that key is an index of the
+        chunks, which are stored under their own keys.
 
         Arguments:
             block_structure (BlockStructure) - The block structure
                 that is to be serialized to the given cache.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure.transformer_data,
-            block_structure._block_data_map,
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
-
-        # Set the timeout value for the cache to 1 day as a fail-safe
-        # in case the signal to invalidate the cache doesn't come through.
-        timeout_in_seconds = 60 * 60 * 24
-        self._cache.set(
-            self._encode_root_cache_key(block_structure.root_block_usage_key),
-            zp_data_to_cache,
-            timeout=timeout_in_seconds,
-        )
+        root_cache_key = self._encode_root_cache_key(block_structure.root_block_usage_key)
+        previous_chunk_keys = self._get_chunk_keys(root_cache_key)
+
+        if self._chunked:
+            data_to_cache, chunks_to_cache = self._split_into_chunks(block_structure)
+            zp_chunks_to_cache = {
+                chunk_key: self._serialize(chunk_data)
+                for chunk_key, chunk_data in chunks_to_cache.iteritems()
+            }
+            # Chunks are written before the index that refers to them, so
+            # readers never find an index with chunks that are yet to come.
+            self._cache.set_many(zp_chunks_to_cache, timeout=self.TIMEOUT_IN_SECONDS)
+        else:
+            data_to_cache = (
+                block_structure._get_block_relations(),
+                block_structure.transformer_data,
+                block_structure._block_data_map,
+            )
+            zp_chunks_to_cache = {}
+        zp_data_to_cache = self._serialize(data_to_cache)
+
+        self._cache.set(root_cache_key, zp_data_to_cache, timeout=self.TIMEOUT_IN_SECONDS)
+
+        # The chunks of the previous write are no longer referred to.
+        if previous_chunk_keys:
+            self._cache.delete_many(previous_chunk_keys)
 
         logger.info(
-            "Wrote BlockStructure %s to cache, size: %s",
+            "Wrote BlockStructure %s to cache, size: %s, chunks: %s",
             block_structure.root_block_usage_key,
-            len(zp_data_to_cache),
+            len(zp_data_to_cache) + sum(len(zp_chunk) for zp_chunk in zp_chunks_to_cache.itervalues()),
+            len(zp_chunks_to_cache),
         )
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, starting_block_usage_key=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given cache, if it's found in the cache.
@@ -74,11 +120,18 @@ class BlockStructureCache(object):
                 of the block structure that is to be deserialized from
                 the given cache.
 
+            starting_block_usage_key (UsageKey) - If given and the block
+                structure is stored in chunks, only the chunks containing
+                this block (and any other block reachable from it) are
+                loaded, so the returned block structure may not include
+                blocks that are unreachable from this block.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
-            NoneType - If the root_block_usage_key is not found in the cache.
+            NoneType - If the root_block_usage_key is not found in the cache,
+            or any of its needed chunks is no longer in the cache.
         """
 
         # Find root_block_usage_key in the cache.
@@ -97,7 +150,13 @@ class BlockStructureCache(object):
             )
 
         # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
+        data_from_cache = self._deserialize(zp_data_from_cache)
+        if isinstance(data_from_cache, dict):
+            data_from_cache = self._load_chunks(root_block_usage_key, data_from_cache, starting_block_usage_key)
+            if data_from_cache is None:
+                return None
+
+        block_relations, transformer_data, block_data_map = data_from_cache
         return BlockStructureFactory.create_new(
             root_block_usage_key,
             block_relations,
@@ -115,12 +174,152 @@ class BlockStructureCache(object):
                 of the block structure that is to be removed from
                 the cache.
         """
-        self._cache.delete(self._encode_root_cache_key(root_block_usage_key))
+        root_cache_key = self._encode_root_cache_key(root_block_usage_key)
+        chunk_keys = self._get_chunk_keys(root_cache_key)
+        self._cache.delete(root_cache_key)
+        if chunk_keys:
+            self._cache.delete_many(chunk_keys)
         logger.info(
             "Deleted BlockStructure %r from the cache.",
             root_block_usage_key,
         )
 
+    def _get_chunk_keys(self, root_cache_key):
+        """
+        Returns the cache keys of the chunks of the block structure
+        stored at the given root cache key, if it is stored in chunks.
+        """
+        zp_data_from_cache = self._cache.get(root_cache_key)
+        if zp_data_from_cache:
+            data_from_cache = self._deserialize(zp_data_from_cache)
+            if isinstance(data_from_cache, dict):
+                return data_from_cache['chunk_keys']
+        return []
+
+    def _split_into_chunks(self, block_structure):
+        """
+        Returns the data of the given block structure split into
+        an index and a dict of chunks, keyed by their cache keys.
+
+        Each child of the root gets a chunk with the relations and
+        block data of all the blocks reachable from it.  Blocks that
+        are reachable from more than one child of the root are stored
+        in each of their chunks.  The index holds the transformer data,
+        the remaining blocks (the root, usually), the keys of the chunks
+        and the chunks that each block is stored in.
+        """
+        # The chunk keys are unique to this write, so that chunks of a
+        # previous write are never combined with the index of this one.
+        chunk_key_prefix = u'{root_key}.chunk.{write_id}'.format(
+            root_key=self._encode_root_cache_key(block_structure.root_block_usage_key),
+            write_id=uuid4().hex,
+        )
+        block_relations = block_structure._get_block_relations()
+        chunks = {}
+        chunk_keys = []
+        block_chunks = defaultdict(list)
+        chunk_root_keys = block_structure.get_children(block_structure.root_block_usage_key)
+        for chunk_index, chunk_root_key in enumerate(chunk_root_keys):
+            chunk_block_keys = list(block_structure.post_order_traversal(start_node=chunk_root_key))
+            for block_key in chunk_block_keys:
+                block_chunks[block_key].append(chunk_index)
+
+            chunk_key = u'{prefix}.{index}'.format(prefix=chunk_key_prefix, index=chunk_index)
+            chunk_keys.append(chunk_key)
+            chunks[chunk_key] = self._get_blocks_data(block_structure, block_relations, chunk_block_keys)
+
+        index_block_keys = [block_key for block_key in block_structure if block_key not in block_chunks]
+        index_block_relations, index_block_data_map = self._get_blocks_data(
+            block_structure,
+            block_relations,
+            index_block_keys,
+        )
+        index = {
+            'block_relations': index_block_relations,
+            'transformer_data': block_structure.transformer_data,
+            'block_data_map': index_block_data_map,
+            'chunk_keys': chunk_keys,
+            'block_chunks': dict(block_chunks),
+        }
+        return index, chunks
+
+    @staticmethod
+    def _get_blocks_data(block_structure, block_relations, block_keys):
+        """
+        Returns the block relations and block data of the given blocks
+        of the given block structure.
+        """
+        block_data_map = block_structure._block_data_map
+        return (
+            {block_key: block_relations[block_key] for block_key in block_keys},
+            {block_key: block_data_map[block_key] for block_key in block_keys if block_key in block_data_map},
+        )
+
+    def _load_chunks(self, root_block_usage_key, index, starting_block_usage_key):
+        """
+        Loads the chunks referred to by the given index that are needed
+        for the block structure starting at starting_block_usage_key (or
+        all of them, if not given), and returns the combined block
+        relations, transformer data, and block data.
+
+        Returns None if any of the needed chunks is no longer in the cache.
+        """
+        block_chunks = index['block_chunks']
+        if starting_block_usage_key is None or starting_block_usage_key not in block_chunks:
+            chunk_indices = set(xrange(len(index['chunk_keys'])))
+        else:
+            chunk_indices = set(block_chunks[starting_block_usage_key])
+
+        block_relations = dict(index['block_relations'])
+        block_data_map = dict(index['block_data_map'])
+        loaded_chunk_indices = set()
+        while chunk_indices:
+            chunk_keys = [index['chunk_keys'][chunk_index] for chunk_index in chunk_indices]
+            zp_chunks_from_cache = self._cache.get_many(chunk_keys)
+            if len(zp_chunks_from_cache) != len(chunk_keys):
+                logger.info(
+                    "Did not find all chunks of BlockStructure %r in the cache.",
+                    root_block_usage_key,
+                )
+                return None
+            loaded_chunk_indices |= chunk_indices
+
+            # Blocks stored in more than one chunk also need the other
+            # chunks, for their other parents and ancestors.
+            chunk_indices = set()
+            for zp_chunk in zp_chunks_from_cache.itervalues():
+                chunk_block_relations, chunk_block_data_map = self._deserialize(zp_chunk)
+                for block_key in chunk_block_relations:
+                    chunk_indices.update(block_chunks[block_key])
+                block_relations.update(chunk_block_relations)
+                block_data_map.update(chunk_block_data_map)
+            chunk_indices -= loaded_chunk_indices
+
+        logger.info(
+            "Read %s of %s chunks of BlockStructure %r from cache.",
+            len(loaded_chunk_indices),
+            len(index['chunk_keys']),
+            root_block_usage_key,
+        )
+        return block_relations, index['transformer_data'], block_data_map
+
+    def _serialize(self, data):
+        """
+        Returns the compressed serialization of the given data, to be
+        stored in the cache.
+        """
+        if self._schema_encoding:
+            return zcompress(encoding.dumps(data), self._compressor)
+        return zpickle(data, self._compressor)
+
+    @staticmethod
+    def _deserialize(zdata):
+        """
+        Returns the data of the given compressed serialization, stored
+        in the cache with any encoding and compressor.
+        """
+        return encoding.loads(zdecompress(zdata))
+
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
         """
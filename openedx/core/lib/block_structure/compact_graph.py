@@ -0,0 +1,408 @@
+"""
+Module for a compact, array-backed representation of the relations
+of the blocks in a block structure.
+
+Each block is mapped to an integer id, and the ids of each block's
+children and parents are stored in flat arrays in compressed sparse row
+(CSR) form: the children of the block with id i are the ids in
+child_ids[child_offsets[i]:child_offsets[i + 1]], and likewise for parents.
+
+The arrays are never modified once built, so they are shared between
+copies of a graph.  Changes to a graph (removing blocks, adding relations
+between its blocks, and setting a new root) are recorded in overrides
+of the changed blocks' children and parents, which are private to each copy.
+
+The traversals implemented here yield the same blocks in the same order
+as the generic traversals in openedx.core.lib.graph_traversals, including
+when the given filter function modifies the graph while it is traversed.
+"""
+from array import array
+
+
+# Typecode of the arrays storing block ids and offsets.
+_ID_TYPECODE = 'i'
+
+
+class CompactBlockGraph(object):
+    """
+    Compact representation of the relations of the blocks in a block
+    structure, keyed by integer ids.
+    """
+    def __init__(self, block_keys, child_offsets, child_ids, parent_offsets, parent_ids):
+        # List of the usage keys of the blocks, indexed by their ids.
+        # [UsageKey]
+        self.block_keys = block_keys
+
+        # Map of a block's usage key to its id.
+        # dict {UsageKey: int}
+        self.block_ids = {block_key: block_id for block_id, block_key in enumerate(block_keys)}
+
+        # CSR arrays of the children and parents of the blocks.
+        self._child_offsets = child_offsets
+        self._child_ids = child_ids
+        self._parent_offsets = parent_offsets
+        self._parent_ids = parent_ids
+
+        # Maps of a block's id to the ids of its children (or parents),
+        # for the blocks whose relations changed since the arrays were
+        # built.
+        # dict {int: [int]}
+        self._child_overrides = {}
+        self._parent_overrides = {}
+
+        # Whether each block was removed, indexed by the block's id.
+        self._removed = bytearray(len(block_keys))
+        self._num_blocks = len(block_keys)
+
+    @classmethod
+    def from_block_relations(cls, root_block_usage_key, block_relations):
+        """
+        Returns a new graph for the given map of usage keys to their
+        relations (objects with parents and children lists).
+
+        Ids are assigned in pre-order from the root block, so that
+        blocks close to each other in the course are close to each
+        other in the arrays.  Any unreachable blocks are added last.
+
+        Relations to blocks that aren't in the map are left out, as for
+        a block structure that was only partly loaded from the cache.
+        """
+        block_keys = []
+        visited = set()
+        stack = [root_block_usage_key] if root_block_usage_key in block_relations else []
+        while stack:
+            block_key = stack.pop()
+            if block_key in visited or block_key not in block_relations:
+                continue
+            visited.add(block_key)
+            block_keys.append(block_key)
+            stack.extend(reversed(block_relations[block_key].children))
+        block_keys.extend(block_key for block_key in block_relations if block_key not in visited)
+
+        block_ids = {block_key: block_id for block_id, block_key in enumerate(block_keys)}
+        return cls._build(
+            block_keys,
+            [
+                [block_ids[child] for child in block_relations[key].children if child in block_ids]
+                for key in block_keys
+            ],
+            [
+                [block_ids[parent] for parent in block_relations[key].parents if parent in block_ids]
+                for key in block_keys
+            ],
+        )
+
+    @classmethod
+    def _build(cls, block_keys, children_lists, parents_lists):
+        """
+        Returns a new graph for the given block keys and lists of the
+        ids of their children and parents.
+        """
+        child_offsets, child_ids = cls._build_csr(children_lists)
+        parent_offsets, parent_ids = cls._build_csr(parents_lists)
+        return cls(block_keys, child_offsets, child_ids, parent_offsets, parent_ids)
+
+    @staticmethod
+    def _build_csr(id_lists):
+        """
+        Returns the offsets and values arrays for the given lists of ids.
+        """
+        offsets = array(_ID_TYPECODE, [0])
+        values = array(_ID_TYPECODE)
+        for ids in id_lists:
+            values.extend(ids)
+            offsets.append(len(values))
+        return offsets, values
+
+    def copy(self):
+        """
+        Returns a copy of this graph that can be changed independently
+        of it.  The arrays and block keys are shared with the copy.
+        """
+        graph = CompactBlockGraph.__new__(CompactBlockGraph)
+        graph.block_keys = self.block_keys
+        graph.block_ids = self.block_ids
+        graph._child_offsets = self._child_offsets
+        graph._child_ids = self._child_ids
+        graph._parent_offsets = self._parent_offsets
+        graph._parent_ids = self._parent_ids
+        graph._child_overrides = {block_id: list(ids) for block_id, ids in self._child_overrides.iteritems()}
+        graph._parent_overrides = {block_id: list(ids) for block_id, ids in self._parent_overrides.iteritems()}
+        graph._removed = bytearray(self._removed)
+        graph._num_blocks = self._num_blocks
+        return graph
+
+    def __len__(self):
+        return self._num_blocks
+
+    def __contains__(self, block_key):
+        block_id = self.block_ids.get(block_key)
+        return block_id is not None and not self._removed[block_id]
+
+    def get_block_id(self, block_key):
+        """
+        Returns the id of the given block, or None if the block isn't
+        in the graph.
+        """
+        block_id = self.block_ids.get(block_key)
+        return None if block_id is None or self._removed[block_id] else block_id
+
+    def iter_block_keys(self):
+        """
+        Returns an iterator of the usage keys of the blocks in the graph.
+        """
+        removed = self._removed
+        return (block_key for block_id, block_key in enumerate(self.block_keys) if not removed[block_id])
+
+    def iter_relations(self):
+        """
+        Returns an iterator of (usage key, parent keys, child keys)
+        tuples for the blocks in the graph.
+        """
+        block_keys = self.block_keys
+        for block_id in xrange(len(block_keys)):
+            if not self._removed[block_id]:
+                yield (
+                    block_keys[block_id],
+                    [block_keys[parent_id] for parent_id in self.get_parent_ids(block_id)],
+                    [block_keys[child_id] for child_id in self.get_child_ids(block_id)],
+                )
+
+    def get_child_ids(self, block_id):
+        """
+        Returns the ids of the children of the given block.
+        """
+        if self._removed[block_id]:
+            return ()
+        try:
+            return self._child_overrides[block_id]
+        except KeyError:
+            return self._child_ids[self._child_offsets[block_id]:self._child_offsets[block_id + 1]]
+
+    def get_parent_ids(self, block_id):
+        """
+        Returns the ids of the parents of the given block.
+        """
+        if self._removed[block_id]:
+            return ()
+        try:
+            return self._parent_overrides[block_id]
+        except KeyError:
+            return self._parent_ids[self._parent_offsets[block_id]:self._parent_offsets[block_id + 1]]
+
+    def get_children(self, block_key):
+        """
+        Returns the usage keys of the children of the given block.
+        """
+        block_id = self.get_block_id(block_key)
+        if block_id is None:
+            return []
+        block_keys = self.block_keys
+        return [block_keys[child_id] for child_id in self.get_child_ids(block_id)]
+
+    def get_parents(self, block_key):
+        """
+        Returns the usage keys of the parents of the given block.
+        """
+        block_id = self.get_block_id(block_key)
+        if block_id is None:
+            return []
+        block_keys = self.block_keys
+        return [block_keys[parent_id] for parent_id in self.get_parent_ids(block_id)]
+
+    def set_root(self, block_id):
+        """
+        Removes the relations of the given block to its parents, without
+        updating the parents, as done when it becomes the new root.
+        """
+        self._parent_overrides[block_id] = []
+
+    def add_relation(self, parent_id, child_id):
+        """
+        Adds a parent to child relationship between the given blocks.
+        """
+        self._get_writable_child_ids(parent_id).append(child_id)
+        self._get_writable_parent_ids(child_id).append(parent_id)
+
+    def remove(self, block_id, keep_descendants):
+        """
+        Removes the given block from the graph.  If its descendants are
+        to be kept, its children become children of its parents.
+        """
+        child_ids = list(self.get_child_ids(block_id))
+        parent_ids = list(self.get_parent_ids(block_id))
+
+        for child_id in child_ids:
+            self._get_writable_parent_ids(child_id).remove(block_id)
+        for parent_id in parent_ids:
+            self._get_writable_child_ids(parent_id).remove(block_id)
+
+        self._removed[block_id] = 1
+        self._num_blocks -= 1
+
+        if keep_descendants:
+            for child_id in child_ids:
+                for parent_id in parent_ids:
+                    self.add_relation(parent_id, child_id)
+
+    def pruned(self, root_id):
+        """
+        Returns a new graph with only the blocks reachable from the
+        given root block.
+        """
+        block_keys = []
+        new_ids = {}
+        children_lists = []
+        parents_lists = []
+
+        # Build the graph from the leaves up by doing a post-order
+        # traversal, thereby encountering only reachable blocks.
+        for block_id in self.traverse_post_order_ids(root_id):
+            new_id = len(block_keys)
+            new_ids[block_id] = new_id
+            block_keys.append(self.block_keys[block_id])
+            parents_lists.append([])
+
+            # Keep only those children that were also added.
+            children = [new_ids[child_id] for child_id in self.get_child_ids(block_id) if child_id in new_ids]
+            children_lists.append(children)
+            for child in children:
+                parents_lists[child].append(new_id)
+
+        return self._build(block_keys, children_lists, parents_lists)
+
+    def traverse_topologically(self, start_id, filter_func=None, yield_descendants_of_unyielded=False):
+        """
+        Generator for yielding the usage keys of the blocks in a
+        topological sort, starting at the given block.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_topologically.
+            The filter_func function is given usage keys.
+        """
+        block_keys = self.block_keys
+        filter_func = filter_func or (lambda __: True)
+
+        # The accessors are inlined below, as this is the hottest loop
+        # of transforms.  The overrides are only ever modified in place,
+        # so changes made by filter_func are seen by the traversal.
+        removed = self._removed
+        child_overrides, child_offsets, child_ids = self._child_overrides, self._child_offsets, self._child_ids
+        parent_overrides, parent_offsets, parent_ids = self._parent_overrides, self._parent_offsets, self._parent_ids
+
+        # Whether each block was visited and yielded, indexed by id:
+        # 0 if not visited, 1 if yielded, 2 if visited but not yielded.
+        yield_results = bytearray(len(block_keys))
+        stack = [start_id]
+
+        while stack:
+            current_id = stack.pop()
+
+            # Make sure all the block's parents have been visited, and
+            # that at least one of them was yielded, unless specified
+            # otherwise.
+            if current_id != start_id:
+                if removed[current_id]:
+                    parents = ()
+                else:
+                    parents = parent_overrides.get(current_id)
+                    if parents is None:
+                        parents = parent_ids[parent_offsets[current_id]:parent_offsets[current_id + 1]]
+
+                all_parents_visited = True
+                any_parent_yielded = False
+                for parent_id in parents:
+                    parent_yield_result = yield_results[parent_id]
+                    if not parent_yield_result:
+                        all_parents_visited = False
+                        break
+                    elif parent_yield_result == 1:
+                        any_parent_yielded = True
+
+                if not all_parents_visited:
+                    continue
+                elif not yield_descendants_of_unyielded and not any_parent_yielded:
+                    continue
+
+            if not yield_results[current_id]:
+                # Add the children to the stack before checking whether
+                # the block is yielded, in case a child has multiple
+                # parents and this is its last parent.
+                if not removed[current_id]:
+                    children = child_overrides.get(current_id)
+                    if children is None:
+                        children = child_ids[child_offsets[current_id]:child_offsets[current_id + 1]]
+                    stack.extend(reversed(children))
+
+                current_key = block_keys[current_id]
+                if filter_func(current_key):
+                    yield current_key
+                    yield_results[current_id] = 1
+                else:
+                    yield_results[current_id] = 2
+
+    def traverse_post_order(self, start_id, filter_func=None):
+        """
+        Generator for yielding the usage keys of the blocks in a
+        post-order sort, starting at the given block.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_post_order.
+            The filter_func function is given usage keys.
+        """
+        block_keys = self.block_keys
+        for block_id in self.traverse_post_order_ids(
+                start_id,
+                filter_func=(lambda block_id: filter_func(block_keys[block_id])) if filter_func else None,
+        ):
+            yield block_keys[block_id]
+
+    def traverse_post_order_ids(self, start_id, filter_func=None):
+        """
+        Generator for yielding the ids of the blocks in a post-order
+        sort, starting at the given block.  The filter_func function
+        is given block ids.
+        """
+        get_child_ids = self.get_child_ids
+
+        # Keep an active children iterator for each block on the stack,
+        # to determine when all of its children were visited.
+        stack = [(start_id, iter(get_child_ids(start_id)))]
+        visited = bytearray(len(self.block_keys))
+
+        while stack:
+            current_id, children = stack[-1]
+
+            # Skip blocks that were already visited or are filtered out.
+            if visited[current_id] or (filter_func and not filter_func(current_id)):
+                stack.pop()
+                continue
+
+            for child_id in children:
+                stack.append((child_id, iter(get_child_ids(child_id))))
+                break
+            else:
+                # Since there are no children left, visit the block.
+                yield current_id
+                visited[current_id] = 1
+                stack.pop()
+
+    def _get_writable_child_ids(self, block_id):
+        """
+        Returns a list of the ids of the given block's children that
+        can be changed.
+        """
+        if block_id not in self._child_overrides:
+            self._child_overrides[block_id] = list(self.get_child_ids(block_id))
+        return self._child_overrides[block_id]
+
+    def _get_writable_parent_ids(self, block_id):
+        """
+        Returns a list of the ids of the given block's parents that
+        can be changed.
+        """
+        if block_id not in self._parent_overrides:
+            self._parent_overrides[block_id] = list(self.get_parent_ids(block_id))
+        return self._parent_overrides[block_id]
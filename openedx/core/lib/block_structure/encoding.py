@@ -0,0 +1,302 @@
+"""
+Schema-aware encoding of the data that BlockStructureCache stores, as an
+alternative to pickling it.
+
+The cache stores three kinds of payloads:
+    * a whole block structure, as a (block_relations, transformer_data,
+      block_data_map) tuple,
+    * a chunk of a block structure, as a (block_relations, block_data_map)
+      tuple, and
+    * the index of a chunked block structure, as a dict (see
+      BlockStructureCache._split_into_chunks).
+
+Pickling these payloads serializes every usage key, _BlockRelations and
+BlockData object on its own, with the class and attribute names of each.
+This encoding instead stores each distinct usage key once, in a key table,
+and refers to blocks by their position in it, so that the relations and
+collected data of the blocks become plain lists and dicts of builtin types,
+which are serialized with marshal.  Only the key table and the field values
+that marshal can't serialize as is, like datetimes, are pickled.
+
+loads reads back both the serializations made by dumps and pickled
+payloads, so that a cache holding either can be read.
+"""
+import cPickle as pickle
+import marshal
+from types import NoneType
+
+from .block_structure import _BlockRelations, BlockData, TransformerData, TransformerDataMap
+
+
+# The first byte of encoded payloads.  Pickled payloads start with the
+# pickle PROTO opcode instead.
+_ENCODING_MARKER = 'S'
+
+# The version of the encoding.  Update it whenever the encoding changes.
+ENCODING_VERSION = 1
+
+_STRUCTURE, _CHUNK, _INDEX = range(3)
+
+# The types that marshal serializes as is, and that are deserialized with the
+# same type.  Instances of their subclasses aren't included, since marshal
+# would lose their type.
+_PLAIN_SCALAR_TYPES = frozenset([NoneType, bool, int, long, float, str, unicode])
+_PLAIN_CONTAINER_TYPES = frozenset([list, tuple, set, frozenset])
+
+
+def dumps(payload):
+    """
+    Returns the encoding of the given payload, of any of the kinds stored
+    by BlockStructureCache.
+    """
+    encoder = _Encoder()
+    if isinstance(payload, dict):
+        kind = _INDEX
+        block_relations = payload['block_relations']
+        transformer_data = payload['transformer_data']
+        block_data_map = payload['block_data_map']
+    elif len(payload) == 3:
+        kind = _STRUCTURE
+        block_relations, transformer_data, block_data_map = payload
+    else:
+        kind = _CHUNK
+        block_relations, block_data_map = payload
+        transformer_data = None
+
+    encoded_payload = [
+        encoder.encode_block_relations(block_relations),
+        encoder.encode_block_data_map(block_data_map),
+        None if transformer_data is None else encoder.encode_transformer_data(transformer_data),
+    ]
+    if kind == _INDEX:
+        encoded_payload.append(payload['chunk_keys'])
+        encoded_payload.append({
+            encoder.key_index(block_key): chunk_indices
+            for block_key, chunk_indices in payload['block_chunks'].iteritems()
+        })
+
+    return _ENCODING_MARKER + marshal.dumps((
+        ENCODING_VERSION,
+        kind,
+        pickle.dumps((encoder.keys, encoder.unplain_fields), pickle.HIGHEST_PROTOCOL),
+        tuple(encoded_payload),
+    ))
+
+
+def loads(data):
+    """
+    Returns the payload of the given serialization, made either by dumps
+    or by pickling the payload.
+    """
+    if not data.startswith(_ENCODING_MARKER):
+        return pickle.loads(data)
+
+    version, kind, pickled_data, encoded_payload = marshal.loads(data[len(_ENCODING_MARKER):])
+    if version != ENCODING_VERSION:
+        raise ValueError('Unknown block structure encoding version {}'.format(version))
+    keys, unplain_fields = pickle.loads(pickled_data)
+    decoder = _Decoder(keys, unplain_fields)
+
+    block_relations = decoder.decode_block_relations(encoded_payload[0])
+    block_data_map = decoder.decode_block_data_map(encoded_payload[1])
+    if kind == _CHUNK:
+        return block_relations, block_data_map
+
+    transformer_data = decoder.decode_transformer_data(encoded_payload[2])
+    if kind == _STRUCTURE:
+        return block_relations, transformer_data, block_data_map
+
+    return {
+        'block_relations': block_relations,
+        'transformer_data': transformer_data,
+        'block_data_map': block_data_map,
+        'chunk_keys': encoded_payload[3],
+        'block_chunks': {
+            keys[key_index]: chunk_indices
+            for key_index, chunk_indices in encoded_payload[4].iteritems()
+        },
+    }
+
+
+def _is_plain(value):
+    """
+    Returns whether marshal serializes the given value as is.
+    """
+    value_type = type(value)
+    if value_type in _PLAIN_SCALAR_TYPES:
+        return True
+    if value_type in _PLAIN_CONTAINER_TYPES:
+        return all(_is_plain(item) for item in value)
+    if value_type is dict:
+        return all(_is_plain(key) and _is_plain(item) for key, item in value.iteritems())
+    return False
+
+
+def _new_field_data(field_data_class, **attributes):
+    """
+    Returns a new instance of the given FieldData class with the given
+    attributes, setting them the way unpickling does, without the overhead
+    of FieldData.__setattr__.
+    """
+    field_data = field_data_class.__new__(field_data_class)
+    field_data.__dict__.update(attributes)
+    return field_data
+
+
+class _Encoder(object):
+    """
+    Encodes the parts of a payload, collecting the usage keys they refer to
+    into a key table, and the field values that aren't plain into a dict
+    of their own.
+    """
+    def __init__(self):
+        # list [UsageKey]
+        self.keys = []
+
+        # dict {UsageKey: int}
+        self._key_indices = {}
+
+        # Map of (block key index or None, transformer name or None) to
+        # the fields of the block or block structure that aren't plain.
+        # dict {(int, string): dict}
+        self.unplain_fields = {}
+
+    def key_index(self, block_key):
+        """
+        Returns the index of the given usage key in the key table.
+        """
+        try:
+            return self._key_indices[block_key]
+        except KeyError:
+            key_index = self._key_indices[block_key] = len(self.keys)
+            self.keys.append(block_key)
+            return key_index
+
+    def encode_block_relations(self, block_relations):
+        """
+        Returns a list of (block, parents, children) tuples of key indices.
+        """
+        key_index = self.key_index
+        return [
+            (
+                key_index(block_key),
+                [key_index(parent_key) for parent_key in relations.parents],
+                [key_index(child_key) for child_key in relations.children],
+            )
+            for block_key, relations in block_relations.iteritems()
+        ]
+
+    def encode_block_data_map(self, block_data_map):
+        """
+        Returns a list of (block, xblock fields, transformer fields) tuples.
+        """
+        encoded_block_data = []
+        for block_key, block_data in block_data_map.iteritems():
+            block_index = self.key_index(block_key)
+            encoded_block_data.append((
+                block_index,
+                self._encode_fields(block_data.fields, block_index, None),
+                self._encode_transformer_data(block_data.transformer_data, block_index),
+            ))
+        return encoded_block_data
+
+    def encode_transformer_data(self, transformer_data):
+        """
+        Returns a dict of transformer names to the transformers' fields.
+        """
+        return self._encode_transformer_data(transformer_data, None)
+
+    def _encode_transformer_data(self, transformer_data, block_index):
+        """
+        Returns a dict of transformer names to the transformers' fields,
+        for the given block or for the block structure.
+        """
+        return {
+            transformer_name: self._encode_fields(data.fields, block_index, transformer_name)
+            for transformer_name, data in transformer_data.iteritems()
+        }
+
+    def _encode_fields(self, fields, block_index, transformer_name):
+        """
+        Returns the plain fields of the given fields, setting aside the
+        others to be pickled.
+        """
+        plain_fields = {}
+        unplain_fields = {}
+        for field_name, value in fields.iteritems():
+            if _is_plain(value):
+                plain_fields[field_name] = value
+            else:
+                unplain_fields[field_name] = value
+        if unplain_fields:
+            self.unplain_fields[(block_index, transformer_name)] = unplain_fields
+        return plain_fields
+
+
+class _Decoder(object):
+    """
+    Decodes the parts of a payload encoded by _Encoder.
+    """
+    def __init__(self, keys, unplain_fields):
+        self._keys = keys
+        self._unplain_fields = unplain_fields
+
+    def decode_block_relations(self, encoded_block_relations):
+        """
+        Returns the block relations map of the given encoding.
+        """
+        keys = self._keys
+        block_relations = {}
+        for block_index, parent_indices, child_indices in encoded_block_relations:
+            relations = _BlockRelations()
+            relations.parents = [keys[parent_index] for parent_index in parent_indices]
+            relations.children = [keys[child_index] for child_index in child_indices]
+            block_relations[keys[block_index]] = relations
+        return block_relations
+
+    def decode_block_data_map(self, encoded_block_data):
+        """
+        Returns the block data map of the given encoding.
+        """
+        block_data_map = {}
+        for block_index, fields, encoded_transformer_data in encoded_block_data:
+            block_key = self._keys[block_index]
+            block_data_map[block_key] = _new_field_data(
+                BlockData,
+                fields=self._decode_fields(fields, block_index, None),
+                location=block_key,
+                transformer_data=self._decode_transformer_data(encoded_transformer_data, block_index),
+            )
+        return block_data_map
+
+    def decode_transformer_data(self, encoded_transformer_data):
+        """
+        Returns the block structure's transformer data map of the given
+        encoding.
+        """
+        return self._decode_transformer_data(encoded_transformer_data, None)
+
+    def _decode_transformer_data(self, encoded_transformer_data, block_index):
+        """
+        Returns the transformer data map of the given encoding, for the
+        given block or for the block structure.
+        """
+        # Transformer names are already translated keys, so the map is
+        # initialized with them as is.
+        return TransformerDataMap(
+            (
+                transformer_name,
+                _new_field_data(TransformerData, fields=self._decode_fields(fields, block_index, transformer_name)),
+            )
+            for transformer_name, fields in encoded_transformer_data.iteritems()
+        )
+
+    def _decode_fields(self, fields, block_index, transformer_name):
+        """
+        Returns the given plain fields, with the fields set aside when
+        encoding them added back.
+        """
+        unplain_fields = self._unplain_fields.get((block_index, transformer_name))
+        if unplain_fields:
+            fields.update(unplain_fields)
+        return fields
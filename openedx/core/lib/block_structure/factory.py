@@ -58,7 +58,7 @@ class BlockStructureFactory(object):
         return block_structure
 
     @classmethod
-    def create_from_cache(cls, root_block_usage_key, block_structure_cache):
+    def create_from_cache(cls, root_block_usage_key, block_structure_cache, starting_block_usage_key=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given cache, if it's found in the cache.
@@ -75,13 +75,17 @@ class BlockStructureFactory(object):
                 cache from which the block structure is to be
                 deserialized.
 
+            starting_block_usage_key (UsageKey) - If given, only the
+                part of the block structure that is needed for starting
+                at this block may be deserialized.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
             NoneType - If the root_block_usage_key is not found in the cache.
         """
-        return block_structure_cache.get(root_block_usage_key)
+        return block_structure_cache.get(root_block_usage_key, starting_block_usage_key)
 
     @classmethod
     def create_new(cls, root_block_usage_key, block_relations, transformer_data, block_data_map):
@@ -15,7 +15,16 @@ class BlockStructureManager(object):
     Top-level class for managing Block Structures.
     """
 
-    def __init__(self, root_block_usage_key, modulestore, cache):
+    def __init__(
+            self,
+            root_block_usage_key,
+            modulestore,
+            cache,
+            chunked_cache=False,
+            compact_transforms=False,
+            cache_compressor=None,
+            schema_encoded_cache=False,
+    ):
         """
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
@@ -28,10 +37,32 @@ class BlockStructureManager(object):
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache to use for storing/retrieving the block structure's
                 collected data.
+
+            chunked_cache (bool) - Whether the collected data is stored
+                in the cache in per-subtree chunks, so transforming part
+                of the block structure only loads the chunks it needs.
+
+            compact_transforms (bool) - Whether block structures are
+                compacted (see BlockStructure.compact) before being
+                transformed.
+
+            cache_compressor (string) - The name of the compressor that
+                the collected data is compressed with in the cache (see
+                BlockStructureCache).
+
+            schema_encoded_cache (bool) - Whether the collected data is
+                stored in the cache in the schema-aware encoding of the
+                encoding module, rather than pickled.
         """
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
-        self.block_structure_cache = BlockStructureCache(cache)
+        self.block_structure_cache = BlockStructureCache(
+            cache,
+            chunked=chunked_cache,
+            compressor=cache_compressor,
+            schema_encoding=schema_encoded_cache,
+        )
+        self.compact_transforms = compact_transforms
 
     def get_transformed(self, transformers, starting_block_usage_key=None, collected_block_structure=None):
         """
@@ -53,13 +84,23 @@ class BlockStructureManager(object):
             collected_block_structure (BlockStructureBlockData) - A
                 block structure retrieved from a prior call to
                 get_collected.  Can be optionally provided if already available,
-                for optimization.
+                for optimization.  It is not modified: the transformers
+                are applied to a copy-on-write view of it.
 
         Returns:
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = collected_block_structure.copy() if collected_block_structure else self.get_collected()
+        if collected_block_structure:
+            # Compacting the collected block structure doesn't change its
+            # behavior, and allows its copies to share the compact form.
+            if self.compact_transforms:
+                collected_block_structure.compact()
+            block_structure = collected_block_structure.copy_on_write()
+        else:
+            block_structure = self.get_collected(starting_block_usage_key)
+            if self.compact_transforms:
+                block_structure.compact()
 
         if starting_block_usage_key:
             # Override the root_block_usage_key so traversals start at the
@@ -75,7 +116,7 @@ class BlockStructureManager(object):
         transformers.transform(block_structure)
         return block_structure
 
-    def get_collected(self):
+    def get_collected(self, starting_block_usage_key=None):
         """
         Returns the collected Block Structure for the root_block_usage_key,
         getting block data from the cache and modulestore, as needed.
@@ -84,6 +125,12 @@ class BlockStructureManager(object):
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        Arguments:
+            starting_block_usage_key (UsageKey) - If given, the block
+                structure is only guaranteed to include the blocks that
+                are reachable from this block, which may allow reading
+                less data from the cache.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
@@ -91,7 +138,8 @@ class BlockStructureManager(object):
         """
         block_structure = BlockStructureFactory.create_from_cache(
             self.root_block_usage_key,
-            self.block_structure_cache
+            self.block_structure_cache,
+            starting_block_usage_key,
         )
         cache_miss = block_structure is None
         if cache_miss or BlockStructureTransformers.is_collected_outdated(block_structure):
@@ -104,15 +152,41 @@ class BlockStructureManager(object):
                 self.block_structure_cache.add(block_structure)
         return block_structure
 
-    def update_collected(self):
+    def update_collected(self, incremental=False):
         """
         Updates the collected Block Structure for the root_block_usage_key.
 
         Details: The cache is cleared and updated by collecting transformers
         data from the modulestore.
+
+        Arguments:
+            incremental (bool) - If True and the cache holds a block
+                structure collected with the current transformers, the
+                cache is not cleared.  Instead, transformers data is
+                recollected only for the blocks that changed since then
+                (and their ancestors and descendants), and the cached
+                data is reused for all other blocks.
         """
+        if incremental:
+            collected_block_structure = BlockStructureFactory.create_from_cache(
+                self.root_block_usage_key,
+                self.block_structure_cache
+            )
+            if (
+                    collected_block_structure is not None and
+                    not BlockStructureTransformers.is_collected_outdated(collected_block_structure)
+            ):
+                with self._bulk_operations():
+                    block_structure = BlockStructureFactory.create_from_modulestore(
+                        self.root_block_usage_key,
+                        self.modulestore
+                    )
+                    BlockStructureTransformers.collect_incrementally(block_structure, collected_block_structure)
+                    self.block_structure_cache.add(block_structure)
+                return block_structure
+
         self.clear()
-        self.get_collected()
+        return self.get_collected()
 
     def clear(self):
         """
@@ -0,0 +1,121 @@
+"""
+Benchmark of storing block structures in the cache, comparing pickling with
+the schema-aware encoding, and the available compressors.
+
+Run with:
+    python -m openedx.core.lib.block_structure.tests.benchmark_cache_encoding [number of blocks ...]
+
+For synthetic courses of the given sizes (1,000, 10,000 and 50,000 blocks
+by default), this times serializing the collected data of the course into
+the value stored in the cache, and deserializing it back, and prints the
+size of the stored value.  The courses have split usage keys, and the kinds
+of xBlock fields and transformer data that the LMS transformers collect.
+"""
+from datetime import datetime
+import sys
+import timeit
+
+from opaque_keys.edx.locator import CourseLocator
+
+from ..cache import BlockStructureCache
+from ..block_structure import BlockStructureBlockData
+
+# Number of children of the blocks at each level of the synthetic course,
+# and their block types: chapters, sequentials, verticals and components.
+BRANCHING = [20, 10, 5, 10]
+BLOCK_TYPES = ['chapter', 'sequential', 'vertical', 'problem']
+
+REPEAT = 3
+
+
+class _DictCache(object):
+    """
+    A cache storing its values in a dict.
+    """
+    def __init__(self):
+        self.map = {}
+
+    def set(self, key, val, timeout):  # pylint: disable=unused-argument
+        self.map[key] = val
+
+    def get(self, key, default=None):
+        return self.map.get(key, default)
+
+
+def create_course(num_blocks):
+    """
+    Returns a collected block structure with about num_blocks blocks,
+    shaped like a course.
+    """
+    # pylint: disable=protected-access
+    scale = (float(num_blocks) / 10000) ** (1.0 / len(BRANCHING))
+    branching = [max(1, int(round(children * scale))) for children in BRANCHING]
+
+    course_key = CourseLocator('org', 'course', 'run')
+    root_key = course_key.make_usage_key('course', 'course')
+    block_structure = BlockStructureBlockData(root_key)
+    block_structure.set_transformer_data('course_blocks_api', 'user_partitions', [])
+    level = [root_key]
+    for depth, num_children in enumerate(branching):
+        next_level = []
+        for parent_key in level:
+            for _ in xrange(num_children):
+                # Children keys are equal to, but not the same objects
+                # as, the keys of the blocks, as in collected structures.
+                child_id = '{}{:06d}'.format(BLOCK_TYPES[depth], len(block_structure))
+                block_key = course_key.make_usage_key(BLOCK_TYPES[depth], child_id)
+                block_structure._add_relation(parent_key, course_key.make_usage_key(BLOCK_TYPES[depth], child_id))
+
+                block_data = block_structure._get_or_create_block(block_key)
+                block_data.display_name = u'Block {}'.format(child_id)
+                block_data.start = datetime(2016, 1, 1)
+                block_data.due = None
+                block_data.graded = depth == 1
+                block_data.format = u'Homework' if depth == 1 else None
+                block_data.weight = None
+                block_data.edited_on = datetime(2016, 6, 1)
+                for transformer, field_name, value in [
+                        ('visibility', 'merged_visible_to_staff_only', False),
+                        ('start_date', 'merged_start_date', []),
+                        ('split_test', 'merged_group_access', {}),
+                ]:
+                    block_structure.set_transformer_block_field(block_key, transformer, field_name, value)
+                next_level.append(block_key)
+        level = next_level
+    return block_structure
+
+
+def best_time(func, number):
+    """
+    Returns the best time in milliseconds, per call, of the given function.
+    """
+    return min(timeit.repeat(func, repeat=REPEAT, number=number)) / number * 1000
+
+
+def main(sizes):
+    """
+    Prints the timings and sizes of the stored values for each course size,
+    encoding and compressor.
+    """
+    # pylint: disable=cell-var-from-loop
+    for num_blocks in sizes:
+        block_structure = create_course(num_blocks)
+        print "Blocks: {}".format(len(block_structure))
+        for schema_encoding in [False, True]:
+            for compressor in [None, 'zlib-fast']:
+                cache = _DictCache()
+                block_structure_cache = BlockStructureCache(
+                    cache, compressor=compressor, schema_encoding=schema_encoding,
+                )
+                block_structure_cache.add(block_structure)
+                print "{:<8} {:<10} write: {:8.2f} ms    read: {:8.2f} ms    size: {:6d} KB".format(
+                    'schema' if schema_encoding else 'pickle',
+                    compressor or 'default',
+                    best_time(lambda: block_structure_cache.add(block_structure), number=1),
+                    best_time(lambda: block_structure_cache.get(block_structure.root_block_usage_key), number=1),
+                    sum(len(value) for value in cache.map.itervalues()) / 1024,
+                )
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [1000, 10000, 50000])
@@ -0,0 +1,101 @@
+"""
+Benchmark of per-request block structure transformations, comparing the
+regular block structure representation with the compact one.
+
+Run with:
+    python -m openedx.core.lib.block_structure.tests.benchmark_compact_graph [number of blocks]
+
+For a synthetic course of the given size (10,000 blocks by default), this
+times the operations done when transforming a collected block structure for
+a request: copying it, a topological traversal removing some of the blocks
+(as the course_blocks transformers' removal filters do), a post-order
+traversal, and pruning.  The first call to compact() on a collected block
+structure is timed separately, since its result is shared by all copies.
+"""
+import sys
+import timeit
+
+from ..block_structure import BlockStructureBlockData
+
+# Number of children of the blocks at each level of the synthetic course:
+# chapters, sequentials, verticals and components.
+BRANCHING = [20, 10, 5, 10]
+
+REPEAT = 5
+
+
+def create_course(num_blocks):
+    """
+    Returns a collected block structure with about num_blocks blocks,
+    shaped like a course.
+    """
+    scale = (float(num_blocks) / 10000) ** (1.0 / len(BRANCHING))
+    branching = [max(1, int(round(children * scale))) for children in BRANCHING]
+
+    block_structure = BlockStructureBlockData(0)
+    level = [0]
+    next_key = 1
+    for num_children in branching:
+        next_level = []
+        for parent in level:
+            for _ in xrange(num_children):
+                block_structure._add_relation(parent, next_key)  # pylint: disable=protected-access
+                block_structure.set_transformer_block_field(next_key, 'benchmark', 'visible', next_key % 7 != 0)
+                next_level.append(next_key)
+                next_key += 1
+        level = next_level
+    return block_structure
+
+
+def transform(collected_block_structure):
+    """
+    Transforms a copy of the given collected block structure, the way
+    the manager and transformers do.
+    """
+    block_structure = collected_block_structure.copy_on_write()
+    block_structure.remove_block_traversal(
+        lambda block_key: not block_structure.get_transformer_block_field(block_key, 'benchmark', 'visible', True),
+    )
+    for _ in block_structure.post_order_traversal():
+        pass
+    block_structure._prune_unreachable()  # pylint: disable=protected-access
+    return block_structure
+
+
+def best_time(func, number):
+    """
+    Returns the best time in milliseconds, per call, of the given function.
+    """
+    return min(timeit.repeat(func, repeat=REPEAT, number=number)) / number * 1000
+
+
+def main(num_blocks):
+    """
+    Prints the timings of the benchmarked operations for both representations.
+    """
+    regular = create_course(num_blocks)
+    compact = create_course(num_blocks)
+    print "Blocks: {}".format(len(regular))
+
+    print "compact(): {:.2f} ms".format(best_time(lambda: create_course(num_blocks).compact(), number=1) - best_time(
+        lambda: create_course(num_blocks), number=1
+    ))
+    compact.compact()
+
+    # pylint: disable=cell-var-from-loop
+    for name, operation in [
+            ('deep copy', lambda block_structure: block_structure.copy()),
+            ('copy_on_write', lambda block_structure: block_structure.copy_on_write()),
+            ('topological_traversal', lambda block_structure: list(block_structure.topological_traversal())),
+            ('post_order_traversal', lambda block_structure: list(block_structure.post_order_traversal())),
+            ('transform', transform),
+    ]:
+        print "{:<24} regular: {:8.2f} ms    compact: {:8.2f} ms".format(
+            name,
+            best_time(lambda: operation(regular), number=3),
+            best_time(lambda: operation(compact), number=3),
+        )
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -102,11 +102,32 @@ class MockCache(object):
         """
         return self.map.get(key, default)
 
+    def set_many(self, data, timeout):
+        """
+        Associates each of the given keys with its value in the cache.
+        """
+        for key, val in data.iteritems():
+            self.set(key, val, timeout)
+
+    def get_many(self, keys):
+        """
+        Returns a dict of the given keys that are found in the cache
+        to their values.
+        """
+        return {key: self.map[key] for key in keys if key in self.map}
+
     def delete(self, key):
         """
-        Deletes the given key from the cache.
+        Deletes the given key from the cache, if present.
+        """
+        self.map.pop(key, None)
+
+    def delete_many(self, keys):
+        """
+        Deletes the given keys from the cache, if present.
         """
-        del self.map[key]
+        for key in keys:
+            self.delete(key)
 
 
 class MockModulestoreFactory(object):
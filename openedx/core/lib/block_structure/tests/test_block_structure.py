@@ -267,3 +267,34 @@ class TestBlockStructureData(TestCase, ChildrenMapTestMixin):
         _set_value(new_copy, 'edit2')
         self.assertEquals(_get_value(block_structure), 'edit1')
         self.assertEquals(_get_value(new_copy), 'edit2')
+
+    def test_copy_on_write(self):
+        block_structure = self.create_block_structure(ChildrenMapTestMixin.DAG_CHILDREN_MAP)
+        for block in block_structure:
+            block_structure.set_transformer_block_field(block, 'transformer', 'test_key', 'original_value')
+        block_structure.set_transformer_data('transformer', 'test_key', 'original_value')
+
+        # unmodified blocks are shared with the copy
+        new_copy = block_structure.copy_on_write()
+        for block in block_structure:
+            self.assertIs(block_structure[block], new_copy[block])
+            self.assertEquals(block_structure.get_children(block), new_copy.get_children(block))
+
+        # verify edits to the copy do not affect the original
+        new_copy.remove_block(3, keep_descendants=True)
+        new_copy.set_transformer_block_field(1, 'transformer', 'test_key', 'edit')
+        new_copy.set_transformer_data('transformer', 'test_key', 'edit')
+        new_copy.set_root_block(2)
+        new_copy._prune_unreachable()  # pylint: disable=protected-access
+
+        self.assert_block_structure(new_copy, [[], [], [4, 5, 6], [], [], [], []], missing_blocks=[0, 1, 3])
+        self.assert_block_structure(block_structure, ChildrenMapTestMixin.DAG_CHILDREN_MAP)
+        self.assertEquals(new_copy.get_transformer_block_field(1, 'transformer', 'test_key'), 'edit')
+        self.assertEquals(new_copy.get_transformer_data('transformer', 'test_key'), 'edit')
+        for block in block_structure:
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block, 'transformer', 'test_key'),
+                'original_value',
+            )
+        self.assertEquals(block_structure.get_transformer_data('transformer', 'test_key'), 'original_value')
+        self.assertIs(block_structure[4], new_copy[4])
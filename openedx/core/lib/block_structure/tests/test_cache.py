@@ -1,6 +1,10 @@
 """
 Tests for block_structure/cache.py
 """
+from datetime import datetime
+import itertools
+
+import ddt
 from nose.plugins.attrib import attr
 from unittest import TestCase
 
@@ -9,6 +13,7 @@ from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer
 
 
 @attr(shard=2)
+@ddt.ddt
 class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
     """
     Tests for BlockStructureCache
@@ -31,26 +36,101 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
                 usage_key=0, transformer=transformer, key='test', value='{} val'.format(transformer.name())
             )
 
-    def test_add_and_get(self):
+    @ddt.data(False, True)
+    def test_add_and_get(self, chunked):
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, chunked=chunked)
         self.assertEquals(self.mock_cache.timeout_from_last_call, 0)
 
         self.add_transformers()
         self.block_structure_cache.add(self.block_structure)
         self.assertEquals(self.mock_cache.timeout_from_last_call, 60 * 60 * 24)
+        self.assertEquals(len(self.mock_cache.map), 3 if chunked else 1)
 
         cached_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         self.assertIsNotNone(cached_value)
         self.assert_block_structure(cached_value, self.children_map)
+        self.assertEquals(
+            cached_value.get_transformer_block_field(0, MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+
+    @ddt.data(False, True)
+    def test_formats_are_interchangeable(self, chunked):
+        self.add_transformers()
+        BlockStructureCache(self.mock_cache, chunked=chunked).add(self.block_structure)
+        cached_value = BlockStructureCache(self.mock_cache, chunked=not chunked).get(
+            self.block_structure.root_block_usage_key
+        )
+        self.assert_block_structure(cached_value, self.children_map)
+
+    @ddt.data(*itertools.product([False, True], [False, True], [None, 'zlib', 'zlib-fast']))
+    @ddt.unpack
+    def test_encodings_and_compressors(self, chunked, schema_encoding, compressor):
+        self.add_transformers()
+        self.block_structure._get_or_create_block(1).start = datetime(2016, 1, 1)  # pylint: disable=protected-access
+        self.block_structure.set_transformer_data(MockTransformer, 'test', {'val': [1, 2]})
+        BlockStructureCache(
+            self.mock_cache, chunked=chunked, compressor=compressor, schema_encoding=schema_encoding,
+        ).add(self.block_structure)
+
+        cached_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        self.assert_block_structure(cached_value, self.children_map)
+        self.assertEquals(cached_value.get_xblock_field(1, 'start'), datetime(2016, 1, 1))
+        self.assertEquals(cached_value.get_transformer_data(MockTransformer, 'test'), {'val': [1, 2]})
+        self.assertEquals(
+            cached_value.get_transformer_block_field(0, MockTransformer, 'test'),
+            '{} val'.format(MockTransformer.name()),
+        )
+
+    @ddt.data(
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, 1, [2]),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, 2, [1, 3, 4]),
+        (ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP, 0, []),
+        # block 3 is also reachable from block 2, so both chunks are needed
+        (ChildrenMapTestMixin.DAG_CHILDREN_MAP, 1, []),
+    )
+    @ddt.unpack
+    def test_get_partial(self, children_map, starting_block, missing_blocks):
+        self.children_map = children_map
+        self.block_structure = self.create_block_structure(children_map)
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, chunked=True)
+        self.block_structure_cache.add(self.block_structure)
+
+        cached_value = self.block_structure_cache.get(self.block_structure.root_block_usage_key, starting_block)
+        self.assert_block_structure(cached_value, children_map, missing_blocks)
+
+    @ddt.data(False, True)
+    def test_readd_deletes_previous_chunks(self, chunked):
+        BlockStructureCache(self.mock_cache, chunked=True).add(self.block_structure)
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, chunked=chunked)
+        self.block_structure_cache.add(self.block_structure)
+        self.assertEquals(len(self.mock_cache.map), 3 if chunked else 1)
+        self.assert_block_structure(
+            self.block_structure_cache.get(self.block_structure.root_block_usage_key),
+            self.children_map,
+        )
+
+    def test_get_missing_chunk(self):
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, chunked=True)
+        self.block_structure_cache.add(self.block_structure)
+        chunk_key = next(key for key in self.mock_cache.map if '.chunk.' in key)
+        self.mock_cache.delete(chunk_key)
+        self.assertIsNone(
+            self.block_structure_cache.get(self.block_structure.root_block_usage_key)
+        )
 
     def test_get_none(self):
         self.assertIsNone(
             self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         )
 
-    def test_delete(self):
+    @ddt.data(False, True)
+    def test_delete(self, chunked):
+        self.block_structure_cache = BlockStructureCache(self.mock_cache, chunked=chunked)
         self.add_transformers()
         self.block_structure_cache.add(self.block_structure)
         self.block_structure_cache.delete(self.block_structure.root_block_usage_key)
         self.assertIsNone(
             self.block_structure_cache.get(self.block_structure.root_block_usage_key)
         )
+        self.assertEquals(self.mock_cache.map, {})
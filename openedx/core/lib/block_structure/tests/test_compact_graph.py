@@ -0,0 +1,149 @@
+"""
+Tests for block_structure/compact_graph.py
+"""
+# pylint: disable=protected-access
+import ddt
+import itertools
+from nose.plugins.attrib import attr
+from unittest import TestCase
+
+from ..compact_graph import CompactBlockGraph
+from .helpers import ChildrenMapTestMixin
+
+
+@attr(shard=2)
+@ddt.ddt
+class TestCompactBlockGraph(TestCase, ChildrenMapTestMixin):
+    """
+    Tests that compacted block structures behave like regular ones.
+    """
+    #        0
+    #      / | \
+    #     1  2  3
+    #    / \ | / \
+    #   4   5  6  7
+    #   |  / \    |
+    #   8 9  10   11
+    LARGE_DAG_CHILDREN_MAP = [[1, 2, 3], [4, 5], [5], [6, 7], [8], [9, 10], [], [11], [], [], [], []]
+
+    CHILDREN_MAPS = [
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+        LARGE_DAG_CHILDREN_MAP,
+    ]
+
+    def create_block_structures(self, children_map):
+        """
+        Returns a regular and a compacted block structure for the given
+        children_map.
+        """
+        block_structure = self.create_block_structure(children_map)
+        compact_block_structure = self.create_block_structure(children_map)
+        compact_block_structure.compact()
+        self.assertIsNotNone(compact_block_structure._compact_graph)
+        return block_structure, compact_block_structure
+
+    def assert_same_relations(self, block_structure, compact_block_structure):
+        """
+        Verifies that the given block structures have the same blocks and relations.
+        """
+        self.assertEquals(len(block_structure), len(compact_block_structure))
+        self.assertEquals(set(block_structure), set(compact_block_structure))
+        for block_key in block_structure:
+            self.assertEquals(block_structure.get_children(block_key), compact_block_structure.get_children(block_key))
+            self.assertEquals(
+                set(block_structure.get_parents(block_key)),
+                set(compact_block_structure.get_parents(block_key)),
+            )
+
+    @ddt.data(*CHILDREN_MAPS)
+    def test_relations(self, children_map):
+        block_structure, compact_block_structure = self.create_block_structures(children_map)
+        self.assert_block_structure(compact_block_structure, children_map)
+        self.assert_same_relations(block_structure, compact_block_structure)
+        self.assertNotIn(len(children_map), compact_block_structure)
+        self.assertEquals(compact_block_structure.get_children(len(children_map)), [])
+
+    @ddt.data(*itertools.product(CHILDREN_MAPS, [None, 1, 3]))
+    @ddt.unpack
+    def test_traversals(self, children_map, start_node):
+        block_structure, compact_block_structure = self.create_block_structures(children_map)
+        for traversal in ('topological_traversal', 'post_order_traversal'):
+            self.assertEquals(
+                list(getattr(block_structure, traversal)(start_node=start_node)),
+                list(getattr(compact_block_structure, traversal)(start_node=start_node)),
+            )
+
+    @ddt.data(*itertools.product(CHILDREN_MAPS, [True, False]))
+    @ddt.unpack
+    def test_filtered_traversals(self, children_map, yield_descendants_of_unyielded):
+        block_structure, compact_block_structure = self.create_block_structures(children_map)
+        filter_func = lambda block_key: block_key % 3 != 1
+        self.assertEquals(
+            list(block_structure.topological_traversal(filter_func, yield_descendants_of_unyielded)),
+            list(compact_block_structure.topological_traversal(filter_func, yield_descendants_of_unyielded)),
+        )
+        self.assertEquals(
+            list(block_structure.post_order_traversal(filter_func)),
+            list(compact_block_structure.post_order_traversal(filter_func)),
+        )
+
+    @ddt.data(*itertools.product(CHILDREN_MAPS, [True, False]))
+    @ddt.unpack
+    def test_removal_traversal_and_prune(self, children_map, keep_descendants):
+        block_structures = self.create_block_structures(children_map)
+        for block_structure in block_structures:
+            block_structure.remove_block_traversal(lambda block_key: block_key in (1, 5), keep_descendants)
+        self.assert_same_relations(*block_structures)
+        self.assertEquals(*[list(block_structure.topological_traversal()) for block_structure in block_structures])
+
+        for block_structure in block_structures:
+            block_structure._prune_unreachable()
+        self.assert_same_relations(*block_structures)
+        self.assertEquals(*[list(block_structure.post_order_traversal()) for block_structure in block_structures])
+
+    def test_set_root_block(self):
+        block_structures = self.create_block_structures(self.LARGE_DAG_CHILDREN_MAP)
+        for block_structure in block_structures:
+            block_structure.set_root_block(3)
+            block_structure._prune_unreachable()
+        self.assert_same_relations(*block_structures)
+        self.assert_block_structure(
+            block_structures[1],
+            [[], [], [], [6, 7], [], [], [], [11], [], [], [], []],
+            missing_blocks=[0, 1, 2, 4, 5, 8, 9, 10],
+        )
+
+    def test_copy_on_write(self):
+        _, compact_block_structure = self.create_block_structures(self.LARGE_DAG_CHILDREN_MAP)
+        new_copy = compact_block_structure.copy_on_write()
+        self.assertIs(new_copy._compact_graph.block_ids, compact_block_structure._compact_graph.block_ids)
+
+        new_copy.remove_block(3, keep_descendants=True)
+        new_copy._prune_unreachable()
+        self.assertNotIn(3, new_copy)
+        self.assertEquals(new_copy.get_children(0), [1, 2, 6, 7])
+        self.assert_block_structure(compact_block_structure, self.LARGE_DAG_CHILDREN_MAP)
+
+    def test_copy_and_add_new_block(self):
+        block_structure, compact_block_structure = self.create_block_structures(self.LARGE_DAG_CHILDREN_MAP)
+        self.assert_same_relations(block_structure, compact_block_structure.copy())
+
+        # adding a relation between existing blocks keeps the compact form
+        compact_block_structure._add_relation(2, 6)
+        self.assertIsNotNone(compact_block_structure._compact_graph)
+        self.assertEquals(compact_block_structure.get_children(2), [5, 6])
+
+        # adding a new block switches back to the regular form
+        compact_block_structure._add_relation(6, 12)
+        self.assertIsNone(compact_block_structure._compact_graph)
+        self.assertEquals(compact_block_structure.get_parents(6), [3, 2])
+        self.assertEquals(compact_block_structure.get_children(6), [12])
+
+    def test_from_block_relations_ids(self):
+        block_structure = self.create_block_structure(self.LARGE_DAG_CHILDREN_MAP)
+        graph = CompactBlockGraph.from_block_relations(0, block_structure._block_relations)
+        # ids are assigned in pre-order
+        self.assertEquals(graph.block_keys, [0, 1, 4, 8, 5, 9, 10, 2, 3, 6, 7, 11])
+        self.assertEquals(list(graph.get_child_ids(graph.block_ids[0])), [1, 7, 8])
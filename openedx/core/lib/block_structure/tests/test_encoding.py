@@ -0,0 +1,77 @@
+"""
+Tests for block_structure/encoding.py
+"""
+from collections import namedtuple
+import cPickle as pickle
+from datetime import datetime
+from unittest import TestCase
+
+from .. import encoding
+from ..block_structure import BlockStructureBlockData
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+Point = namedtuple('Point', ['x', 'y'])
+
+
+class TestEncoding(ChildrenMapTestMixin, TestCase):
+    """
+    Tests for the schema-aware encoding of block structure cache payloads.
+    """
+    def setUp(self):
+        super(TestEncoding, self).setUp()
+        self.block_structure = self.create_block_structure(self.SIMPLE_CHILDREN_MAP, BlockStructureBlockData)
+        block_data = self.block_structure._get_or_create_block(1)  # pylint: disable=protected-access
+        block_data.display_name = u'Chapter'
+        block_data.start = datetime(2016, 1, 1)
+        self.block_structure.set_transformer_block_field(3, MockTransformer, 'point', Point(1, 2))
+        self.block_structure.set_transformer_block_field(3, MockTransformer, 'ids', {1, 2})
+        self.block_structure.set_transformer_data(MockTransformer, 'groups', {'a': [1, 2]})
+
+    def assert_payload(self, block_relations, transformer_data, block_data_map):
+        """
+        Asserts that the given payload holds the data of the test block structure.
+        """
+        self.assertEqual(
+            {block_key: relations.children for block_key, relations in block_relations.iteritems()},
+            dict(enumerate(self.SIMPLE_CHILDREN_MAP)),
+        )
+        self.assertEqual(block_relations[3].parents, [1])
+        self.assertEqual(transformer_data[MockTransformer].groups, {'a': [1, 2]})
+        self.assertEqual(block_data_map[1].location, 1)
+        self.assertEqual(block_data_map[1].fields, {'display_name': u'Chapter', 'start': datetime(2016, 1, 1)})
+        point = block_data_map[3].transformer_data[MockTransformer].point
+        self.assertEqual(point, Point(1, 2))
+        self.assertIsInstance(point, Point)
+        self.assertEqual(block_data_map[3].transformer_data[MockTransformer].ids, {1, 2})
+
+    def get_payload(self):
+        """
+        Returns the payload of the test block structure.
+        """
+        # pylint: disable=protected-access
+        return (
+            self.block_structure._get_block_relations(),
+            self.block_structure.transformer_data,
+            self.block_structure._block_data_map,
+        )
+
+    def test_structure(self):
+        self.assert_payload(*encoding.loads(encoding.dumps(self.get_payload())))
+
+    def test_chunk_and_index(self):
+        block_relations, transformer_data, block_data_map = self.get_payload()
+        self.assertEqual(len(encoding.loads(encoding.dumps((block_relations, block_data_map)))), 2)
+
+        index = encoding.loads(encoding.dumps({
+            'block_relations': block_relations,
+            'transformer_data': transformer_data,
+            'block_data_map': block_data_map,
+            'chunk_keys': [u'chunk.0'],
+            'block_chunks': {3: [0]},
+        }))
+        self.assert_payload(index['block_relations'], index['transformer_data'], index['block_data_map'])
+        self.assertEqual(index['chunk_keys'], [u'chunk.0'])
+        self.assertEqual(index['block_chunks'], {3: [0]})
+
+    def test_pickled(self):
+        self.assert_payload(*encoding.loads(pickle.dumps(self.get_payload(), pickle.HIGHEST_PROTOCOL)))
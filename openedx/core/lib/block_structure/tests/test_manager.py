@@ -21,6 +21,7 @@ class TestTransformer1(MockTransformer):
     collect_data_key = 't1.collect'
     transform_data_key = 't1.transform'
     collect_call_count = 0
+    collected_block_keys = set()
 
     @classmethod
     def collect(cls, block_structure):
@@ -29,6 +30,7 @@ class TestTransformer1(MockTransformer):
         """
         cls._set_block_values(block_structure, cls.collect_data_key)
         cls.collect_call_count += 1
+        cls.collected_block_keys = set(block_structure.topological_traversal())
 
     def transform(self, usage_info, block_structure):
         """
@@ -94,6 +96,7 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         super(TestBlockStructureManager, self).setUp()
 
         TestTransformer1.collect_call_count = 0
+        TestTransformer1.collected_block_keys = set()
         self.registered_transformers = [TestTransformer1()]
         with mock_registered_transformers(self.registered_transformers):
             self.transformers = BlockStructureTransformers(self.registered_transformers)
@@ -139,6 +142,23 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         TestTransformer1.assert_collected(block_structure)
         TestTransformer1.assert_transformed(block_structure)
 
+    def test_get_transformed_with_starting_block_chunked(self):
+        self.bs_manager = BlockStructureManager(
+            root_block_usage_key=0,
+            modulestore=self.modulestore,
+            cache=self.cache,
+            chunked_cache=True,
+        )
+        with mock_registered_transformers(self.registered_transformers):
+            # collect and cache the whole block structure, then read part of it
+            self.bs_manager.get_collected()
+            block_structure = self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=1)
+        substructure_of_children_map = [[], [3, 4], [], [], []]
+        self.assert_block_structure(block_structure, substructure_of_children_map, missing_blocks=[0, 2])
+        TestTransformer1.assert_collected(block_structure)
+        TestTransformer1.assert_transformed(block_structure)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
     def test_get_transformed_with_collected(self):
         with mock_registered_transformers(self.registered_transformers):
             collected_block_structure = self.bs_manager.get_collected()
@@ -157,6 +177,35 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
             )
             self.assert_block_structure(block_structure, expected_structure, missing_blocks=expected_missing_blocks)
 
+    def test_get_transformed_compact(self):
+        self.bs_manager.compact_transforms = True
+        with mock_registered_transformers(self.registered_transformers):
+            collected_block_structure = self.bs_manager.get_collected()
+            block_structure = self.bs_manager.get_transformed(
+                self.transformers,
+                starting_block_usage_key=1,
+                collected_block_structure=collected_block_structure,
+            )
+        self.assertIsNotNone(collected_block_structure._compact_graph)  # pylint: disable=protected-access
+        self.assert_block_structure(block_structure, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+        self.assert_block_structure(collected_block_structure, self.children_map)
+        TestTransformer1.assert_transformed(block_structure)
+
+    def test_get_transformed_compact_with_starting_block_chunked(self):
+        self.bs_manager = BlockStructureManager(
+            root_block_usage_key=0,
+            modulestore=self.modulestore,
+            cache=self.cache,
+            chunked_cache=True,
+            compact_transforms=True,
+        )
+        with mock_registered_transformers(self.registered_transformers):
+            # collect and cache the whole block structure, then read part of it
+            self.bs_manager.get_collected()
+            block_structure = self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=1)
+        self.assert_block_structure(block_structure, [[], [3, 4], [], [], []], missing_blocks=[0, 2])
+        TestTransformer1.assert_transformed(block_structure)
+
     def test_get_transformed_with_nonexistent_starting_block(self):
         with mock_registered_transformers(self.registered_transformers):
             with self.assertRaises(UsageKeyNotInBlockStructure):
@@ -179,6 +228,58 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
 
+    def update_incrementally_and_verify(self, expected_collected_block_keys):
+        """
+        Calls the manager's update_collected method incrementally and
+        verifies its result and which blocks were recollected.
+        """
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.update_collected(incremental=True)
+        self.assert_block_structure(block_structure, self.children_map)
+        TestTransformer1.assert_collected(block_structure)
+        self.assertEquals(TestTransformer1.collected_block_keys, set(expected_collected_block_keys))
+
+        # the updated structure was cached
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+
+    def set_edit_versions(self, edit_version, block_keys=None):
+        """
+        Sets the edit version of the given blocks (all, by default) in the modulestore.
+        """
+        for block_key, block in self.modulestore.blocks.iteritems():
+            if block_keys is None or block_key in block_keys:
+                block.field_map['edited_on'] = edit_version
+
+    def test_update_collected_incrementally(self):
+        self.set_edit_versions(1)
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+
+        # only the changed block, its ancestors and its descendants are recollected
+        self.set_edit_versions(2, block_keys=[1])
+        self.update_incrementally_and_verify([0, 1, 3, 4])
+
+        self.set_edit_versions(3, block_keys=[4])
+        self.update_incrementally_and_verify([0, 1, 4])
+
+        # nothing changed
+        self.update_incrementally_and_verify([])
+
+    def test_update_collected_incrementally_unknown_versions(self):
+        # blocks without an edit version are always recollected
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.update_incrementally_and_verify(range(len(self.children_map)))
+
+    def test_update_collected_incrementally_not_cached(self):
+        self.set_edit_versions(1)
+        self.update_incrementally_and_verify(range(len(self.children_map)))
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
+    def test_update_collected_incrementally_outdated_data(self):
+        self.set_edit_versions(1)
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        TestTransformer1.VERSION += 1
+        self.update_incrementally_and_verify(range(len(self.children_map)))
+
     def test_clear(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.bs_manager.clear()
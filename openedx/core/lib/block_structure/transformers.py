@@ -4,6 +4,7 @@ Module for a collection of BlockStructureTransformers.
 import functools
 from logging import getLogger
 
+from .block_structure import EDIT_VERSION_XBLOCK_FIELD
 from .exceptions import TransformerException
 from .transformer import FilteringTransformerMixin
 from .transformer_registry import TransformerRegistry
@@ -75,6 +76,10 @@ class BlockStructureTransformers(object):
         """
         Collects data for each registered transformer.
         """
+        # Collect the edit version of each block so the collected data
+        # can later be updated incrementally.
+        block_structure.request_xblock_fields(EDIT_VERSION_XBLOCK_FIELD)
+
         for transformer in TransformerRegistry.get_registered_transformers():
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             transformer.collect(block_structure)
@@ -82,6 +87,38 @@ class BlockStructureTransformers(object):
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def collect_incrementally(cls, block_structure, collected_block_structure):
+        """
+        Collects data for each registered transformer, only for the
+        blocks that changed since the given block structure was
+        collected, along with their ancestors and descendants.  The
+        collected data of all other blocks is carried over from the given
+        block structure.
+
+        Arguments:
+            block_structure (BlockStructureModulestoreData) - The block
+                structure, freshly created from the modulestore, into
+                which data is to be collected.
+
+            collected_block_structure (BlockStructureBlockData) - A
+                block structure previously collected, with up-to-date
+                transformers, for the same root.
+        """
+        affected_block_keys = block_structure._set_collect_scope_from(  # pylint: disable=protected-access
+            collected_block_structure
+        )
+        logger.info(
+            "Incrementally collecting %d of %d blocks of Block Structure %s.",
+            len(affected_block_keys),
+            len(block_structure),
+            block_structure.root_block_usage_key,
+        )
+        try:
+            cls.collect(block_structure)
+        finally:
+            block_structure._clear_collect_scope()  # pylint: disable=protected-access
+
     @classmethod
     def is_collected_outdated(cls, block_structure):
         """
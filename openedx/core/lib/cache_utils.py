@@ -4,9 +4,13 @@ Utilities related to caching.
 import collections
 import cPickle as pickle
 import functools
+import threading
+import time
 import zlib
 from xblock.core import XBlock
 
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
 
 def memoize_in_request_cache(request_cache_attr_name=None):
     """
@@ -83,6 +87,87 @@ class memoized(object):  # pylint: disable=invalid-name
         return functools.partial(self.__call__, obj)
 
 
+def lru_memoized(maxsize=128, ttl=None, key=None, version=None):
+    """
+    Decorator. Caches a function's return values in the process, like
+    `memoized`, but keeps at most maxsize of them, evicting the least
+    recently used, and each for at most ttl seconds, if given.
+
+    Arguments:
+        maxsize (int): the maximum number of values cached.
+        ttl (float): the number of seconds after which a cached value expires,
+            or None if values don't expire.
+        key (callable): given the arguments of a call, returns the hashable
+            key its value is cached under, or None if it shouldn't be cached.
+            By default, the value of a call is cached under its arguments.
+        version (callable): given the arguments of a call, returns the
+            version of the data its value is computed from, such as the time
+            a course was published. A cached value is recomputed if the
+            version of the call differs from the one it was computed for.
+
+    The decorated function has a cache_info() method, returning the CacheInfo
+    of its cache, and a cache_clear() method, emptying it.
+    """
+    def _decorator(func):
+        """Outer function decorator."""
+        cache = collections.OrderedDict()
+        stats = {'hits': 0, 'misses': 0}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def _wrapper(*args, **kwargs):
+            """
+            Wraps a function to memoize results.
+            """
+            cache_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            try:
+                hash(cache_key)
+            except TypeError:
+                # uncacheable. a list, for instance.
+                cache_key = None
+            if cache_key is None:
+                return func(*args, **kwargs)
+
+            call_version = version(*args, **kwargs) if version else None
+            with lock:
+                entry = cache.pop(cache_key, None)
+                if entry is not None:
+                    value, cached_version, expires = entry
+                    if cached_version == call_version and (expires is None or time.time() < expires):
+                        # Mark it as the most recently used.
+                        cache[cache_key] = entry
+                        stats['hits'] += 1
+                        return value
+                stats['misses'] += 1
+
+            value = func(*args, **kwargs)
+            with lock:
+                cache[cache_key] = (value, call_version, time.time() + ttl if ttl is not None else None)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return value
+
+        def cache_info():
+            """
+            Returns the hits, misses, maximum size and current size of the cache.
+            """
+            with lock:
+                return CacheInfo(stats['hits'], stats['misses'], maxsize, len(cache))
+
+        def cache_clear():
+            """
+            Empties the cache and resets its statistics.
+            """
+            with lock:
+                cache.clear()
+                stats['hits'] = stats['misses'] = 0
+
+        _wrapper.cache_info = cache_info
+        _wrapper.cache_clear = cache_clear
+        return _wrapper
+    return _decorator
+
+
 def hashvalue(arg):
     """
     If arg is an xblock, use its location. otherwise just turn it into a string
@@ -93,11 +178,66 @@ def hashvalue(arg):
         return unicode(arg)
 
 
-def zpickle(data):
-    """Given any data structure, returns a zlib compressed pickled serialization."""
-    return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+# A compressor of the serializations made by zcompress, identified in their
+# header by its id.
+Compressor = collections.namedtuple('Compressor', ['id', 'compress', 'decompress'])
+
+# The compressors that zcompress can use, by name.  The ids of compressors
+# must never change or be reused, since they identify the compressor of
+# serializations that are already stored.
+COMPRESSORS = {
+    'zlib': Compressor(1, zlib.compress, zlib.decompress),
+    # Compresses several times faster than 'zlib', into somewhat larger
+    # serializations, which decompress as fast.
+    'zlib-fast': Compressor(2, lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+
+# The first byte of the header of serializations made with a compressor.
+# Serializations made without one are zlib streams, which never start with
+# this byte, since the first byte of a zlib stream always has its low four
+# bits set to 8 (the deflate compression method).
+_ZDATA_HEADER_MAGIC = '\x00'
+_ZDATA_HEADER_VERSION = 1
+_ZDATA_HEADER_LENGTH = 3
+
+
+def zcompress(data, compressor=None):
+    """
+    Returns the given string compressed with the compressor of the given
+    name, and preceded by a header identifying it, or compressed with zlib
+    and without a header if no compressor is given.
+    """
+    if compressor is None:
+        return zlib.compress(data)
+    compressor = COMPRESSORS[compressor]
+    header = _ZDATA_HEADER_MAGIC + chr(_ZDATA_HEADER_VERSION) + chr(compressor.id)
+    return header + compressor.compress(data)
+
+
+def zdecompress(zdata):
+    """
+    Given a serialization made by zcompress, with any compressor, returns
+    the decompressed string.
+    """
+    if not zdata.startswith(_ZDATA_HEADER_MAGIC):
+        return zlib.decompress(zdata)
+    version, compressor_id = ord(zdata[1]), ord(zdata[2])
+    if version != _ZDATA_HEADER_VERSION:
+        raise ValueError('Unknown compressed data header version {}'.format(version))
+    for compressor in COMPRESSORS.itervalues():
+        if compressor.id == compressor_id:
+            return compressor.decompress(zdata[_ZDATA_HEADER_LENGTH:])
+    raise ValueError('Unknown compressor id {}'.format(compressor_id))
+
+
+def zpickle(data, compressor=None):
+    """
+    Given any data structure, returns a compressed pickled serialization,
+    compressed with the compressor of the given name (see zcompress).
+    """
+    return zcompress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL), compressor)
 
 
 def zunpickle(zdata):
-    """Given a zlib compressed pickled serialization, returns the deserialized data."""
-    return pickle.loads(zlib.decompress(zdata))
+    """Given a compressed pickled serialization, returns the deserialized data."""
+    return pickle.loads(zdecompress(zdata))
@@ -1,11 +1,14 @@
 """
 Tests for cache_utils.py
 """
+import cPickle as pickle
+import zlib
+
 import ddt
-from mock import MagicMock
+from mock import MagicMock, patch
 from unittest import TestCase
 
-from openedx.core.lib.cache_utils import memoize_in_request_cache
+from openedx.core.lib.cache_utils import lru_memoized, memoize_in_request_cache, zcompress, zpickle, zunpickle
 
 
 @ddt.ddt
@@ -62,3 +65,90 @@ class TestMemoizeInRequestCache(TestCase):
                 func_to_memoize(*arg_list2)
 
             self.assertEquals(self.func_to_count.call_count, 2)
+
+
+class TestLruMemoized(TestCase):
+    """
+    Test the lru_memoized decorator.
+    """
+    def setUp(self):
+        super(TestLruMemoized, self).setUp()
+        self.func_to_count = MagicMock(side_effect=lambda *args: len(args))
+        self.version = 1
+
+    def memoize(self, **kwargs):
+        """
+        Returns func_to_count memoized with the given lru_memoized arguments.
+        """
+        return lru_memoized(**kwargs)(lambda *args: self.func_to_count(*args))
+
+    def test_lru_eviction(self):
+        func = self.memoize(maxsize=2)
+        func('a')
+        func('b')
+        func('a')
+        func('c')  # evicts 'b', the least recently used
+        func('a')
+        self.assertEqual(self.func_to_count.call_count, 3)
+        func('b')
+        self.assertEqual(self.func_to_count.call_count, 4)
+        self.assertEqual(func.cache_info(), (2, 4, 2, 2))
+
+    def test_ttl(self):
+        func = self.memoize(ttl=60)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=1000):
+            func('a')
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=1059):
+            func('a')
+        self.assertEqual(self.func_to_count.call_count, 1)
+        with patch('openedx.core.lib.cache_utils.time.time', return_value=1060):
+            func('a')
+        self.assertEqual(self.func_to_count.call_count, 2)
+
+    def test_key_and_version(self):
+        func = self.memoize(
+            key=lambda *args: args[0] if args[0] != 'uncached' else None,
+            version=lambda *args: self.version,
+        )
+        func('a', 1)
+        func('a', 2)
+        self.assertEqual(self.func_to_count.call_count, 1)
+        self.version = 2
+        func('a', 2)
+        self.assertEqual(self.func_to_count.call_count, 2)
+        func('uncached')
+        func('uncached')
+        self.assertEqual(self.func_to_count.call_count, 4)
+
+    def test_unhashable_and_clear(self):
+        func = self.memoize()
+        func(['a'])
+        func(['a'])
+        self.assertEqual(self.func_to_count.call_count, 2)
+        func('a')
+        func.cache_clear()
+        func('a')
+        self.assertEqual(self.func_to_count.call_count, 4)
+        self.assertEqual(func.cache_info(), (0, 1, 128, 1))
+
+
+@ddt.ddt
+class TestZpickle(TestCase):
+    """
+    Tests for zpickle and zunpickle.
+    """
+    DATA = {'key': [u'value', 1, None]}
+
+    @ddt.data(None, 'zlib', 'zlib-fast')
+    def test_zpickle(self, compressor):
+        self.assertEqual(zunpickle(zpickle(self.DATA, compressor)), self.DATA)
+
+    def test_without_compressor(self):
+        # Serializations made without a compressor have the format they had
+        # before compressors could be chosen.
+        self.assertEqual(zpickle(self.DATA), zlib.compress(pickle.dumps(self.DATA, pickle.HIGHEST_PROTOCOL)))
+
+    def test_unknown_compressor(self):
+        zdata = zcompress('data', 'zlib')
+        with self.assertRaises(ValueError):
+            zunpickle(zdata[:2] + chr(255) + zdata[3:])
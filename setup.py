@@ -53,6 +53,8 @@ setup(
             "course_blocks_api = lms.djangoapps.course_api.blocks.transformers.blocks_api:BlocksAPITransformer",
             "milestones = lms.djangoapps.course_api.blocks.transformers.milestones:MilestonesTransformer",
             "grades = lms.djangoapps.grades.transformer:GradesTransformer",
+            "course_navigation = lms.djangoapps.courseware.transformer:CourseNavigationTransformer",
+            "discussion_index = lms.djangoapps.django_comment_client.transformer:DiscussionIndexTransformer",
         ],
     }
 )